@@ -4,14 +4,23 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
-from backend.app.middlewares.throttling import init_rate_limiter
+from backend.app.middlewares.throttling import (
+    init_rate_limiter, load_rate_policies, rate_policy_listener
+)
 from backend.app.middlewares.bundler import add_middlewares
 from backend.app.routes.bundler import api_router
 from backend.app.base.logging import logger
 from backend.app.scheduler.bundler import start_schedulers
+from backend.app.scheduler.user_logins import flush_user_logins
 from backend.app.database.instance import init_database
 from backend.app.database.initial_data import insert_initial_data
-from backend.app.base.config import settings, is_docker
+from backend.app.base.config import settings
+from backend.app.base.auth import (
+    load_user_epochs, load_permission_registry, load_authorization_engine,
+    authorization_listener, user_epoch_listener,
+)
+from backend.app.services.hashing import password_hasher
+from backend.app.services.revocation import revocation_service
 
 @asynccontextmanager
 async def lifespan(app_: FastAPI):
@@ -19,15 +28,43 @@ async def lifespan(app_: FastAPI):
     await init_database()
     await insert_initial_data()
 
-    # Rate limiter initialization
-    if is_docker(settings.ENVIRONMENT): 
-        await init_rate_limiter()
+    # Permission bits must agree with the ones stored on the database
+    await load_permission_registry()
+    await load_authorization_engine()
+    authorization_listener.start()
+
+    # Revoked claims must be known before serving requests
+    if settings.AUTH_CLAIMS_MODE:
+        await load_user_epochs()
+        user_epoch_listener.start()
+
+    # Revoked tokens are mirrored locally once the revocation list is synced
+    revocation_service.start()
+
+    # Rate limiter initialization, limits are enforced locally without Redis
+    await init_rate_limiter()
+    await load_rate_policies()
+    rate_policy_listener.start()
     
     # Start the schedulers
     start_schedulers()
     
     yield
 
+    # Stop listening to role changes and token revocations
+    await rate_policy_listener.stop()
+    await authorization_listener.stop()
+    await user_epoch_listener.stop()
+
+    # Stop retrying the first sync of the revocation list
+    await revocation_service.stop()
+
+    # Write the buffered login bookkeeping
+    await flush_user_logins()
+
+    # Release the password hashing workers
+    password_hasher.shutdown()
+
 def create_app():
     # Create the FastAPI app
     app = FastAPI(
@@ -1,11 +1,14 @@
 # auth.py
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
-from typing import Annotated, Tuple
+from typing import Annotated, List, Tuple
 from functools import wraps
+from hmac import compare_digest
+from inspect import iscoroutinefunction
 from time import time
+from uuid import uuid4
 
 from backend.app.base.exceptions import (
     CredentialsException, 
@@ -15,12 +18,39 @@ from backend.app.base.exceptions import (
     InactiveUserException,
     MalformedTokenException,
     MissingRequiredClaimException,
+    MissingTokenException,
+    RevokedTokenException,
 )
 from backend.app.repositories.users import user_repository_async_context_manager
+from backend.app.repositories.tokens import refresh_token_repository_async_context_manager
+from backend.app.repositories.api_keys import (
+    api_key_repository_async_context_manager,
+    digest_api_key_secret,
+    is_api_key,
+    split_api_key,
+)
+from backend.app.repositories.auth import (
+    get_permission_async_context_manager,
+    role_repository_async_context_manager,
+)
 from backend.app.models.users import User
+from backend.app.models.auth import Principal, TokenClaims, TokenIntrospection
 from backend.app.database.models.users import User
-from backend.app.utils.misc import is_async
+from backend.app.utils.request import get_token
+from backend.app.utils.permissions import encode_bitmap
 
+from backend.app.services.revocation import revocation_service
+from backend.app.services.signing import key_ring
+from backend.app.services.authorization import (
+    Requirement, authorization_engine, AUTHORIZATION_CHANNEL,
+)
+from backend.app.services.listeners import NotificationListener
+from backend.app.services.opaque_tokens import opaque_token_store, is_opaque_token
+from backend.app.base.cache import (
+    token_cache, claims_cache, api_key_cache, user_epochs, USER_EPOCHS_CHANNEL
+)
+from backend.app.base.permissions import permission_registry
+from backend.app.database.instance import listen_uri
 from backend.app.base.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -29,11 +59,13 @@ OAuthDependency = Annotated[str, Depends(oauth2_scheme)]
 JWT_ALGORITHM=settings.JWT_ALGORITHM
 JWT_SECRET_KEY=settings.JWT_SECRET_KEY
 ACCESS_TOKEN_EXPIRE_MINUTES=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+CLAIMS_TOKEN_EXPIRE_MINUTES=settings.CLAIMS_TOKEN_EXPIRE_MINUTES
 
 
 async def validate_refresh_token(token: OAuthDependency):
     """
     Validates the refresh token and returns the current user and the token.
+    The token is looked up by its hash on the refresh token store.
 
     Args:
         token (str): The refresh token to be validated.
@@ -46,39 +78,42 @@ async def validate_refresh_token(token: OAuthDependency):
         CredentialsException: If the token is invalid or the user credentials are incorrect.
         InactiveUserException: If the user is inactive.
     """
-    async with user_repository_async_context_manager() as user_repository:
-        try:
-            user_has_token, user = await user_repository.refresh_token_exists(token)
+    async with refresh_token_repository_async_context_manager() as token_repository:
+        stored_token = await token_repository.get_refresh_token(token)
 
-            if user_has_token:
-                payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-                username: str = payload.get("sub")
-                expiration_date_int = payload.get("exp")
-                expiration_date = datetime.fromtimestamp(expiration_date_int)
+        if stored_token is None:
+            raise CredentialsException()
 
-                if expiration_date < datetime.now():
-                    raise ExpiredTokenException()
+        # A rotated token presented again was leaked: the whole family is revoked
+        if stored_token.is_revoked:
+            await token_repository.revoke_token_family(stored_token.reto_family_id)
+            raise CredentialsException()
 
-                invalid_credentials = username is None or user.user_username != username
-                
-                if invalid_credentials:
-                    raise CredentialsException()
-            else:
-                raise CredentialsException()
+    try:
+        payload = key_ring.decode(token)
+    except JWTError:
+        raise ExpiredTokenException()
 
-        except JWTError:
-            raise ExpiredTokenException()
+    username: str = payload.get("sub")
+    expiration_date = datetime.fromtimestamp(payload.get("exp"))
 
-        current_user = await user_repository.get_user_by_username(username)
+    if expiration_date < datetime.now():
+        raise ExpiredTokenException()
 
-        if current_user is None:
-            raise CredentialsException()
+    if username is None:
+        raise CredentialsException()
 
-        if not current_user.user_is_active:
-            raise InactiveUserException(current_user.user_username)
+    async with user_repository_async_context_manager() as user_repository:
+        current_user = await user_repository.get_user_with_permissions(username)
+
+    invalid_credentials = current_user is None or \
+        current_user.user_id != stored_token.reto_user_id
 
-    # Ensure loaded entity
-    _ = current_user.user_roles
+    if invalid_credentials:
+        raise CredentialsException()
+
+    if not current_user.user_is_active:
+        raise InactiveUserException(current_user.user_username)
 
     return current_user, token
 
@@ -103,9 +138,31 @@ async def get_user(username: str) -> User | None:
     return user
 
 
+def get_claims_data(user: User) -> dict:
+    """
+    Builds the authorization claims of a user: its id, role names, token
+    epoch, and permissions as a base64 bitmap of the permission registry,
+    along with the registry version.
+
+    Args:
+        user (User): The user, with roles and permissions loaded.
+
+    Returns:
+        dict: The claims to be embedded in an access token.
+    """
+    return {
+        "uid": str(user.user_id),
+        "rol": sorted(user.role_names),
+        "pbm": encode_bitmap(authorization_engine.permission_mask(user)),
+        "pbv": permission_registry.version,
+        "epc": user.user_token_epoch or 0,
+    }
+
+
 def create_token(
     data: dict, 
-    expires_delta: timedelta | None = ACCESS_TOKEN_EXPIRE_MINUTES
+    expires_delta: timedelta | None = ACCESS_TOKEN_EXPIRE_MINUTES,
+    user: User | None = None,
 ):
     """
     Create a JSON Web Token (JWT) with the provided data and expiration time.
@@ -113,6 +170,8 @@ def create_token(
     Args:
         data (dict): The data to be encoded in the JWT.
         expires_delta (timedelta | None, optional): The expiration time for the JWT. Defaults to ACCESS_TOKEN_EXPIRE_MINUTES.
+        user (User | None, optional): The token owner. On claims mode, its authorization
+            claims are embedded and the expiration is capped to CLAIMS_TOKEN_EXPIRE_MINUTES.
 
     Returns:
         str: The encoded JWT.
@@ -121,26 +180,136 @@ def create_token(
     to_encode = data.copy()
     current_time = datetime.now(timezone.utc)
 
+    if settings.AUTH_CLAIMS_MODE and user is not None:
+        to_encode.update(get_claims_data(user))
+        expires_delta = min(expires_delta, CLAIMS_TOKEN_EXPIRE_MINUTES)
+
     # Set the expiration time
     expire = current_time + expires_delta
 
-    time_data = {"exp": expire, "iat": datetime.now()}
+    # The token id keeps tokens issued on the same second distinct
+    time_data = {"exp": expire, "iat": datetime.now(), "jti": uuid4().hex}
     to_encode.update(time_data)
 
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    encoded_jwt = key_ring.encode(to_encode)
 
     return encoded_jwt
 
 
-async def get_current_user(token: OAuthDependency) -> User:
+async def create_opaque_token(
+    user: User, expires_delta: timedelta = ACCESS_TOKEN_EXPIRE_MINUTES
+) -> str:
     """
-    Retrieves the current user based on the provided token.
+    Issues an opaque access token, whose session record holds the user
+    roles and permission bitmap.
+
+    Args:
+        user (User): The token owner, with roles and permissions loaded.
+        expires_delta (timedelta, optional): The token lifetime. Defaults to ACCESS_TOKEN_EXPIRE_MINUTES.
+
+    Returns:
+        str: The opaque token.
+    """
+    return await opaque_token_store.issue(
+        user_id=user.user_id,
+        username=user.user_username,
+        role_names=user.role_names,
+        permission_bitmap=authorization_engine.permission_mask(user),
+        epoch=user.user_token_epoch or 0,
+        expires_delta=expires_delta,
+    )
+
+
+async def get_opaque_token_claims(token: str) -> TokenClaims:
+    """
+    Retrieves the principal of an opaque access token from its session record.
+
+    Args:
+        token (str): The opaque token.
+
+    Returns:
+        TokenClaims: The principal of the token.
+
+    Raises:
+        ExpiredTokenException: If the token has expired or has been revoked.
+    """
+    claims = await opaque_token_store.get_claims(token)
+
+    if claims is None or user_epochs.is_stale(claims.user_id, claims.epoch):
+        raise ExpiredTokenException()
+
+    return claims
+
+
+async def get_api_key_user(key: str) -> Principal:
+    """
+    Retrieves the owner of a service-account API key, with one indexed
+    lookup by the key prefix and a constant-time comparison of the secret
+    digests. Resolved keys are cached for API_KEY_CACHE_TTL_SECONDS.
+
+    Args:
+        key (str): The API key.
+
+    Returns:
+        Principal: The principal of the key owner.
+
+    Raises:
+        CredentialsException: If the key is unknown, revoked or expired.
+        InactiveUserException: If the owner is inactive.
+    """
+    cached_user = api_key_cache.get_token(key)
+    if cached_user is not None:
+        return cached_user
+
+    key_parts = split_api_key(key)
+    if key_parts is None:
+        raise CredentialsException()
+
+    prefix, secret = key_parts
+
+    async with api_key_repository_async_context_manager() as api_key_repository:
+        api_key = await api_key_repository.get_api_key_by_prefix(prefix)
+
+    is_authentic = api_key is not None and compare_digest(
+        api_key.apke_secret_digest, digest_api_key_secret(secret)
+    )
+    if not is_authentic or api_key.is_revoked or api_key.is_expired:
+        raise CredentialsException()
+
+    user = api_key.apke_user
+    if not user.user_is_active:
+        raise InactiveUserException(user.user_username)
+
+    principal = authorization_engine.build_principal(
+        user.user_id,
+        user.user_username,
+        user.user_is_active,
+        [role.role_id for role in user.user_roles],
+        user.role_names,
+    )
+
+    expires_at = time() + settings.API_KEY_CACHE_TTL_SECONDS
+    if api_key.apke_expires_at is not None:
+        expires_at = min(expires_at, api_key.apke_expires_at.timestamp())
+
+    api_key_cache.set_token(key, user.user_id, principal, expires_at)
+
+    return principal
+
+
+async def get_current_user(token: OAuthDependency) -> Principal:
+    """
+    Retrieves the principal of the current user based on the provided token.
+    The principal is immutable and built from a narrow projection, with no
+    ORM entity. Verified tokens are cached until their expiration, so
+    repeated calls with the same token skip both the signature check and
+    the database lookup.
 
     Args:
         token (str): The JWT token used for authentication.
 
     Returns:
-        User: The user object representing the current user.
+        Principal: The principal representing the current user.
 
     Raises:
         ExpiredTokenException: If the token has expired.
@@ -149,10 +318,18 @@ async def get_current_user(token: OAuthDependency) -> User:
         MalformedTokenException: If the token is malformed.
         InexistentUsernameException: If the username does not exist in the database.
         InactiveUserException: If the user is inactive.
+        RevokedTokenException: If the token has been revoked.
     """
+    cached_entry = token_cache.get_token(token)
+    if cached_entry is not None:
+        user, token_id = cached_entry
+        await check_token_revocation(token_id)
+
+        return user
+
     async with user_repository_async_context_manager() as user_repository:
         try:
-            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+            payload = key_ring.decode(token)
 
             if payload['exp'] <= time():
                 raise ExpiredTokenException()
@@ -168,8 +345,8 @@ async def get_current_user(token: OAuthDependency) -> User:
         except JWTError:
             raise MalformedTokenException()
 
-        # Get the user from the database
-        user = await user_repository.get_user_by_username(username=username)
+        # Get the user principal from the database
+        user = await user_repository.get_principal(username)
         
         # Check if the user exists and is active
         if user is None:
@@ -178,38 +355,332 @@ async def get_current_user(token: OAuthDependency) -> User:
         if not user.user_is_active:
             raise InactiveUserException(user.user_username)
 
+    token_id = payload.get('jti')
+    await check_token_revocation(token_id)
+
+    token_cache.set_token(token, user.user_id, (user, token_id), payload['exp'])
+
     return user
 
 
-def role_checker(required_roles: Tuple[str]):
+async def check_token_revocation(token_id: str | None):
+    """
+    Rejects revoked tokens. Tokens without a 'jti' claim cannot be revoked.
+
+    Args:
+        token_id (str | None): The token id (claim 'jti').
+
+    Raises:
+        RevokedTokenException: If the token has been revoked.
+    """
+    if token_id and await revocation_service.is_revoked(token_id):
+        raise RevokedTokenException()
+
+
+async def revoke_token(token: str) -> bool:
+    """
+    Revokes an access token until its expiration.
+
+    Args:
+        token (str): The JWT or opaque token to be revoked.
+
+    Returns:
+        bool: True if the token was revoked, False if it cannot be revoked.
+
+    Raises:
+        MalformedTokenException: If the token is malformed or expired.
+    """
+    # Opaque tokens are revoked by deleting their session record
+    if is_opaque_token(token):
+        return await opaque_token_store.revoke(token)
+
+    try:
+        payload = key_ring.decode(token)
+    except JWTError:
+        raise MalformedTokenException()
+
+    if 'jti' not in payload:
+        return False
+
+    return await revocation_service.revoke(payload['jti'], payload['exp'])
+
+
+def get_token_claims(token: str) -> TokenClaims | None:
+    """
+    Retrieves the authorization claims embedded in an access token, without
+    querying the database.
+
+    Args:
+        token (str): The JWT token used for authentication.
+
+    Returns:
+        TokenClaims | None: The verified claims, or None if the token was not
+            minted on claims mode.
+
+    Raises:
+        ExpiredTokenException: If the token has expired or has been revoked.
+        MalformedTokenException: If the token is malformed.
+    """
+    cached_claims = claims_cache.get_token(token)
+    if cached_claims is not None:
+        # The epoch may have been bumped by another worker since caching
+        if user_epochs.is_stale(cached_claims.user_id, cached_claims.epoch):
+            raise ExpiredTokenException()
+
+        return cached_claims
+
+    try:
+        payload = key_ring.decode(token)
+    except JWTError:
+        raise MalformedTokenException()
+
+    if payload['exp'] <= time():
+        raise ExpiredTokenException()
+
+    if 'uid' not in payload or 'rol' not in payload:
+        return None
+
+    claims = TokenClaims.from_payload(payload)
+
+    if user_epochs.is_stale(claims.user_id, claims.epoch):
+        raise ExpiredTokenException()
+
+    claims_cache.set_token(token, claims.user_id, claims, payload['exp'])
+
+    return claims
+
+
+async def introspect_tokens(tokens: List[str]) -> List[TokenIntrospection]:
+    """
+    Validates a batch of access tokens in one pass: every distinct token is
+    decoded once, the session records of opaque tokens are fetched with a
+    single pipelined round trip, and every distinct subject is loaded with a
+    single query.
+
+    Args:
+        tokens (List[str]): The JWT or opaque tokens to be introspected.
+
+    Returns:
+        List[TokenIntrospection]: The introspection of each token, in order.
+    """
+    payloads = {}
+    distinct_tokens = set(tokens)
+
+    opaque_tokens = [token for token in distinct_tokens if is_opaque_token(token)]
+    if opaque_tokens:
+        opaque_claims = await opaque_token_store.get_many_claims(opaque_tokens)
+
+        for token, claims in zip(opaque_tokens, opaque_claims):
+            if claims is not None:
+                payloads[token] = {
+                    'sub': claims.user_username,
+                    'exp': claims.expires_at,
+                    'epc': claims.epoch,
+                }
+
+    for token in distinct_tokens.difference(opaque_tokens):
+        try:
+            payload = key_ring.decode(token)
+        except JWTError:
+            continue
+
+        if payload.get('sub') is None or payload['exp'] <= time():
+            continue
+
+        token_id = payload.get('jti')
+        if token_id and await revocation_service.is_revoked(token_id):
+            continue
+
+        payloads[token] = payload
+
+    usernames = {payload['sub'] for payload in payloads.values()}
+
+    async with user_repository_async_context_manager() as user_repository:
+        users = await user_repository.get_users_by_usernames(list(usernames))
+
+    users_by_username = {user.user_username: user for user in users}
+
+    introspections = {}
+    for token, payload in payloads.items():
+        user = users_by_username.get(payload['sub'])
+
+        is_active = user is not None and user.user_is_active and \
+            payload.get('epc', 0) >= (user.user_token_epoch or 0)
+
+        if is_active:
+            introspections[token] = TokenIntrospection(
+                active=True,
+                sub=user.user_username,
+                uid=str(user.user_id),
+                roles=user.role_names,
+                exp=payload['exp'],
+                jti=payload.get('jti'),
+            )
+
+    inactive = TokenIntrospection(active=False)
+
+    return [introspections.get(token, inactive) for token in tokens]
+
+
+async def load_user_epochs():
+    """
+    Loads the token epochs of users whose tokens were revoked, so that
+    claims issued before the revocation are rejected.
+    """
+    async with user_repository_async_context_manager() as user_repository:
+        epochs = await user_repository.get_user_token_epochs()
+
+    user_epochs.update(epochs)
+
+
+# Reloads the token epochs on token revocations made by any worker
+user_epoch_listener = NotificationListener(
+    listen_uri,
+    load_user_epochs,
+    channel=USER_EPOCHS_CHANNEL,
+    subject="user token epochs",
+    reconnect_interval=settings.ROLE_LISTENER_RECONNECT_SECONDS,
+)
+
+
+async def load_permission_registry():
+    """
+    Reconciles the permission registry with the database: stored bit
+    positions win, and permissions without one are assigned the next free
+    bits, which are stored so that every worker agrees on them.
+    """
+    async with get_permission_async_context_manager() as permission_repository:
+        await permission_repository.load_permission_registry()
+
+
+async def load_authorization_engine():
+    """
+    Compiles the authorization engine from the roles, permissions and
+    roles_x_permissions tables.
+    """
+    async with role_repository_async_context_manager() as role_repository:
+        await role_repository.compile_authorization()
+
+
+async def reload_authorization():
+    """
+    Reloads the permission registry before recompiling the authorization
+    engine, so that permissions created by another worker have their bits
+    when the roles granting them are compiled.
+    """
+    await load_permission_registry()
+    await load_authorization_engine()
+
+
+# Recompiles the authorization engine on role and permission changes made by
+# any worker
+authorization_listener = NotificationListener(
+    listen_uri,
+    reload_authorization,
+    channel=AUTHORIZATION_CHANNEL,
+    subject="authorization engine",
+    reconnect_interval=settings.ROLE_LISTENER_RECONNECT_SECONDS,
+)
+
+
+async def resolve_principal(token: str) -> Principal:
+    """
+    Resolves the principal of an access token. API keys resolve to their
+    owner, and opaque tokens to their session record. On claims mode,
+    tokens carrying authorization claims resolve to their claims, with no
+    database lookup at all; other tokens resolve to the principal of their
+    user, loaded from the database.
+
+    Args:
+        token (str): The JWT token used for authentication.
+
+    Returns:
+        Principal: The principal representing the current user.
+    """
+    principal = None
+
+    if is_api_key(token):
+        return await get_api_key_user(token)
+
+    if is_opaque_token(token):
+        return await get_opaque_token_claims(token)
+
+    if settings.AUTH_CLAIMS_MODE:
+        principal = get_token_claims(token)
+
+        if principal is not None:
+            await check_token_revocation(principal.token_id)
+
+    if principal is None:
+        principal = await get_current_user(token)
+
+    return principal
+
+
+async def get_request_user(request: Request, token: OAuthDependency) -> Principal:
+    """
+    Resolves the current user once per request. The user is stored on the
+    request state, which is shared by the middlewares and the route
+    dependencies, so that later calls do not hit the database again.
+
+    Args:
+        request (Request): The incoming request.
+        token (str): The JWT token used for authentication.
+
+    Returns:
+        Principal: The principal representing the current user.
+
+    Raises:
+        MissingTokenException: If the request carries no token.
+    """
+    current_user = getattr(request.state, "current_user", None)
+
+    if current_user is None:
+        token = token or get_token(request)
+
+        if not token:
+            raise MissingTokenException()
+
+        current_user = await resolve_principal(token)
+        request.state.current_user = current_user
+
+    return current_user
+
+
+def authorization_checker(requirement: Requirement):
+    """
+    Builds a route decorator that authorizes the current user against a
+    requirement. Everything but the check itself is resolved here, once.
+
+    Args:
+        requirement (Requirement): The roles and permissions required.
+
+    Returns:
+        Callable: The route decorator.
+    """
     def wrapper(func):
+        is_coroutine = iscoroutinefunction(func)
+
         @wraps(func)
         async def decorated_view(*args, current_user: User, **kwargs):
-            if not current_user.has_roles(required_roles):
+            if not authorization_engine.is_authorized(current_user, requirement):
                 raise PrivilegesException()
 
-            if await is_async(func):
+            if is_coroutine:
                 return await func(*args, current_user=current_user, **kwargs)
             else:
                 return func(*args, current_user=current_user, **kwargs)
-            
+
         return decorated_view
-    
+
     return wrapper
 
-def permissions_checker(required_permissions: Tuple[str]):
-    def wrapper(func):
-        @wraps(func)
-        async def decorated_view(*args, current_user: User, **kwargs):
-            if not current_user.has_permissions(required_permissions):
-                raise PrivilegesException()
 
-            if await is_async(func):
-                return await func(*args, current_user=current_user, **kwargs)
-            else:
-                return func(*args, **kwargs)
-            
-        return decorated_view
-    
-    return wrapper
+def role_checker(required_roles: Tuple[str]):
+    return authorization_checker(authorization_engine.requirement(role_names=required_roles))
+
 
+def permissions_checker(required_permissions: Tuple[str]):
+    return authorization_checker(
+        authorization_engine.requirement(permission_names=required_permissions)
+    )
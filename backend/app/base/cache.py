@@ -0,0 +1,20 @@
+from backend.app.utils.cache import TokenCache, EpochRegistry
+from backend.app.base.config import settings
+
+# Verified access tokens and the principal they resolve to, along with
+# their token id, kept for a short time
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE, max_ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+# Verified claims of the access tokens minted on claims mode. Kept apart
+# from the token cache, since claims-less tokens are cached there
+claims_cache = TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
+
+# Resolved service-account API keys, kept for a short time
+api_key_cache = TokenCache(max_size=settings.API_KEY_CACHE_MAX_SIZE)
+
+# Token epochs of users whose tokens were revoked, reloaded by every worker
+# on the notifications of USER_EPOCHS_CHANNEL
+USER_EPOCHS_CHANNEL = "user_epochs"
+user_epochs = EpochRegistry()
@@ -26,6 +26,7 @@ DEFAULT_FIRST_SUPER_ADMIN_EMAIL="super_admin@example.com"
 # Token expiration times
 DEFAULT_ACCESS_TIMEOUT_MINUTES = timedelta(minutes=30)
 DEFAULT_REFRESH_TIMEOUT_MINUTES = timedelta(minutes=60)
+DEFAULT_CLAIMS_TIMEOUT_MINUTES = timedelta(minutes=5)
 
 # Project settings
 with open("pyproject.toml", "r") as f:
@@ -69,8 +70,7 @@ def is_docker(environment):
 
 
 def parse_cors(v: Any) -> Union[List[str], str]:
-    maybe_list=not v.startswith("[") and not v.endswith("]")
-    is_not_list=isinstance(v, str) and maybe_list
+    is_not_list=isinstance(v, str) and not v.startswith("[") and not v.endswith("]")
     if is_not_list:
         return [i.strip() for i in v.split(",")]
     elif isinstance(v, (list, str)):
@@ -97,6 +97,100 @@ class Settings(BaseSettings):
     COOKIE_SECRET_KEY: str = DEFAULT_SECRET_KEY
     JWT_SECRET_KEY: str = DEFAULT_SECRET_KEY
     JWT_ALGORITHM: str = 'HS256'
+
+    # Asymmetric algorithms (ES256) sign with the '<kid>.pem' private keys
+    # of JWT_KEYS_DIR; JWT_ACTIVE_KEY_ID selects the signing key
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KEY_ID: str | None = None
+    JWKS_CACHE_MAX_AGE_SECONDS: int = 3600
+
+    # Service-account API keys: HMAC key of the stored secret digests,
+    # maximum lifetime of a key, and lifetime and size of the cache of
+    # resolved keys. Revocations only clear the cache of the worker serving
+    # them, so the lifetime bounds how long other workers accept a key
+    API_KEY_SECRET_KEY: str = DEFAULT_SECRET_KEY
+    API_KEY_MAX_EXPIRES_IN_DAYS: int = 365
+    API_KEY_CACHE_TTL_SECONDS: int = 5
+    API_KEY_CACHE_MAX_SIZE: int = 1024
+
+    # Maximum number of verified tokens kept in memory, and seconds a token
+    # resolved to a user is trusted before the user is read again. Cache
+    # invalidation is per worker, so this bounds staleness on other workers
+    TOKEN_CACHE_MAX_SIZE: int = 1024
+    TOKEN_CACHE_TTL_SECONDS: int = 5
+
+    # Password hash scheme, 'bcrypt' or 'argon2' (requires passlib[argon2]),
+    # and its cost, calibrated with 'make calibrate-hashing'. Stored hashes of
+    # another scheme or cost are rehashed on login.
+    PASSWORD_HASH_SCHEME: str = 'bcrypt'
+    PASSWORD_HASH_COST: int | None = None
+
+    # Password hashing executor: 'thread' or 'process'
+    PASSWORD_HASHING_EXECUTOR: str = 'thread'
+    PASSWORD_HASHING_WORKERS: int = 4
+    PASSWORD_HASHING_MAX_QUEUE: int = 64
+
+    # Login flood protection: failed attempts per username and per client
+    # IP before a lockout, counting window, lockout durations (doubling with
+    # every further failure), lockouts mirrored in process and lifetime of
+    # the Redis negative cache of nonexistent usernames
+    LOGIN_MAX_FAILURES_PER_USERNAME: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 50
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 900
+    LOGIN_LOCKOUT_BASE_SECONDS: int = 1
+    LOGIN_LOCKOUT_MAX_SECONDS: int = 900
+    LOGIN_LOCKOUT_CACHE_SIZE: int = 4096
+    LOGIN_UNKNOWN_USERNAME_TTL_SECONDS: int = 60
+    LOGIN_REDIS_TIMEOUT_SECONDS: float = 0.05
+
+    # Write-behind of last login times and access tokens: seconds between
+    # flushes, and users per batched UPDATE
+    LOGIN_FLUSH_INTERVAL_SECONDS: float = 5.0
+    LOGIN_FLUSH_BATCH_SIZE: int = 1000
+
+    # Rate limiting: default algorithm of the policies ('token_bucket',
+    # 'gcra' or 'sliding_log') and timeout of the Redis decisions
+    RATE_LIMIT_ALGORITHM: str = "gcra"
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.05
+
+    # Rate limiting backend: 'redis' decides every request on Redis,
+    # 'two_tier' on local buckets holding a share of every budget (e.g. one
+    # over the number of workers), synced with Redis in batches, and
+    # 'shared_memory' on a table shared by the workers of a host, no Redis
+    RATE_LIMIT_BACKEND: str = "two_tier"
+    RATE_LIMIT_LOCAL_SHARE: float = 0.25
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 100_000
+    RATE_LIMIT_SYNC_INTERVAL_SECONDS: float = 0.5
+    RATE_LIMIT_SYNC_BATCH_SIZE: int = 500
+    RATE_LIMIT_SHARED_MEMORY_PATH: str = "/dev/shm/auth_rate_limits"
+    RATE_LIMIT_SHARED_MEMORY_SLOTS: int = 65536
+    RATE_LIMIT_SHARED_MEMORY_STRIPES: int = 64
+
+    # Rate policies and the authorization engine are read from the roles
+    # tables, and reloaded on the notifications of role changes. Seconds
+    # between reconnections of the listeners, and between checks of their
+    # connection
+    ROLE_LISTENER_RECONNECT_SECONDS: float = 1.0
+
+    # Access token revocation: expected revoked tokens, Bloom filter false
+    # positive rate, seconds between syncs of the local filter with Redis,
+    # timeouts of the lookups and of the background rebuilds of the filter,
+    # and whether tokens are checked on Redis, and rejected when it is
+    # unreachable, until a first rebuild succeeds. Deployments without Redis
+    # (e.g. RATE_LIMIT_BACKEND 'shared_memory') disable the latter
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 1.0
+    REVOCATION_REDIS_TIMEOUT_SECONDS: float = 0.05
+    REVOCATION_REBUILD_TIMEOUT_SECONDS: float = 5.0
+    REVOCATION_FAIL_CLOSED: bool = True
+
+    # Maximum number of tokens per introspection request
+    INTROSPECTION_MAX_TOKENS: int = 1000
+
+    # Maximum number of subjects and permissions per authorization check
+    AUTHZ_CHECK_MAX_SUBJECTS: int = 500
+    AUTHZ_CHECK_MAX_PERMISSIONS: int = 200
     
     MAIL_USERNAME: str = "your_email@example.com"
     MAIL_PASSWORD: str = "your_password"
@@ -114,6 +208,21 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: timedelta = DEFAULT_ACCESS_TIMEOUT_MINUTES
     REFRESH_TOKEN_EXPIRE_MINUTES: timedelta = DEFAULT_REFRESH_TIMEOUT_MINUTES
 
+    # Authorize from signed role/permission claims instead of the database
+    AUTH_CLAIMS_MODE: bool = False
+    CLAIMS_TOKEN_EXPIRE_MINUTES: timedelta = DEFAULT_CLAIMS_TIMEOUT_MINUTES
+
+    # Reverse proxies (IPs or CIDR networks) whose X-Forwarded-For header is
+    # trusted to carry the client IP. Without any, the header is ignored
+    TRUSTED_PROXIES: Annotated[
+        Union[List[str], str], BeforeValidator(parse_cors)
+    ] = []
+
+    # OAuth2 client ids issued opaque access tokens, backed by Redis
+    OPAQUE_TOKEN_CLIENTS: Annotated[
+        Union[List[str], str], BeforeValidator(parse_cors)
+    ] = []
+
     # CORS
     BACKEND_CORS_ORIGINS: Annotated[
         Union[List[AnyUrl], str], BeforeValidator(parse_cors)
@@ -142,6 +251,7 @@ class Settings(BaseSettings):
             f"{API_V1_STR}/redoc",
             f"{API_V1_STR}/health",
             f"{API_V1_STR}/health/*",
+            "/.well-known/*",
         ]
 
     @computed_field
@@ -294,6 +404,7 @@ class Settings(BaseSettings):
         default_tuples = [
             ("JWT_SECRET_KEY", self.JWT_SECRET_KEY, DEFAULT_SECRET_KEY),
             ("COOKIE_SECRET_KEY", self.COOKIE_SECRET_KEY, DEFAULT_SECRET_KEY),
+            ("API_KEY_SECRET_KEY", self.API_KEY_SECRET_KEY, DEFAULT_SECRET_KEY),
             ("POSTGRES_PASSWORD", self.POSTGRES_PASSWORD, DEFAULT_POSTGRES_PASSWORD),
             ("FIRST_SUPER_ADMIN_USERNAME", self.FIRST_SUPER_ADMIN_USERNAME, DEFAULT_FIRST_SUPER_ADMIN_USERNAME),
             ("FIRST_SUPER_ADMIN_PASSWORD", self.FIRST_SUPER_ADMIN_PASSWORD, DEFAULT_FIRST_SUPER_ADMIN_PASSWORD),
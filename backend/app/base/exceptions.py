@@ -33,6 +33,22 @@ class PrivilegesException(HTTPException):
         )
 
 
+class ForbiddenSubjectException(HTTPException):
+    def __init__(self, username):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"You can't check the authorizations of {username}",
+        )
+
+
+class APIKeyCreationException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API keys can't be created with an API key",
+        )
+
+
 class InexistentUsernameException(HTTPException):
     def __init__(self, username):
         super().__init__(
@@ -98,6 +114,14 @@ class ExpiredTokenException(HTTPException):
         )
 
 
+class RevokedTokenException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="This token has been revoked. Please log in again to obtain a new token.",
+        )
+
+
 class MissingRequiredClaimException(HTTPException):
     def __init__(
         self,
@@ -125,10 +149,29 @@ class RatePolicyException(HTTPException):
         )
 
 class TooManyRequestsException(HTTPException):
-    def __init__(self):
+    def __init__(self, headers: dict | None = None):
         super().__init__(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many requests. Please try again later.",
+            headers=headers,
+        )
+
+
+class LoginLockedException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class HashingQueueFullException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress. Please try again later.",
+            headers={"Retry-After": "1"},
         )
 
 
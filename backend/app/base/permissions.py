@@ -0,0 +1,6 @@
+from backend.app.utils.permissions import PermissionRegistry
+from backend.app.data.auth import ROLES_METADATA
+
+# Bit positions of the permissions, seeded from the system roles and
+# reconciled with the database on startup
+permission_registry = PermissionRegistry.from_roles_metadata(ROLES_METADATA)
@@ -9,7 +9,8 @@ loose_rate=get_minute_rate_limiter(40)
 regular_rate=get_minute_rate_limiter(25)
 strict_rate=get_minute_rate_limiter(10)
 
-# System roles and associated permissions
+# System roles and associated permissions. A role may list parent roles
+# under 'inherits', whose permissions it is granted as well
 ROLES_METADATA = {
     "SuperAdmin": {
         "permissions": [
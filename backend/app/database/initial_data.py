@@ -5,7 +5,7 @@ from sqlalchemy.exc import IntegrityError
 from psycopg2.errors import UniqueViolation
 
 from backend.app.database.models.users import User
-from backend.app.utils.security import hash_string
+from backend.app.services.hashing import password_hasher
 from backend.app.base.config import settings
 from backend.app.base.logging import logger
 from backend.app.data.auth import ROLES_METADATA
@@ -36,11 +36,12 @@ async def insert_initial_users():
     async with role_repository_async_context_manager() as role_repository: 
         super_admin_role = await role_repository.get_role_by_name("SuperAdmin")
 
+    hashed_password = await password_hasher.hash(settings.FIRST_SUPER_ADMIN_PASSWORD)
     first_super_admin_user = User(
         user_id=uuid4(),
         user_created_at=datetime.now(),
         user_username=settings.FIRST_SUPER_ADMIN_USERNAME,
-        user_hashed_password=hash_string(settings.FIRST_SUPER_ADMIN_PASSWORD),
+        user_hashed_password=hashed_password,
         user_email=settings.FIRST_SUPER_ADMIN_EMAIL,
         user_roles=[super_admin_role],
         user_is_active=True,
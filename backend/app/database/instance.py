@@ -7,6 +7,9 @@ from backend.app.database.core import Database
 is_testing = settings.ENVIRONMENT == "testing"
 uri = settings.database_uri if not is_testing else settings.test_database_uri
 
+# Plain asyncpg DSN of the connections listening to notifications
+listen_uri = uri.replace("+asyncpg", "")
+
 database = None
 
 # Global variable to hold the database instance
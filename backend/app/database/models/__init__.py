@@ -2,6 +2,8 @@ from .base import Base
 from .users import User
 from .auth import Role, Permission
 from .logging import RequestLog, TaskLog
+from .tokens import RefreshToken
+from .api_keys import APIKey
 
 
 __all__ = [
@@ -10,5 +12,7 @@ __all__ = [
     "RequestLog",
     "TaskLog",
     "Role",
-    "Permission"
+    "Permission",
+    "RefreshToken",
+    "APIKey",
 ]
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, DateTime, UUID, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from .base import Base
+
+
+class APIKey(Base):
+    __tablename__ = 'api_keys'
+
+    apke_id = Column(UUID, primary_key=True, default=uuid4)
+    apke_name = Column(String, nullable=False)
+    apke_prefix = Column(String(16), unique=True, index=True, nullable=False)
+    apke_secret_digest = Column(String(64), nullable=False)
+    apke_user_id = Column(
+        UUID, ForeignKey('users.user_id', ondelete='CASCADE'), index=True, nullable=False
+    )
+    apke_created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    apke_expires_at = Column(DateTime(timezone=True), default=None, nullable=True)
+    apke_revoked_at = Column(DateTime(timezone=True), default=None, nullable=True)
+
+    apke_user = relationship('User')
+
+    def __repr__(self):
+        return f"APIKey({self.apke_name}, {self.apke_prefix})"
+
+    @property
+    def is_revoked(self) -> bool:
+        return self.apke_revoked_at is not None
+
+    @property
+    def is_expired(self) -> bool:
+        return self.apke_expires_at is not None \
+            and self.apke_expires_at <= datetime.now(timezone.utc)
+
+    def to_dict(self):
+        return {
+            "name": self.apke_name,
+            "prefix": self.apke_prefix,
+            "created_at": self.apke_created_at,
+            "expires_at": self.apke_expires_at,
+            "revoked_at": self.apke_revoked_at,
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, ForeignKey, Table
+from sqlalchemy import Column, String, Integer, UUID, ForeignKey, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSON
 from uuid import uuid4
@@ -19,6 +19,7 @@ class Permission(Base):
     __tablename__ = 'permissions'
     perm_id = Column(UUID, primary_key=True, default=uuid4)
     perm_name = Column(String, unique=True, nullable=False)
+    perm_bit = Column(Integer, unique=True, nullable=True)
 
     # Relationship to RolePermission association table
     perm_roles = relationship(
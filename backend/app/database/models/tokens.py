@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, UUID, ForeignKey
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from .base import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+
+    reto_id = Column(UUID, primary_key=True, default=uuid4)
+    reto_token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    reto_user_id = Column(
+        UUID, ForeignKey('users.user_id', ondelete='CASCADE'), index=True, nullable=False
+    )
+    reto_family_id = Column(UUID, index=True, nullable=False, default=uuid4)
+    reto_created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    reto_expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    reto_revoked_at = Column(DateTime(timezone=True), default=None, nullable=True)
+
+    def __repr__(self):
+        return f"RefreshToken({self.reto_user_id}, {self.reto_family_id})"
+
+    @property
+    def is_revoked(self) -> bool:
+        return self.reto_revoked_at is not None
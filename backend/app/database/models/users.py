@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Boolean, DateTime, UUID, ForeignKey, Table
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, UUID, ForeignKey, Table
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, List, Iterable
 from uuid import uuid4
 
 from . import Base
@@ -26,7 +26,7 @@ class User(Base):
     user_hashed_password = Column(String, nullable=False)
     user_is_active = Column(Boolean, default=True)
     user_access_token = Column(String, nullable=True)
-    user_refresh_token = Column(String, nullable=True)
+    user_token_epoch = Column(Integer, default=0, nullable=False)
 
     user_roles = relationship(
         'Role', secondary=users_roles_association, back_populates='role_users', cascade="all"
@@ -38,6 +38,24 @@ class User(Base):
     def __str__(self):
         return self.__repr__()
 
+    @property
+    def role_names(self) -> List[str]:
+        return [role.role_name for role in self.user_roles]
+
+    @property
+    def permission_names(self) -> List[str]:
+        return sorted({
+            role_permission.permission.perm_name
+            for role in self.user_roles
+            for role_permission in role.role_permissions
+        })
+
+    def has_roles(self, role_names: Iterable[str]) -> bool:
+        return not set(role_names).isdisjoint(self.role_names)
+
+    def has_permissions(self, permission_names: Iterable[str]) -> bool:
+        return set(permission_names).issubset(self.permission_names)
+
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, User):
             equal_username=self.user_username == other.user_username
@@ -4,6 +4,10 @@ from backend.app.base.auth import validate_refresh_token
 
 from backend.app.models.users import User
 from backend.app.repositories.auth import get_role_repository
+from backend.app.repositories.tokens import (
+    RefreshTokenRepository, get_refresh_token_repository,
+)
+from backend.app.repositories.api_keys import APIKeyRepository, get_api_key_repository
 
 RefreshTokenDependency = Annotated[
     Tuple[User, str], Depends(validate_refresh_token)
@@ -11,3 +15,10 @@ RefreshTokenDependency = Annotated[
 
 RoleRepositoryDepends = Depends(get_role_repository)
 
+RefreshTokenRepositoryDepends = Annotated[
+    RefreshTokenRepository, Depends(get_refresh_token_repository)
+]
+
+APIKeyRepositoryDepends = Annotated[
+    APIKeyRepository, Depends(get_api_key_repository)
+]
@@ -5,6 +5,7 @@ from fastapi.middleware.gzip import GZipMiddleware
 from .logging import RequestLoggingMiddleware
 from backend.app.middlewares.throttling import RateLimitMiddleware
 from backend.app.middlewares.validation import RouteValidationMiddleware
+from backend.app.middlewares.forward_auth import ForwardAuthMiddleware
 from backend.app.base.config import settings
 
 # Response size in bytes to trigger GZip compression
@@ -33,3 +34,5 @@ def add_middlewares(app: FastAPI):
             allow_headers=["*"],
         )
 
+    # Forward-auth subrequests are answered before any other middleware
+    app.add_middleware(ForwardAuthMiddleware)
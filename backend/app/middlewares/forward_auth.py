@@ -0,0 +1,79 @@
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.app.base.auth import resolve_principal
+from backend.app.base.config import settings
+
+FORWARD_AUTH_PATH = f"{settings.API_V1_STR}/auth/verify"
+
+BEARER_PREFIX = b"bearer "
+UNAUTHORIZED_HEADERS = [
+    (b"www-authenticate", b"Bearer"),
+    (b"content-length", b"0"),
+]
+
+
+def get_bearer_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            if value[:len(BEARER_PREFIX)].lower() == BEARER_PREFIX:
+                return value[len(BEARER_PREFIX):].decode("latin-1").strip()
+
+            return None
+
+    return None
+
+
+def get_principal_headers(principal) -> list:
+    return [
+        (b"x-auth-user-id", str(principal.user_id).encode("latin-1")),
+        (b"x-auth-username", principal.user_username.encode("utf-8")),
+        (b"x-auth-roles", ",".join(principal.role_names).encode("utf-8")),
+        (b"content-length", b"0"),
+    ]
+
+
+class ForwardAuthMiddleware:
+    """
+    Verification endpoint for reverse proxy subrequests ('auth_request',
+    'forwardAuth'). Requests to FORWARD_AUTH_PATH are answered here, as a
+    pure ASGI middleware placed outside the logging, throttling and GZip
+    ones, and never reach the router.
+
+    The bearer token is validated as on every other route. Valid tokens get
+    a 200 with the user id, username and roles as response headers; invalid
+    or missing tokens get a 401. Responses carry no body.
+    """
+
+    def __init__(self, app: ASGIApp, path: str = FORWARD_AUTH_PATH):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        status_code, headers = await self.verify(scope)
+
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers,
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+    async def verify(self, scope: Scope):
+        token = get_bearer_token(scope)
+
+        if not token:
+            return 401, UNAUTHORIZED_HEADERS
+
+        try:
+            principal = await resolve_principal(token)
+        except HTTPException as e:
+            # Server side failures are not reported as invalid credentials
+            status_code = e.status_code if e.status_code >= 500 else 401
+            return status_code, UNAUTHORIZED_HEADERS
+
+        return 200, get_principal_headers(principal)
@@ -7,7 +7,7 @@ from backend.app.utils.request import get_token, get_route
 from backend.app.base.exceptions import MissingTokenException
 from backend.app.repositories.logging import log_repository_context_manager
 from backend.app.utils.throttling import ip_identifier
-from backend.app.base.auth import get_current_user
+from backend.app.base.auth import get_request_user
 from backend.app.base.config import settings
 
 
@@ -37,7 +37,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                     if not token:
                         raise MissingTokenException()
                     
-                    current_user = await get_current_user(token)
+                    current_user = await get_request_user(request, token)
                     user_id = current_user.user_id
                 else:
                     user_id = await ip_identifier(request)
@@ -1,77 +1,69 @@
-from fastapi import FastAPI, Request
-from fastapi_limiter import FastAPILimiter
-from fastapi_limiter.depends import RateLimiter
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
-from typing import Callable, Awaitable
-from redis import asyncio as aioredis
-from typing import Union
+from starlette.types import ASGIApp
+from redis.exceptions import RedisError
+from typing import Callable
 
 from backend.app.utils.throttling import ip_identifier
 from backend.app.utils.request import get_token, get_route
-from backend.app.base.auth import get_current_user
-from backend.app.database.models.users import User
+from backend.app.base.auth import get_request_user
+from backend.app.repositories.auth import role_repository_async_context_manager
+from backend.app.services.rate_limiter import get_rate_limiter, fallback_rate_limiter
+from backend.app.services.rate_policies import rate_policy_registry, RATE_POLICIES_CHANNEL
+from backend.app.services.listeners import NotificationListener
+from backend.app.database.instance import listen_uri
 from backend.app.base.exceptions import (
     MissingTokenException, TooManyRequestsException, RatePolicyException
 )
 from backend.app.base.config import settings
-from backend.app.data.auth import ROLES_METADATA
 from backend.app.base.logging import logger
 
-# Define rate limiting policy
-class RateLimiterPolicy:
-    def __init__(
-        self, 
-        times: int = 5,
-        hours: int = 0, 
-        minutes: int = 1, 
-        seconds: int = 0, 
-        milliseconds: int = 0
-    ):
-        self.times = times
-        self.interval_seconds = (
-            hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
-        )
-
-    def throughput(self) -> float:
-        """Calculate the throughput based on policy."""
-        return self.times / self.interval_seconds if self.interval_seconds > 0 else float("inf")
-
-    def __repr__(self) -> str:
-        return f"RateLimiterPolicy({self.interval_seconds})"
-
-async def init_redis_pool():
-    """Initialize Redis connection pool asynchronously."""
-    return await aioredis.Redis.from_url(settings.redis_url)
+# Policy of anonymous requests, and of users without a role policy
+DEFAULT_RATE_POLICY = rate_policy_registry.default_policy
 
 
 async def init_rate_limiter():
-    """Initialize FastAPI rate limiter with Redis connection."""
-    redis = await init_redis_pool()
-    await FastAPILimiter.init(redis)
+    """Preload the rate limiting scripts on Redis, or the shared memory table."""
+    try:
+        await get_rate_limiter().initialize()
+
+    except (RedisError, OSError) as e:
+        logger.warning(f"Rate limiter not initialized, enforcing local limits: {e}")
+        return
+
     logger.info("Rate limiter initialized!")
 
 
-def get_rate_limiter(
-        policy: RateLimiterPolicy = RateLimiterPolicy()
-    ) -> RateLimiter:
-    """Get configured RateLimiter based on policy."""
-    return RateLimiter(
-        times=policy.times,
-        milliseconds=int(policy.interval_seconds * 1000)
-    )
+async def load_rate_policies():
+    """
+    Load the rate policies of the roles table, and precompile the ones of
+    the role sets of the users.
+    """
+    async with role_repository_async_context_manager() as role_repository:
+        role_policies = await role_repository.get_role_rate_policies()
+        role_sets = await role_repository.get_user_role_sets()
+
+    rate_policy_registry.load(role_policies, role_sets)
+    logger.info(f"Rate policies compiled for {len(rate_policy_registry)} role sets")
 
-def get_user_rate_policy(user: User) -> RateLimiterPolicy:
-    """Determine the most permissive rate policy based on user roles."""
-    rate_policies = [
-        ROLES_METADATA[role.role_name]['rate_policy']
-        for role in user.user_roles
-        if role.role_name in ROLES_METADATA
-    ]
-    return max(rate_policies, key=lambda p: p.throughput(), default=RateLimiterPolicy())
+
+# Reloads the rate policies on changes made by any worker
+rate_policy_listener = NotificationListener(
+    listen_uri,
+    load_rate_policies,
+    channel=RATE_POLICIES_CHANNEL,
+    subject="rate policies",
+    reconnect_interval=settings.ROLE_LISTENER_RECONNECT_SECONDS,
+)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp, rate_limiter=None):
+        super().__init__(app)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         route = get_route(request)
 
@@ -81,17 +73,34 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 raise MissingTokenException()
 
             try:
-                current_user = await get_current_user(token)
-                rate_policy = get_user_rate_policy(current_user)
+                current_user = await get_request_user(request, token)
+                rate_policy = rate_policy_registry.resolve(current_user.role_set)
             except Exception as e:
                 logger.error(f"Error retrieving current user: {e}")
-                raise RatePolicyException("Unable to retrieve user rate policy")
+                raise RatePolicyException()
+
+            key = f"user:{current_user.user_id}"
         else:
-            rate_policy = RateLimiterPolicy()
+            rate_policy = DEFAULT_RATE_POLICY
+            key = f"ip:{await ip_identifier(request)}"
+
+        decision = await self.rate_limiter.hit(key, rate_policy)
+
+        # Local limits are enforced while Redis is unavailable
+        if decision is None:
+            decision = fallback_rate_limiter.hit(key, rate_policy)
+
+        headers = decision.headers(rate_policy.interval_seconds)
+
+        if not decision.allowed:
+            exception = TooManyRequestsException(headers)
+            return JSONResponse(
+                {"detail": exception.detail},
+                status_code=exception.status_code,
+                headers=exception.headers,
+            )
 
-        limiter = get_rate_limiter(rate_policy)
-        
-        # Use RateLimiter dependency for rate limiting
-        await limiter(request)
+        response = await call_next(request)
+        response.headers.update(headers)
 
-        return await call_next(request)
+        return response
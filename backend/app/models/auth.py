@@ -0,0 +1,169 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from backend.app.utils.permissions import decode_bitmap
+from backend.app.base.permissions import permission_registry
+from backend.app.base.config import settings
+
+
+class Principal:
+    """
+    Immutable principal of an authenticated request: the user identity,
+    its roles and a bitmap of its permissions. Built from a narrow
+    projection of the users and roles tables, with no ORM entity.
+
+    The permission bitmap was computed on the role graph `graph_version`;
+    a None version means the bitmap is authoritative, as signed on a token.
+    The role set is hashed once, as the key of per role set lookups such as
+    the rate policy registry.
+    """
+
+    __slots__ = (
+        "user_id",
+        "user_username",
+        "user_is_active",
+        "role_ids",
+        "role_names",
+        "role_set",
+        "permission_bitmap",
+        "graph_version",
+    )
+
+    def __init__(
+        self,
+        user_id,
+        user_username: str,
+        user_is_active: bool = True,
+        role_ids: Iterable = (),
+        role_names: Iterable[str] = (),
+        permission_bitmap: int = 0,
+        graph_version: int | None = None,
+    ):
+        role_names = tuple(role_names)
+        role_set = frozenset(role_names)
+        # Frozen sets cache their hash, computed here once per principal
+        hash(role_set)
+
+        self._set(
+            user_id=user_id,
+            user_username=user_username,
+            user_is_active=user_is_active,
+            role_ids=tuple(role_ids),
+            role_names=role_names,
+            role_set=role_set,
+            permission_bitmap=permission_bitmap,
+            graph_version=graph_version,
+        )
+
+    def _set(self, **attributes) -> None:
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def permission_names(self) -> List[str]:
+        return permission_registry.names(self.permission_bitmap)
+
+    def has_roles(self, role_names: Iterable[str]) -> bool:
+        return not set(role_names).isdisjoint(self.role_names)
+
+    def has_permissions(self, permission_names: Iterable[str]) -> bool:
+        return permission_registry.covers(self.permission_bitmap, permission_names)
+
+    def __repr__(self) -> str:
+        return f"Principal({self.user_username})"
+
+
+class TokenClaims(Principal):
+    """
+    Principal built from the verified claims of an access token, used to
+    authorize requests without loading the user from the database.
+
+    Permissions are held as a bitmap of the permission registry.
+    """
+
+    __slots__ = ("epoch", "token_id", "expires_at")
+
+    def __init__(
+        self,
+        user_id: str,
+        user_username: str,
+        role_names: List[str],
+        permission_names: Iterable[str] = (),
+        epoch: int = 0,
+        token_id: str | None = None,
+        permission_bitmap: int | None = None,
+        expires_at: int | None = None,
+    ):
+        if permission_bitmap is None:
+            permission_bitmap = permission_registry.bitmap(permission_names)
+
+        super().__init__(
+            user_id=user_id,
+            user_username=user_username,
+            role_names=role_names,
+            permission_bitmap=permission_bitmap,
+        )
+        self._set(epoch=epoch, token_id=token_id, expires_at=expires_at)
+
+    @classmethod
+    def from_payload(cls, payload: dict):
+        return cls(
+            user_id=payload["uid"],
+            user_username=payload["sub"],
+            role_names=payload.get("rol", []),
+            epoch=payload.get("epc", 0),
+            token_id=payload.get("jti"),
+            permission_bitmap=decode_bitmap(payload.get("pbm", "")),
+            expires_at=payload.get("exp"),
+        )
+
+    def __repr__(self) -> str:
+        return f"TokenClaims({self.user_username})"
+
+
+class TokenIntrospectionRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=settings.INTROSPECTION_MAX_TOKENS)
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    sub: Optional[str] = None
+    uid: Optional[str] = None
+    roles: List[str] = []
+    exp: Optional[int] = None
+    jti: Optional[str] = None
+
+
+class AuthorizationCheckRequest(BaseModel):
+    subjects: List[str] = Field(..., min_length=1, max_length=settings.AUTHZ_CHECK_MAX_SUBJECTS)
+    permissions: List[str] = Field(..., min_length=1, max_length=settings.AUTHZ_CHECK_MAX_PERMISSIONS)
+
+
+class AuthorizationMatrix(BaseModel):
+    subjects: List[str]
+    permissions: List[str]
+    # A row per subject, with a '1' or '0' per permission
+    matrix: List[str]
+
+
+class APIKeyCreateRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64)
+    # Every key expires, at the latest after API_KEY_MAX_EXPIRES_IN_DAYS
+    expires_in_days: int = Field(
+        settings.API_KEY_MAX_EXPIRES_IN_DAYS, ge=1, le=settings.API_KEY_MAX_EXPIRES_IN_DAYS
+    )
+
+
+class APIKeyCreated(BaseModel):
+    name: str
+    prefix: str
+    # Only returned on creation
+    key: str
+    expires_at: Optional[datetime] = None
@@ -1,4 +1,3 @@
-
 class RateLimiterPolicy:
     def __init__(
             self, 
@@ -6,13 +5,39 @@ class RateLimiterPolicy:
             hours: int = 0, 
             minutes: int = 1, 
             seconds: int = 0, 
-            milliseconds: int = 0
+            milliseconds: int = 0,
+            algorithm: str | None = None,
         ):
         self.times = times
         self.hours = hours
         self.minutes = minutes
         self.seconds = seconds
         self.milliseconds = milliseconds
+        # Rate limiting algorithm, the limiter default if None
+        self.algorithm = algorithm
+
+        # Limits are divided by both, e.g. into refill rates
+        if times <= 0:
+            raise ValueError(f"Rate limit times must be positive, got {times}")
+
+        if self.interval_seconds <= 0:
+            raise ValueError(f"Rate limit interval must be positive, got {self.interval_seconds}s")
+
+    @property
+    def interval_seconds(self) -> float:
+        return (
+            self.hours * 3600 + self.minutes * 60 + self.seconds + self.milliseconds / 1000
+        )
+
+    def throughput(self) -> float:
+        """Calculate the throughput based on policy."""
+        return self.times / self.interval_seconds
+
+    @classmethod
+    def from_dict(cls, rate_limit: dict):
+        # Stored rate limits, e.g. a role 'role_rate_limit'
+        fields = ("times", "hours", "minutes", "seconds", "milliseconds", "algorithm")
+        return cls(**{field: rate_limit[field] for field in fields if field in rate_limit})
 
     def __dict__(self):
         return {
@@ -20,8 +45,9 @@ class RateLimiterPolicy:
             "hours": self.hours,
             "minutes": self.minutes,
             "seconds": self.seconds,
-            "milliseconds": self.milliseconds
+            "milliseconds": self.milliseconds,
+            "algorithm": self.algorithm,
         }
         
     def to_dict(self):
-        return self.__dict__()
\ No newline at end of file
+        return self.__dict__()
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, model_validator
 from typing import Optional
 
-from backend.app.utils.security import hash_string
+from backend.app.services.hashing import password_hasher
 
 class BaseUser(BaseModel):
     user_username: Optional[str] = None
@@ -29,11 +29,12 @@ class UnhashedUpdateUser(BaseUser):
 
         return values
     
-    def to_update_user(self) -> UpdateUser:
+    async def to_update_user(self) -> UpdateUser:
         update_user_data = self.model_dump(exclude_unset=True)
         
         if 'user_password' in update_user_data:
-            update_user_data['user_hashed_password'] = hash_string(update_user_data['user_password'])
+            password = update_user_data['user_password']
+            update_user_data['user_hashed_password'] = await password_hasher.hash(password)
             del update_user_data['user_password']
 
         return UpdateUser(**update_user_data)
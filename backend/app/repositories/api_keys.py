@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from secrets import token_hex, token_urlsafe
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy import update
+from typing import List, Tuple
+
+from backend.app.database.models.api_keys import APIKey
+from backend.app.database.models.users import User
+from backend.app.database.instance import get_session
+from backend.app.utils.security import hmac_token
+from backend.app.base.config import settings
+
+API_KEY_PREFIX = "ak_"
+API_KEY_SEPARATOR = "."
+
+
+def is_api_key(token: str) -> bool:
+    return token.startswith(API_KEY_PREFIX)
+
+
+def split_api_key(key: str) -> Tuple[str, str] | None:
+    """
+    Splits an API key of the form 'ak_<prefix>.<secret>'.
+
+    Args:
+        key (str): The API key.
+
+    Returns:
+        Tuple[str, str] | None: The prefix and the secret, or None if malformed.
+    """
+    prefix, separator, secret = key[len(API_KEY_PREFIX):].partition(API_KEY_SEPARATOR)
+
+    if not is_api_key(key) or not separator or not prefix or not secret:
+        return None
+
+    return prefix, secret
+
+
+def digest_api_key_secret(secret: str) -> str:
+    return hmac_token(secret, settings.API_KEY_SECRET_KEY)
+
+
+class APIKeyRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_api_key(
+        self, user_id, name: str, expires_at: datetime | None = None
+    ) -> Tuple[APIKey, str]:
+        """
+        Creates an API key for a user. Only the HMAC digest of the secret is
+        stored, so the key is returned this once.
+
+        Args:
+            user_id (UUID): The id of the key owner.
+            name (str): A name identifying the key.
+            expires_at (datetime, optional): The key expiration. Keys without one never expire.
+
+        Returns:
+            Tuple[APIKey, str]: The stored key row and the API key.
+        """
+        prefix, secret = token_hex(8), token_urlsafe(32)
+
+        api_key = APIKey(
+            apke_name=name,
+            apke_prefix=prefix,
+            apke_secret_digest=digest_api_key_secret(secret),
+            apke_user_id=user_id,
+            apke_expires_at=expires_at,
+        )
+
+        self.session.add(api_key)
+        await self.session.commit()
+
+        return api_key, f"{API_KEY_PREFIX}{prefix}{API_KEY_SEPARATOR}{secret}"
+
+    async def get_api_key_by_prefix(self, prefix: str) -> APIKey | None:
+        """
+        Retrieves an API key by its indexed prefix, with its owner and roles
+        eagerly loaded.
+
+        Args:
+            prefix (str): The key prefix.
+
+        Returns:
+            APIKey | None: The stored key, or None if unknown.
+        """
+        statement = select(APIKey).options(
+            selectinload(APIKey.apke_user).selectinload(User.user_roles)
+        ).where(APIKey.apke_prefix == prefix)
+        result = await self.session.execute(statement)
+
+        return result.scalars().first()
+
+    async def get_user_api_keys(self, user_id) -> List[APIKey]:
+        statement = select(APIKey).where(
+            APIKey.apke_user_id == user_id
+        ).order_by(APIKey.apke_created_at)
+        result = await self.session.execute(statement)
+
+        return result.scalars().all()
+
+    async def revoke_api_key(self, user_id, prefix: str) -> bool:
+        statement = update(APIKey).where(
+            APIKey.apke_user_id == user_id,
+            APIKey.apke_prefix == prefix,
+            APIKey.apke_revoked_at.is_(None),
+        ).values(apke_revoked_at=datetime.now(timezone.utc))
+
+        result = await self.session.execute(statement)
+        await self.session.commit()
+
+        return result.rowcount > 0
+
+
+async def get_api_key_repository():
+    async with get_session() as session:
+        yield APIKeyRepository(session)
+
+@asynccontextmanager
+async def api_key_repository_async_context_manager():
+    async with get_session() as session:
+        yield APIKeyRepository(session)
@@ -1,14 +1,47 @@
-from typing import List
+from typing import Dict, FrozenSet, List, Set, Tuple
 from uuid import uuid4
 from contextlib import asynccontextmanager
 from sqlalchemy.future import select
+from sqlalchemy import func, update, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from backend.app.database.models.auth import (
     RolePermission, Role, Permission
 )
+from backend.app.database.models.users import users_roles_association
+from backend.app.models.throttling import RateLimiterPolicy
 from backend.app.database.instance import get_session
+from backend.app.base.permissions import permission_registry
+from backend.app.utils.permissions import PermissionRegistry
+from backend.app.services.authorization import authorization_engine, AUTHORIZATION_CHANNEL
+from backend.app.services.rate_policies import RATE_POLICIES_CHANNEL
+from backend.app.base.logging import logger
+
+
+async def notify(session: AsyncSession, channel: str, payload: str) -> None:
+    # Delivered to the listening workers on commit, and dropped on rollback
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": channel, "payload": payload},
+    )
+
+
+# Key of the advisory lock serializing the allocation of permission bits
+PERMISSION_BITS_LOCK_KEY = 0x7065726D
+
+
+async def allocate_permission_bit(session: AsyncSession) -> int:
+    # The lock is held until the transaction ends, so that concurrent workers
+    # never read the same highest bit before either of them commits
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": PERMISSION_BITS_LOCK_KEY}
+    )
+    result = await session.execute(
+        select(func.coalesce(func.max(Permission.perm_bit) + 1, 0))
+    )
+
+    return result.scalar_one()
 
 
 class RoleRepository:
@@ -31,6 +64,7 @@ class RoleRepository:
         """
         role_id = str(uuid4())
         new_role = Role(role_id=role_id, role_name=role_name, role_rate_limit=rate_limit)
+        created_permissions = False
         
         try:
             # Iterate through permission names and assign them to the role
@@ -42,9 +76,14 @@ class RoleRepository:
 
                 # Create permission if it does not exist
                 if not permission:
-                    permission = Permission(perm_id=str(uuid4()), perm_name=perm_name)
+                    permission = Permission(
+                        perm_id=str(uuid4()),
+                        perm_name=perm_name,
+                        perm_bit=await allocate_permission_bit(self.session),
+                    )
                     self.session.add(permission)
                     await self.session.flush()  # Make sure it's persisted
+                    created_permissions = True
 
                 # Link the permission to the role via RolePermission
                 role_permission = RolePermission(rope_role_id=role_id, rope_perm_id=permission.perm_id)
@@ -52,8 +91,15 @@ class RoleRepository:
 
             # Add the new role with all permissions to the session
             self.session.add(new_role)
+            await self.notify_rate_policies(role_name)
+            await self.notify_authorization(role_name)
             await self.session.commit()
             await self.session.refresh(new_role)
+
+            if created_permissions:
+                await PermissionRepository(self.session).load_permission_registry()
+
+            await self.compile_authorization()
             
             return new_role
 
@@ -140,8 +186,11 @@ class RoleRepository:
         
         if role:
             role.role_permissions = new_permissions
+            await self.notify_authorization(role.role_name)
             await self.session.commit()
             await self.session.refresh(role)
+
+            await self.compile_authorization()
             return role
     
     async def update_role(self, role: Role):
@@ -152,7 +201,11 @@ class RoleRepository:
             role (Role): The role object to update.
         """
         await self.session.merge(role)
+        await self.notify_rate_policies(role.role_name)
+        await self.notify_authorization(role.role_name)
         await self.session.commit()
+
+        await self.compile_authorization()
     
     async def delete_role(self, role: Role) -> None:
         """
@@ -162,8 +215,85 @@ class RoleRepository:
             role (Role): The role object to delete.
         """
         await self.session.delete(role)
+        await self.notify_rate_policies(role.role_name)
+        await self.notify_authorization(role.role_name)
         await self.session.commit()
 
+        await self.compile_authorization()
+
+    async def get_role_permission_names(self) -> Dict[str, List[str]]:
+        """
+        Retrieves the permission names of every role with a single query.
+
+        Returns:
+            Dict[str, List[str]]: The permission names of each role.
+        """
+        query = (
+            select(Role.role_name, Permission.perm_name)
+            .outerjoin(RolePermission, RolePermission.rope_role_id == Role.role_id)
+            .outerjoin(Permission, Permission.perm_id == RolePermission.rope_perm_id)
+        )
+        result = await self.session.execute(query)
+
+        role_permission_names = {}
+        for role_name, permission_name in result.all():
+            permission_names = role_permission_names.setdefault(role_name, [])
+
+            if permission_name is not None:
+                permission_names.append(permission_name)
+
+        return role_permission_names
+
+    async def notify_rate_policies(self, role_name: str) -> None:
+        await notify(self.session, RATE_POLICIES_CHANNEL, role_name)
+
+    async def notify_authorization(self, role_name: str) -> None:
+        await notify(self.session, AUTHORIZATION_CHANNEL, role_name)
+
+    async def get_role_rate_policies(self) -> Dict[str, RateLimiterPolicy]:
+        """
+        Retrieves the rate policy of every role with a single query.
+
+        Returns:
+            Dict[str, RateLimiterPolicy]: The rate policy of each role.
+        """
+        result = await self.session.execute(select(Role.role_name, Role.role_rate_limit))
+
+        role_policies = {}
+        for role_name, rate_limit in result.all():
+            try:
+                role_policies[role_name] = RateLimiterPolicy.from_dict(rate_limit)
+
+            except (TypeError, ValueError) as e:
+                # The role falls back to the default policy
+                logger.error(f"Invalid rate limit of role {role_name}: {e}")
+
+        return role_policies
+
+    async def get_user_role_sets(self) -> Set[FrozenSet[str]]:
+        """
+        Retrieves the distinct role sets of the users with a single query.
+
+        Returns:
+            Set[FrozenSet[str]]: The role names of each distinct role set.
+        """
+        query = (
+            select(users_roles_association.c.user_id, Role.role_name)
+            .join(Role, Role.role_id == users_roles_association.c.role_id)
+        )
+        result = await self.session.execute(query)
+
+        user_role_names = {}
+        for user_id, role_name in result.all():
+            user_role_names.setdefault(user_id, set()).add(role_name)
+
+        return {frozenset(role_names) for role_names in user_role_names.values()}
+
+    async def compile_authorization(self) -> None:
+        # Recompiles the engine of this worker right away, the other workers
+        # recompile theirs on the notification of AUTHORIZATION_CHANNEL
+        authorization_engine.compile(await self.get_role_permission_names())
+
 
 class PermissionRepository:
     def __init__(self, session):
@@ -179,11 +309,19 @@ class PermissionRepository:
         Returns:
             Permission: The newly created permission object.
         """
-        new_permission = Permission(perm_name=permission_name)
+        new_permission = Permission(
+            perm_name=permission_name,
+            perm_bit=await allocate_permission_bit(self.session),
+        )
         
         self.session.add(new_permission)
+        await notify(self.session, AUTHORIZATION_CHANNEL, permission_name)
         await self.session.commit()
 
+        # Registers the bit on this worker right away, the other workers
+        # reload their registry on the notification of AUTHORIZATION_CHANNEL
+        await self.load_permission_registry()
+
         return new_permission
 
     async def get_permission_by_name(self, permission_name: str) -> Permission:
@@ -213,6 +351,52 @@ class PermissionRepository:
         permissions = result.scalars().all()
         return permissions
     
+    async def get_permission_bits(self) -> List[Tuple[str, int | None]]:
+        """
+        Retrieves the bit position of every permission.
+
+        Returns:
+            List[Tuple[str, int | None]]: Pairs of permission name and bit position.
+        """
+        query = select(Permission.perm_name, Permission.perm_bit)
+        result = await self.session.execute(query)
+
+        return [tuple(row) for row in result.all()]
+
+    async def assign_permission_bits(self) -> None:
+        """
+        Stores a bit position for every permission without one, e.g. those
+        created before bit positions were stored.
+        """
+        query = select(Permission.perm_name).where(Permission.perm_bit.is_(None))
+        result = await self.session.execute(query)
+
+        for permission_name in result.scalars().all():
+            statement = update(Permission).where(
+                Permission.perm_name == permission_name
+            ).values(perm_bit=await allocate_permission_bit(self.session))
+            await self.session.execute(statement)
+
+        await self.session.commit()
+
+    async def load_permission_registry(self) -> None:
+        """
+        Reloads the permission registry of this worker from the database:
+        stored bit positions win, and permissions only known locally are
+        assigned the next free bits.
+        """
+        await self.assign_permission_bits()
+
+        registry = PermissionRegistry()
+
+        for permission_name, bit in await self.get_permission_bits():
+            registry.register(permission_name, bit)
+
+        for permission_name, _ in permission_registry.items():
+            registry.register(permission_name)
+
+        permission_registry.replace(registry)
+
     async def update_permission(self, permission: Permission) -> None:
         """
         Updates an existing permission in the database.
@@ -221,6 +405,7 @@ class PermissionRepository:
             permission (Permission): The permission object with updated attributes.
         """
         await self.session.merge(permission)
+        await notify(self.session, AUTHORIZATION_CHANNEL, permission.perm_name)
         await self.session.commit()
 
     async def delete_permission(self, permission: Permission) -> None:
@@ -231,6 +416,7 @@ class PermissionRepository:
             permission (Permission): The permission object to delete.
         """
         await self.session.delete(permission)
+        await notify(self.session, AUTHORIZATION_CHANNEL, permission.perm_name)
         await self.session.commit()
 
 @asynccontextmanager
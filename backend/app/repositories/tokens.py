@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, update
+from jose import jwt
+from uuid import uuid4
+
+from backend.app.database.models.tokens import RefreshToken
+from backend.app.database.instance import get_session
+from backend.app.utils.security import hash_token
+
+DEFAULT_PURGE_BATCH_SIZE = 1000
+
+
+def build_refresh_token(user_id, token: str, family_id=None) -> RefreshToken:
+    """
+    Builds the stored row of a refresh token. The expiration is read from the
+    token claims, which were signed by this application.
+
+    Args:
+        user_id (UUID): The id of the token owner.
+        token (str): The encoded refresh token.
+        family_id (UUID, optional): The rotation family. A new family is started if None.
+
+    Returns:
+        RefreshToken: The (transient) refresh token row.
+    """
+    claims = jwt.get_unverified_claims(token)
+    expires_at = datetime.fromtimestamp(claims["exp"], timezone.utc)
+
+    return RefreshToken(
+        reto_token_hash=hash_token(token),
+        reto_user_id=user_id,
+        reto_family_id=family_id or uuid4(),
+        reto_expires_at=expires_at,
+    )
+
+
+class RefreshTokenRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_refresh_token(self, user_id, token: str, family_id=None) -> RefreshToken:
+        refresh_token = build_refresh_token(user_id, token, family_id)
+
+        self.session.add(refresh_token)
+        await self.session.commit()
+
+        return refresh_token
+
+    async def get_refresh_token(self, token: str) -> RefreshToken | None:
+        """
+        Retrieves a stored refresh token, revoked or not, by its hash.
+
+        Args:
+            token (str): The encoded refresh token.
+
+        Returns:
+            RefreshToken | None: The stored token, or None if unknown.
+        """
+        statement = select(RefreshToken).where(
+            RefreshToken.reto_token_hash == hash_token(token)
+        )
+        result = await self.session.execute(statement)
+
+        return result.scalars().first()
+
+    async def rotate_refresh_token(self, token: str, new_token: str) -> RefreshToken | None:
+        """
+        Revokes a refresh token and stores its successor on the same family.
+        The revocation only matches an active token, so a token can be rotated
+        at most once even under concurrent requests.
+
+        Args:
+            token (str): The refresh token being used.
+            new_token (str): The refresh token replacing it.
+
+        Returns:
+            RefreshToken | None: The new token row, or None if the token was not active.
+        """
+        statement = update(RefreshToken).where(
+            RefreshToken.reto_token_hash == hash_token(token),
+            RefreshToken.reto_revoked_at.is_(None),
+        ).values(
+            reto_revoked_at=datetime.now(timezone.utc)
+        ).returning(RefreshToken.reto_user_id, RefreshToken.reto_family_id)
+
+        result = await self.session.execute(statement)
+        row = result.first()
+
+        if row is None:
+            await self.session.rollback()
+            return None
+
+        user_id, family_id = row
+
+        return await self.create_refresh_token(user_id, new_token, family_id)
+
+    async def revoke_token_family(self, family_id) -> int:
+        """
+        Revokes every active token of a rotation family, e.g. when one of its
+        already rotated tokens is presented again.
+
+        Args:
+            family_id (UUID): The rotation family.
+
+        Returns:
+            int: The number of revoked tokens.
+        """
+        statement = update(RefreshToken).where(
+            RefreshToken.reto_family_id == family_id,
+            RefreshToken.reto_revoked_at.is_(None),
+        ).values(reto_revoked_at=datetime.now(timezone.utc))
+
+        result = await self.session.execute(statement)
+        await self.session.commit()
+
+        return result.rowcount
+
+    async def revoke_user_refresh_tokens(self, user_id) -> int:
+        statement = update(RefreshToken).where(
+            RefreshToken.reto_user_id == user_id,
+            RefreshToken.reto_revoked_at.is_(None),
+        ).values(reto_revoked_at=datetime.now(timezone.utc))
+
+        result = await self.session.execute(statement)
+        await self.session.commit()
+
+        return result.rowcount
+
+    async def delete_expired_refresh_tokens(
+        self, batch_size: int = DEFAULT_PURGE_BATCH_SIZE
+    ) -> int:
+        """
+        Deletes expired refresh tokens in batches, each on its own transaction,
+        so that the purge never holds locks over the whole table.
+
+        Args:
+            batch_size (int): The maximum number of rows deleted per batch.
+
+        Returns:
+            int: The number of deleted tokens.
+        """
+        deleted_count = 0
+
+        while True:
+            expired_ids = select(RefreshToken.reto_id).where(
+                RefreshToken.reto_expires_at < datetime.now(timezone.utc)
+            ).limit(batch_size).scalar_subquery()
+
+            statement = delete(RefreshToken).where(RefreshToken.reto_id.in_(expired_ids))
+            result = await self.session.execute(statement)
+            await self.session.commit()
+
+            deleted_count += result.rowcount
+
+            if result.rowcount < batch_size:
+                return deleted_count
+
+
+async def get_refresh_token_repository():
+    async with get_session() as session:
+        yield RefreshTokenRepository(session)
+
+@asynccontextmanager
+async def refresh_token_repository_async_context_manager():
+    async with get_session() as session:
+        yield RefreshTokenRepository(session)
@@ -1,21 +1,32 @@
 from fastapi import Depends
+from redis.exceptions import RedisError
 from fastapi.security import OAuth2PasswordBearer
 from typing import Annotated, Tuple
 from typing import List
-from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import delete, update, values, column, func, cast, DateTime, String
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
 
-from backend.app.utils.security import hash_string, is_hash_from_string
+from backend.app.services.hashing import password_hasher
+from backend.app.services.login_guard import login_guard
+from backend.app.services.login_buffer import LoginRow, login_buffer
+from backend.app.services.opaque_tokens import opaque_token_store
+from backend.app.services.authorization import authorization_engine
 from backend.app.models.users import UpdateUser
+from backend.app.models.auth import Principal
 from backend.app.database.models.users import User
-from backend.app.database.models.auth import Role, Permission
+from backend.app.database.models.auth import Role, Permission, RolePermission
+from backend.app.repositories.tokens import RefreshTokenRepository, build_refresh_token
+from backend.app.repositories.auth import notify
+from backend.app.base.logging import logger
 
 from backend.app.database.instance import get_session
+from backend.app.base.cache import (
+    token_cache, claims_cache, api_key_cache, user_epochs, USER_EPOCHS_CHANNEL
+)
 from backend.app.database.models.users import users_roles_association
 
 # Security artifacts
@@ -59,10 +70,130 @@ class UsersRepository:
         if user:
             return user
 
+    async def get_user_with_permissions(self, username: str) -> User:
+        """
+        Retrieves a user with its roles and their permissions eagerly loaded.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            User: The user, or None if not found.
+        """
+        statement = select(User).options(
+            selectinload(User.user_roles)
+            .selectinload(Role.role_permissions)
+            .selectinload(RolePermission.permission)
+        ).where(User.user_username == username)
+        result = await self.session.execute(statement)
+
+        return result.scalars().first()
+
+    async def get_principal(self, username: str) -> Principal | None:
+        """
+        Retrieves the immutable principal of a user, from a narrow projection
+        of the user and role columns. No ORM entity is loaded, so nothing is
+        tracked by the session.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            Principal | None: The principal, or None if the user does not exist.
+        """
+        statement = select(
+            User.user_id, User.user_username, User.user_is_active,
+            Role.role_id, Role.role_name,
+        ).outerjoin(
+            users_roles_association, users_roles_association.c.user_id == User.user_id
+        ).outerjoin(
+            Role, Role.role_id == users_roles_association.c.role_id
+        ).where(User.user_username == username)
+
+        result = await self.session.execute(statement)
+        rows = result.all()
+
+        if not rows:
+            return None
+
+        user_id, user_username, user_is_active = rows[0][:3]
+        role_rows = [(row.role_id, row.role_name) for row in rows if row.role_id is not None]
+
+        return authorization_engine.build_principal(
+            user_id,
+            user_username,
+            user_is_active,
+            [role_id for role_id, _ in role_rows],
+            [role_name for _, role_name in role_rows],
+        )
+
+    async def get_users_by_usernames(self, usernames: List[str]) -> List[User]:
+        """
+        Retrieves several users, with their roles, in a single query.
+
+        Args:
+            usernames (List[str]): The usernames of the users.
+
+        Returns:
+            List[User]: The existing users.
+        """
+        if not usernames:
+            return []
+
+        statement = select(User).options(joinedload(User.user_roles)).where(
+            User.user_username.in_(usernames)
+        )
+        result = await self.session.execute(statement)
+
+        return list(result.unique().scalars().all())
+
+    async def get_user_token_epochs(self):
+        """
+        Retrieves the token epoch of every user whose tokens were revoked.
+
+        Returns:
+            List[Tuple[UUID, int]]: Pairs of user id and token epoch.
+        """
+        statement = select(User.user_id, User.user_token_epoch)\
+            .where(User.user_token_epoch > 0)
+        result = await self.session.execute(statement)
+
+        return result.all()
+
+    async def _revoke_user_tokens(self, user: User):
+        # Tokens minted before the new epoch are no longer accepted, by this
+        # worker right away and by the others on the notification, delivered
+        # on commit
+        user.user_token_epoch = (user.user_token_epoch or 0) + 1
+        await notify(self.session, USER_EPOCHS_CHANNEL, str(user.user_id))
+
+    def _invalidate_user_caches(self, user_id):
+        token_cache.invalidate_user(user_id)
+        claims_cache.invalidate_user(user_id)
+        api_key_cache.invalidate_user(user_id)
+
+    async def _forget_user_tokens(self, user: User):
+        self._invalidate_user_caches(user.user_id)
+        user_epochs.set(user.user_id, user.user_token_epoch)
+
+        await self._revoke_user_opaque_tokens(user.user_id)
+
+    async def _revoke_user_refresh_tokens(self, user_id) -> int:
+        return await RefreshTokenRepository(self.session).revoke_user_refresh_tokens(user_id)
+
+    async def _revoke_user_opaque_tokens(self, user_id):
+        # Session records are shared by every worker
+        try:
+            await opaque_token_store.revoke_user(user_id)
+        except (RedisError, OSError) as e:
+            logger.error(f"Opaque tokens of user {user_id} could not be revoked: {e}")
+
     async def create_user(self, user: User):
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+
+        await login_guard.forget_unknown_username(user.user_username)
         
         return user
     
@@ -71,6 +202,7 @@ class UsersRepository:
             self.session.add(user)
             
             await self.session.commit()
+            await login_guard.forget_unknown_username(user.user_username)
 
     async def update_user(self, user_id: str, update_user: UpdateUser):
         statement = select(User).where(User.user_id == user_id)
@@ -87,23 +219,32 @@ class UsersRepository:
 
         await self.session.commit()
         await self.session.refresh(user_to_update)
+        self._invalidate_user_caches(user_to_update.user_id)
+
+        if "user_username" in update_data:
+            await login_guard.forget_unknown_username(user_to_update.user_username)
         
         return user_to_update
 
+    async def _delete_users(self, condition) -> int:
+        statement = delete(User).where(condition).returning(User.user_id)
+        result = await self.session.execute(statement)
+        deleted_ids = result.scalars().all()
+
+        for user_id in deleted_ids:
+            self._invalidate_user_caches(user_id)
+            await self._revoke_user_opaque_tokens(user_id)
+
+        return len(deleted_ids)
+
     async def delete_user_by_id(self, user_id: str):
-        query=delete(User).where(User.user_id == user_id)
-        deleted_count = await self.session.execute(query)
-        return deleted_count.rowcount
+        return await self._delete_users(User.user_id == user_id)
 
     async def delete_user_by_username(self, username: str):
-        statement = delete(User).where(User.user_username == username)
-        deleted_count = await self.session.execute(statement)
-        return deleted_count.rowcount
+        return await self._delete_users(User.user_username == username)
             
     async def delete_user_by_email(self, email: str):
-        statement = delete(User).where(User.user_email == email)
-        deleted_count = await self.session.execute(statement)
-        return deleted_count.rowcount
+        return await self._delete_users(User.user_email == email)
 
     async def update_user_active_status(self, user_id: str, new_status: bool):
         statement = select(User).where(User.user_id == user_id)
@@ -112,7 +253,12 @@ class UsersRepository:
 
         if user:
             user.user_is_active = new_status
+            await self._revoke_user_tokens(user)
             await self.session.commit()
+            await self._forget_user_tokens(user)
+
+            if not new_status:
+                await self._revoke_user_refresh_tokens(user.user_id)
 
             return user
 
@@ -146,6 +292,7 @@ class UsersRepository:
         if user:
             user.user_email = email
             await self.session.commit()
+            self._invalidate_user_caches(user.user_id)
             return user
 
     async def update_user_password(self, user_id: str, password: str):
@@ -153,9 +300,13 @@ class UsersRepository:
         result = await self.session.execute(query)
         user = result.scalars().first()
         if user:
-            user.user_hashed_password = hash_string(password)
+            user.user_hashed_password = await password_hasher.hash(password)
             await self.session.commit()
             await self.session.refresh(user)
+            self._invalidate_user_caches(user.user_id)
+
+            # Sessions opened with the former password are closed
+            await self._revoke_user_refresh_tokens(user.user_id)
             return user
 
     async def update_user_username(self, user_id: str, username: str):
@@ -166,6 +317,8 @@ class UsersRepository:
             user.user_username = username
             await self.session.commit()
             await self.session.refresh(user)
+            self._invalidate_user_caches(user.user_id)
+            await login_guard.forget_unknown_username(username)
             return user
 
     async def update_user_roles(self, user_id: str, roles: List[Role]):
@@ -174,8 +327,10 @@ class UsersRepository:
         user = result.scalars().first()
         if user:
             user.user_roles = roles
+            await self._revoke_user_tokens(user)
             await self.session.commit()
             await self.session.refresh(user)
+            await self._forget_user_tokens(user)
             return user
         
     async def get_role_permissions(self, role: Role):
@@ -199,19 +354,6 @@ class UsersRepository:
         user = result.scalars().first()
         return user.user_is_active if user else False
     
-    async def is_user_credentials_authentic(
-        self, username: str, plain_password: str
-    ) -> User:
-        query = select(User).where(User.user_username == username)
-        result = await self.session.execute(query)
-        user = result.scalars().first()
-        
-        if not user:
-            return False
-        
-        hashed_password = user.user_hashed_password
-        return is_hash_from_string(plain_password, hashed_password)
-
     async def get_user_roles(self, user_id: str) -> List[Role]:
         """
         Retrieves all roles associated with a user.
@@ -237,52 +379,82 @@ class UsersRepository:
 
         return not set(roles_names).isdisjoint(set(user_roles_names))
 
-    async def refresh_token_exists(self, token: str):
-        query = await self.session.execute(
-            select(User).options(
-                selectinload(User.user_roles).options(
-                    selectinload(Role.role_permissions).options(
-                        selectinload(Permission.perm_roles)  # Eager load `perm_roles` inside `role_permissions`
-                    )
-                )
-            ).where(
-                User.user_refresh_token == token
-            )
-        )
-        user = query.scalar_one_or_none()
+    async def record_user_login(
+        self, user_id: str, access_token: str, refresh_token: str,
+        hashed_password: str | None = None,
+    ):
+        """
+        Records a login. The refresh token is stored right away, as the first
+        of a new rotation family, while the last login time and the access
+        token are buffered and written behind in batches.
 
-        return user is not None, user
+        Args:
+            user_id (str): The id of the user.
+            access_token (str): The issued access token.
+            refresh_token (str): The issued refresh token.
+            hashed_password (str, optional): An upgraded hash of the user password.
 
-    async def update_user_last_login(self, username: str):
-        query = select(User).where(User.user_username == username)
-        result = await self.session.execute(query)
-        user = result.scalars().first()
+        Returns:
+            datetime: The buffered login time.
+        """
+        if hashed_password is not None:
+            statement = update(User).where(User.user_id == user_id)\
+                .values(user_hashed_password=hashed_password)
+            await self.session.execute(statement)
 
-        if user:
-            user.user_last_login_at = datetime.now()
-            await self.session.commit()
-            await self.session.refresh(user)
+        self.session.add(build_refresh_token(user_id, refresh_token))
+        await self.session.commit()
 
-        return user
+        return login_buffer.record_login(user_id, access_token)
 
-    async def update_user_access_token(self, username: str, access_token: str):
-        query = select(User).where(User.user_username == username)
-        result = await self.session.execute(query)
-        user = result.scalars().first()
+    async def update_user_logins(self, logins: List[LoginRow]) -> int:
+        """
+        Writes buffered login bookkeeping with a single
+        UPDATE ... FROM (VALUES ...) statement. None fields keep their stored
+        value.
 
-        if user:
-            user.user_access_token = access_token
-            await self.session.commit()
-            await self.session.refresh(user)
-            
-        return user
+        Args:
+            logins (List[LoginRow]): Triples of user id, last login time and
+                access token.
+
+        Returns:
+            int: The number of updated users.
+        """
+        if not logins:
+            return 0
+
+        login_values = values(
+            column("user_id", UUID),
+            column("last_login_at", DateTime),
+            column("access_token", String),
+            name="login_values",
+        ).data(logins)
+
+        # Columns of None only would be typed as text by Postgres, hence
+        # the casts to the types of the updated columns
+        statement = update(User).where(
+            User.user_id == login_values.c.user_id
+        ).values(
+            user_last_login_at=func.coalesce(
+                cast(login_values.c.last_login_at, User.user_last_login_at.type),
+                User.user_last_login_at,
+            ),
+            user_access_token=func.coalesce(
+                cast(login_values.c.access_token, User.user_access_token.type),
+                User.user_access_token,
+            ),
+        )
+
+        result = await self.session.execute(statement)
+        await self.session.commit()
+
+        return result.rowcount
 
     async def update_user_refresh_token(self, username: str, refresh_token: str):
         user = await self.get_user_by_username(username)
         if user:
-            user.user_refresh_token = refresh_token
+            self.session.add(build_refresh_token(user.user_id, refresh_token))
             await self.session.commit()
-            await self.session.refresh(user)
 
 async def get_user_repository():
     async with get_session() as session:
@@ -5,6 +5,9 @@ from .users import router as users_router
 from .system import router as system_router
 from .health import router as health_router
 from .email import router as email_router
+from .well_known import router as well_known_router
+from .authz import router as authz_router
+from .api_keys import router as api_keys_router
 
 __all__ = [
     "public_router",
@@ -14,4 +17,7 @@ __all__ = [
     "users_router",
     "system_router",
     "email_router",
+    "well_known_router",
+    "authz_router",
+    "api_keys_router",
 ]
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from typing import Dict, List
+
+from backend.app.base.auth import get_request_user
+from backend.app.base.cache import api_key_cache
+from backend.app.base.exceptions import APIKeyCreationException
+from backend.app.dependencies.auth import APIKeyRepositoryDepends
+from backend.app.models.auth import APIKeyCreateRequest, APIKeyCreated
+from backend.app.models.users import User
+from backend.app.repositories.api_keys import is_api_key
+from backend.app.utils.request import get_token
+
+router=APIRouter(prefix='/api-keys', tags=["API keys"])
+
+
+@router.post("/")
+async def create_api_key(
+    request: Request,
+    create_request: APIKeyCreateRequest,
+    api_key_repo: APIKeyRepositoryDepends,
+    current_user: User = Depends(get_request_user),
+) -> APIKeyCreated:
+    # A leaked key must not be able to outlive itself through new keys
+    if is_api_key(get_token(request)):
+        raise APIKeyCreationException()
+
+    # Keys act on behalf of their owner, with the owner roles
+    expires_at = datetime.now(timezone.utc) + timedelta(days=create_request.expires_in_days)
+
+    api_key, key = await api_key_repo.create_api_key(
+        current_user.user_id, create_request.name, expires_at
+    )
+
+    return APIKeyCreated(
+        name=api_key.apke_name,
+        prefix=api_key.apke_prefix,
+        key=key,
+        expires_at=api_key.apke_expires_at,
+    )
+
+
+@router.get("/")
+async def read_api_keys(
+    api_key_repo: APIKeyRepositoryDepends,
+    current_user: User = Depends(get_request_user),
+) -> List[Dict]:
+    api_keys = await api_key_repo.get_user_api_keys(current_user.user_id)
+
+    return [api_key.to_dict() for api_key in api_keys]
+
+
+@router.delete("/{prefix}")
+async def revoke_api_key(
+    api_key_repo: APIKeyRepositoryDepends,
+    prefix: str = Path(..., description="The prefix of the API key to revoke"),
+    current_user: User = Depends(get_request_user),
+):
+    is_revoked = await api_key_repo.revoke_api_key(current_user.user_id, prefix)
+
+    if not is_revoked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"API key {prefix} does not exist",
+        )
+
+    # Other workers drop the key within API_KEY_CACHE_TTL_SECONDS
+    api_key_cache.invalidate_user(current_user.user_id)
+
+    return {"revoked": is_revoked}
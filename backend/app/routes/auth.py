@@ -1,16 +1,31 @@
-from typing import Annotated
+from typing import Annotated, List
 
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter, Request
 from fastapi.security import OAuth2PasswordRequestForm
-
-from backend.app.base.auth import create_token
+from jose import jwt
+
+from backend.app.base.auth import (
+    create_token,
+    create_opaque_token,
+    get_request_user,
+    introspect_tokens,
+    revoke_token,
+    oauth2_scheme,
+)
 from backend.app.models.users import Token
-from backend.app.dependencies.auth import RefreshTokenDependency
+from backend.app.models.auth import TokenIntrospectionRequest, TokenIntrospection
+from backend.app.dependencies.auth import (
+    RefreshTokenDependency, RefreshTokenRepositoryDepends,
+)
 from backend.app.dependencies.users import UsersRepositoryDepends
 from backend.app.repositories.users import UsersRepository
 from backend.app.database.models.users import User
 
 from backend.app.repositories.users import get_user_repository
+from backend.app.services.hashing import password_hasher
+from backend.app.services.login_guard import login_guard
+from backend.app.services.login_buffer import login_buffer
+from backend.app.utils.request import get_client_ip
 from backend.app.base.exceptions import (
     InexistentUsernameException, 
     CredentialsException,
@@ -21,70 +36,141 @@ from backend.app.base.config import settings
 router=APIRouter(prefix='/auth', tags=["Authorization"])
 
 OAuthDependency = Annotated[OAuth2PasswordRequestForm, Depends()]
+TokenDependency = Annotated[str, Depends(oauth2_scheme)]
 
 
 DEFAULT_ACCESS_TIMEOUT_MINUTES=settings.ACCESS_TOKEN_EXPIRE_MINUTES
 DEFAULT_REFRESH_TIMEOUT_MINUTES=settings.REFRESH_TOKEN_EXPIRE_MINUTES
 
 
+def is_opaque_client(client_id: str | None) -> bool:
+    return client_id is not None and client_id in settings.OPAQUE_TOKEN_CLIENTS
+
+
+async def create_access_token(user: User, client_id: str | None = None) -> str:
+    # Opaque clients get a reference token instead of a JWT
+    if is_opaque_client(client_id):
+        return await create_opaque_token(user, DEFAULT_ACCESS_TIMEOUT_MINUTES)
+
+    return create_token(
+        data={"sub": user.user_username},
+        expires_delta=DEFAULT_ACCESS_TIMEOUT_MINUTES,
+        user=user,
+    )
+
+
 @router.post("/token")
 async def login_for_access_token(
+    request: Request,
     form_data: OAuthDependency,
     user_repo: UsersRepositoryDepends
 ) -> Token:
+    username, password = form_data.username, form_data.password
+    client_id = form_data.client_id
+    client_ip = get_client_ip(request)
+
+    # Locked out usernames and clients are rejected before any hashing work
+    is_unknown_username = await login_guard.check(username, client_ip)
+
     try:
-        username, password = form_data.username, form_data.password
-        user: User = await user_repo.get_user_by_username(username)
+        if is_unknown_username:
+            raise InexistentUsernameException(username=username)
+
+        # Claims mode and opaque tokens embed the user roles and permissions
+        if settings.AUTH_CLAIMS_MODE or is_opaque_client(client_id):
+            user: User = await user_repo.get_user_with_permissions(username)
+        else:
+            user: User = await user_repo.get_user_by_username(username)
 
         if not user:
+            await login_guard.remember_unknown_username(username)
             raise InexistentUsernameException(username=username)
 
     except Exception as e:
+        if isinstance(e, InexistentUsernameException):
+            await login_guard.record_failure(None, client_ip)
+
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    is_authentic=await user_repo.is_user_credentials_authentic(username, password)
+    # The fetched hash is verified directly, without selecting the user again.
+    # Hashes of an outdated scheme or cost are upgraded along with the login.
+    is_authentic, upgraded_hash = await password_hasher.verify_and_update(
+        password, user.user_hashed_password
+    )
     if not is_authentic:
+        await login_guard.record_failure(username, client_ip)
         raise CredentialsException()
 
+    await login_guard.record_success(username)
+
     auth_data={
         "sub": user.user_username
     }
 
-    access_token = create_token(
-        data=auth_data, expires_delta=DEFAULT_ACCESS_TIMEOUT_MINUTES
-    )
+    # The refresh token keeps the client id, so that refreshes keep the token mode
+    if client_id:
+        auth_data["cid"] = client_id
+
+    access_token = await create_access_token(user, client_id)
     refresh_token = create_token(
         data=auth_data, expires_delta=DEFAULT_REFRESH_TIMEOUT_MINUTES
     )
 
     # Update user's last login and tokens
-    await user_repo.update_user_last_login(username)
-    await user_repo.update_user_access_token(username, access_token)
-    await user_repo.update_user_refresh_token(username, refresh_token)
-
-    token_obj=Token(access_token=access_token, refresh_token=refresh_token)
-    print(token_obj)
-    return token_obj
+    await user_repo.record_user_login(
+        user.user_id, access_token, refresh_token, upgraded_hash
+    )
 
+    return Token(access_token=access_token, refresh_token=refresh_token)
 
 
 @router.post("/refresh")
 async def refresh_access_token(
     token_data: RefreshTokenDependency,
-    user_repo: UsersRepositoryDepends
-):    
+    user_repo: UsersRepositoryDepends,
+    token_repo: RefreshTokenRepositoryDepends,
+):
     user, token = token_data
 
-    auth_data = {"sub": user.user_username, "roles": [
-        role.to_dict() for role in user.user_roles
-    ]}
+    # The refresh token was verified by the dependency
+    client_id = jwt.get_unverified_claims(token).get("cid")
+
+    # On claims mode, roles and a permission bitmap are added to the access token
+    auth_data = {"sub": user.user_username}
+
+    if client_id:
+        auth_data["cid"] = client_id
 
     # Create new tokens
-    access_token = create_token(data=auth_data, expires_delta=DEFAULT_ACCESS_TIMEOUT_MINUTES)
+    access_token = await create_access_token(user, client_id)
     refresh_token = create_token(data=auth_data, expires_delta=DEFAULT_REFRESH_TIMEOUT_MINUTES)
 
-    # Update user's tokens
-    await user_repo.update_user_access_token(user.user_username, access_token)
-    await user_repo.update_user_refresh_token(user.user_username, refresh_token)
+    # Rotate the refresh token within its family: a concurrent refresh with
+    # the same token finds it already revoked
+    rotated_token = await token_repo.rotate_refresh_token(token, refresh_token)
+    if rotated_token is None:
+        raise CredentialsException()
+
+    login_buffer.record_access_token(user.user_id, access_token)
 
     return Token(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/revoke")
+async def revoke_access_token(
+    token: TokenDependency,
+    current_user: User = Depends(get_request_user),
+):
+    # The token is resolved first, so that only valid tokens are revoked
+    is_revoked = await revoke_token(token)
+
+    return {"revoked": is_revoked}
+
+
+@router.post("/introspect")
+async def introspect_access_tokens(
+    introspection_request: TokenIntrospectionRequest,
+    current_user: User = Depends(get_request_user),
+) -> List[TokenIntrospection]:
+    # All tokens are decoded at once, and their subjects loaded with one query
+    return await introspect_tokens(introspection_request.tokens)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+
+from backend.app.base.auth import get_request_user
+from backend.app.base.exceptions import ForbiddenSubjectException
+from backend.app.dependencies.users import UsersRepositoryDepends
+from backend.app.models.auth import AuthorizationCheckRequest, AuthorizationMatrix
+from backend.app.models.users import User
+from backend.app.services.authorization import authorization_engine
+from .roles_bundler import user_management_roles
+
+router=APIRouter(prefix='/authz', tags=["Authorization decisions"])
+
+# Callers holding these roles may check any user, others only themselves
+any_subject_requirement = authorization_engine.requirement(role_names=user_management_roles)
+
+
+@router.post("/check")
+async def check_authorizations(
+    check_request: AuthorizationCheckRequest,
+    user_repo: UsersRepositoryDepends,
+    current_user: User = Depends(get_request_user),
+) -> AuthorizationMatrix:
+    if not authorization_engine.is_authorized(current_user, any_subject_requirement):
+        for subject in check_request.subjects:
+            if subject != current_user.user_username:
+                raise ForbiddenSubjectException(subject)
+
+    # Subjects are loaded with a single query, and checked against the
+    # compiled role graph. Unknown and inactive subjects hold no permission.
+    users = await user_repo.get_users_by_usernames(list(set(check_request.subjects)))
+    active_users = {user.user_username: user for user in users if user.user_is_active}
+
+    principals = [active_users.get(subject) for subject in check_request.subjects]
+    matrix = authorization_engine.permission_matrix(principals, check_request.permissions)
+
+    return AuthorizationMatrix(
+        subjects=check_request.subjects,
+        permissions=check_request.permissions,
+        matrix=matrix,
+    )
@@ -8,6 +8,9 @@ from backend.app.routes import (
     users_router,
     system_router,
     email_router,
+    well_known_router,
+    authz_router,
+    api_keys_router,
 )
 from backend.app.base.config import settings
 
@@ -17,6 +20,8 @@ routers = [
     public_router,
     system_router,
     auth_router,
+    authz_router,
+    api_keys_router,
     data_router,
     users_router,
     email_router,
@@ -27,4 +32,7 @@ prefix = f"{settings.API_V1_STR}"
 api_router = APIRouter()
 
 for router in routers:
-    api_router.include_router(router, prefix=prefix)
\ No newline at end of file
+    api_router.include_router(router, prefix=prefix)
+
+# Well-known documents are served at the root
+api_router.include_router(well_known_router)
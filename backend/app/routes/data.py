@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 
 from backend.app.models.users import User
-from backend.app.base.auth import role_checker, get_current_user
+from backend.app.base.auth import role_checker, get_request_user
 from .roles_bundler import (
     user_management_roles,
     user_viewer_roles,
@@ -12,7 +12,7 @@ router=APIRouter(prefix='/data', tags=["Data"])
 @router.get("/test-admin")
 @role_checker(user_management_roles)
 def admin_endpoint(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ):
     return {"message": "This is admin data"}
 
@@ -20,7 +20,7 @@ def admin_endpoint(
 @router.get("/test-viewer")
 @role_checker(user_viewer_roles)
 def admin_endpoint(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ):
     return {"message": "This is user data"}
 
@@ -2,6 +2,11 @@
 from fastapi import APIRouter
 
 from backend.app.base.config import settings
+from backend.app.services.hashing import password_hasher
+from backend.app.services.revocation import revocation_service
+from backend.app.services.login_guard import login_guard
+from backend.app.services.login_buffer import login_buffer
+from backend.app.services.rate_limiter import get_rate_limiter, fallback_rate_limiter
 
 from backend.app.utils.healthcheck import (
     is_server_live,
@@ -43,4 +48,30 @@ async def liveness():
 @router.get("/readiness")
 async def readiness():
     # Perform more intensive readiness checks (e.g., data availability)    
-    return {"status": "ready"}
\ No newline at end of file
+    return {"status": "ready"}
+
+
+@router.get("/hashing")
+async def hashing():
+    # Password hashing executor load and latency
+    return password_hasher.metrics()
+
+
+@router.get("/revocation")
+async def revocation():
+    # Token revocation filter size and hit rates
+    return revocation_service.metrics()
+
+
+@router.get("/login")
+async def login():
+    # Rejected login attempts, negative cache of nonexistent usernames and
+    # pending login bookkeeping
+    return {**login_guard.metrics(), "write_behind": login_buffer.metrics()}
+
+
+@router.get("/rate-limit")
+async def rate_limit():
+    # Allowed and rejected requests, Redis failures, and decisions taken
+    # locally while Redis was unavailable
+    return {**get_rate_limiter().metrics(), "fallback": fallback_rate_limiter.metrics()}
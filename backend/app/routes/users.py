@@ -18,7 +18,7 @@ from backend.app.base.exceptions import (
     InvalidPasswordException,
 )
 from backend.app.models.users import User, UnhashedUpdateUser, CreateUser
-from backend.app.base.auth import get_current_user
+from backend.app.base.auth import get_request_user
 from backend.app.utils.security import (
     is_password_valid, 
     apply_password_validity_dict, 
@@ -26,9 +26,7 @@ from backend.app.utils.security import (
     is_valid_uuid,
 )
 
-from backend.app.utils.security import (
-    hash_string,
-)
+from backend.app.services.hashing import password_hasher
 from .roles_bundler import (
     user_management_roles,
     user_viewer_roles,
@@ -52,7 +50,7 @@ def userbd_to_user(user: User):
 @router.get("/")
 @role_checker(user_management_roles)
 def read_all_users(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_request_user),
     user_repo: UsersRepository=Depends(get_user_repository),
     limit: int = 10,
     offset: int = 0
@@ -65,7 +63,7 @@ def read_all_users(
 @router.get("/{user_id}")
 @role_checker(user_viewer_roles)
 def read_user_by_id(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_request_user),
     user_id: str = Path(..., description="The ID of the user to retrieve"),
     user_repo: UsersRepository=Depends(get_user_repository)
 ):
@@ -84,7 +82,7 @@ def read_user_by_id(
 @role_checker(user_management_roles)
 def delete_user(
     user_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_request_user),
     user_repo: UsersRepository=Depends(get_user_repository)
 ):
     if not is_valid_uuid(user_id): 
@@ -115,7 +113,7 @@ def delete_user(
 
 @router.patch("/{user_id}")
 @role_checker(user_management_roles)
-def update_user(
+async def update_user(
     user_id: str, 
     update_user_info: UnhashedUpdateUser, 
     user_repo: UsersRepository = Depends(get_user_repository)
@@ -124,7 +122,7 @@ def update_user(
     if not update_user_info:
         raise InexistentUserIDException(user_id)
     
-    update_user_info.to_update_user()
+    await update_user_info.to_update_user()
 
     admin_users=user_repo.get_users_by_role("admin")
     last_admin=len(admin_users)==1
@@ -145,18 +143,18 @@ def update_user(
 
 @router.put("/")
 @role_checker(user_management_roles)
-def create_user(
+async def create_user(
     user: CreateUser,
     user_repo: UsersRepository = Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     new_user = User(
         user_username=user.user_username,
-        user_hashed_password=hash_string(user.user_password),
+        user_hashed_password=await password_hasher.hash(user.user_password),
         user_email=user.user_email,
     )
     
-    user_repo.create_user(new_user)
+    await user_repo.create_user(new_user)
 
 @router.post('/signup')
 async def signup(
@@ -165,7 +163,7 @@ async def signup(
 ) -> Dict:
     new_user = User(
         user_username=new_user_info.user_username,
-        user_hashed_password=hash_string(new_user_info.user_password),
+        user_hashed_password=await password_hasher.hash(new_user_info.user_password),
         user_email=new_user_info.user_email,
     )
     
@@ -178,7 +176,7 @@ def update_user(
     user_id: str,
     user: UnhashedUpdateUser,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -197,7 +195,7 @@ def update_username(
     user_id: str,
     new_username: str,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -216,7 +214,7 @@ def update_email(
     user_id: str, 
     new_email: str,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -234,12 +232,12 @@ def update_email(
 
 @router.patch("/{user_id}/password")
 @role_checker(user_editor_roles)
-def update_password(
+async def update_password(
     user_id: str,
     old_password: str,
     new_password: str,
     user_repo: UsersRepository = Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -248,17 +246,17 @@ def update_password(
         invalidation_dict=apply_password_validity_dict(new_password)
         raise InvalidPasswordException(invalidation_dict)
 
-    user = user_repo.get_user_by_id(user_id)
+    user = await user_repo.get_user_by_id(user_id)
     if not user:
         raise InexistentUserIDException(user_id)
 
     if not user.user_is_active:
         raise InactiveUserException(user.user_username)
 
-    is_authentic=user_repo.is_user_credentials_authentic(user.user_username, old_password)
+    is_authentic=await password_hasher.verify(old_password, user.user_hashed_password)
 
     if(is_authentic):
-        user = user_repo.update_user_password(user_id, new_password)
+        user = await user_repo.update_user_password(user_id, new_password)
     else:
         raise IncorrectCurrentPasswordException()
 
@@ -270,7 +268,7 @@ def update_password(
 def get_user_roles(
     user_id: str,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> List[str]:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -288,7 +286,7 @@ def get_user_roles(
 def activate_user(
     user_id: str,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -306,7 +304,7 @@ def activate_user(
 def deactivate_user(
     user_id: str,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> Dict:
     if not is_valid_uuid(user_id): 
         raise InvalidUUIDException(user_id)
@@ -324,7 +322,7 @@ def deactivate_user(
 def get_users_by_role(
     role: str,
     user_repo: UsersRepository=Depends(get_user_repository),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_request_user)
 ) -> List[Dict]:
     users = user_repo.get_users_by_role(role)
 
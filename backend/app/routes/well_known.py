@@ -0,0 +1,39 @@
+from hashlib import sha256
+from json import dumps
+from typing import Dict
+
+from fastapi import APIRouter, Request, Response
+
+from backend.app.services.signing import key_ring
+from backend.app.base.permissions import permission_registry
+from backend.app.base.config import settings
+
+router = APIRouter(prefix='/.well-known', tags=["Well-known"])
+
+
+def cached_json_response(request: Request, document: Dict) -> Response:
+    # Documents are revalidated by their ETag after the max-age
+    content = dumps(document, sort_keys=True)
+    etag = f'"{sha256(content.encode("utf-8")).hexdigest()[:32]}"'
+
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}",
+        "ETag": etag,
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.get("/jwks.json")
+async def jwks(request: Request):
+    # Public signing keys, cached by clients that verify tokens locally
+    return cached_json_response(request, key_ring.jwks())
+
+
+@router.get("/permissions.json")
+async def permissions(request: Request):
+    # Bit positions of the permission bitmap claim, for the same clients
+    return cached_json_response(request, permission_registry.to_dict())
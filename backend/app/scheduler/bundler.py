@@ -1,10 +1,16 @@
 from backend.app.scheduler.request_logging import scheduler as request_logging_scheduler
+from backend.app.scheduler.refresh_tokens import scheduler as refresh_tokens_scheduler
+from backend.app.scheduler.user_logins import scheduler as user_logins_scheduler
+from backend.app.scheduler.rate_limits import scheduler as rate_limits_scheduler
 
 # Define the schedulers to start
 schedulers=[
-    request_logging_scheduler
+    request_logging_scheduler,
+    refresh_tokens_scheduler,
+    user_logins_scheduler,
+    rate_limits_scheduler,
 ]
 
 def start_schedulers():
     for scheduler in schedulers:
-        scheduler.start()
\ No newline at end of file
+        scheduler.start()
@@ -0,0 +1,22 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from backend.app.services.rate_limiter import two_tier_rate_limiter
+from backend.app.base.config import settings
+
+scheduler = AsyncIOScheduler()
+
+
+async def sync_rate_limits(batch_size: int = settings.RATE_LIMIT_SYNC_BATCH_SIZE) -> int:
+    """
+    Syncs the hits allowed by the local rate limit buckets with Redis.
+
+    Returns:
+        int: The number of keys blocked for exceeding their global budget.
+    """
+    return await two_tier_rate_limiter.sync(batch_size)
+
+
+if settings.RATE_LIMIT_BACKEND == "two_tier":
+    scheduler.add_job(
+        sync_rate_limits, 'interval', seconds=settings.RATE_LIMIT_SYNC_INTERVAL_SECONDS
+    )
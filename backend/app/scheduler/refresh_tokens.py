@@ -0,0 +1,16 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from backend.app.repositories.tokens import refresh_token_repository_async_context_manager
+from backend.app.base.logging import logger
+
+scheduler = AsyncIOScheduler()
+
+
+async def purge_expired_refresh_tokens():
+    async with refresh_token_repository_async_context_manager() as token_repository:
+        deleted_count = await token_repository.delete_expired_refresh_tokens()
+
+    logger.info(f"Purged {deleted_count} expired refresh tokens")
+
+
+scheduler.add_job(purge_expired_refresh_tokens, 'interval', hours=1)
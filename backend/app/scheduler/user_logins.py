@@ -0,0 +1,41 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from backend.app.repositories.users import user_repository_async_context_manager
+from backend.app.services.login_buffer import login_buffer
+from backend.app.base.logging import logger
+from backend.app.base.config import settings
+
+scheduler = AsyncIOScheduler()
+
+
+async def flush_user_logins(batch_size: int = settings.LOGIN_FLUSH_BATCH_SIZE) -> int:
+    """
+    Writes the buffered login bookkeeping, a batched statement per
+    `batch_size` users. Rows of a failed batch are restored on the buffer.
+
+    Returns:
+        int: The number of updated users.
+    """
+    logins = login_buffer.drain()
+    updated_count = 0
+
+    for start in range(0, len(logins), batch_size):
+        batch = logins[start:start + batch_size]
+
+        try:
+            async with user_repository_async_context_manager() as user_repository:
+                updated_count += await user_repository.update_user_logins(batch)
+
+        except Exception as e:
+            login_buffer.restore(logins[start:])
+            logger.error(f"Failed to flush {len(logins) - start} user logins: {e}")
+            break
+
+        login_buffer.flushed += len(batch)
+
+    return updated_count
+
+
+scheduler.add_job(
+    flush_user_logins, 'interval', seconds=settings.LOGIN_FLUSH_INTERVAL_SECONDS
+)
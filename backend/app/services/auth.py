@@ -17,6 +17,7 @@ from backend.app.base.exceptions import (
     MissingRequiredClaimException,
 )
 from backend.app.repositories.users import user_repository_async_context_manager
+from backend.app.repositories.tokens import RefreshTokenRepository
 from backend.app.models.users import User
 from backend.app.database.models.users import User
 from backend.app.utils.misc import is_async
@@ -79,9 +80,14 @@ class JWTService:
         """
         async with user_repository_async_context_manager() as user_repository:
             try:
-                user_has_token, user = await user_repository.refresh_token_exists(token)
+                refresh_token = await RefreshTokenRepository(
+                    user_repository.session
+                ).get_refresh_token(token)
+
+                user_has_token = refresh_token is not None and refresh_token.reto_revoked_at is None
                 
                 if user_has_token:
+                    user = await user_repository.get_user_by_id(refresh_token.reto_user_id)
                     payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
                     username: str = payload.get("sub")
                     expiration_date_int = payload.get("exp")
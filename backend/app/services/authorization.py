@@ -0,0 +1,286 @@
+from itertools import count
+from typing import Dict, Iterable, List, Tuple
+
+from backend.app.utils.permissions import PermissionRegistry
+from backend.app.models.auth import Principal
+from backend.app.base.permissions import permission_registry
+from backend.app.data.auth import ROLES_METADATA
+
+# Postgres channel notified on changes of the role/permission graph
+AUTHORIZATION_CHANNEL = "authorization"
+
+
+class CompiledRoleGraph:
+    """
+    Snapshot of the role/permission graph: a bit per role, and the
+    permission bitmap of each role, inherited permissions included.
+    """
+
+    def __init__(self, version: int, role_bits: Dict[str, int], role_permissions: Dict[str, int]):
+        self.version = version
+        self.role_bits = role_bits
+        self.role_permissions = role_permissions
+
+
+class Requirement:
+    """
+    Roles (any of) and permissions (all of) required by a route, resolved
+    once at decoration time. Their masks are recomputed only when the role
+    graph is recompiled.
+    """
+
+    def __init__(self, role_names: Iterable[str] = (), permission_names: Iterable[str] = ()):
+        self.role_names = tuple(role_names)
+        self.permission_names = tuple(permission_names)
+
+        self._version = None
+        self.role_mask = 0
+        self.permission_mask = 0
+        self.is_satisfiable = True
+
+    def resolve(self, graph: CompiledRoleGraph, registry: PermissionRegistry):
+        if self._version == graph.version:
+            return
+
+        role_mask = 0
+        for role_name in self.role_names:
+            role_mask |= graph.role_bits.get(role_name, 0)
+
+        # Unknown roles or permissions are never granted
+        self.is_satisfiable = (not self.role_names or role_mask != 0) and all(
+            permission_name in registry for permission_name in self.permission_names
+        )
+        self.role_mask = role_mask
+        self.permission_mask = registry.bitmap(self.permission_names)
+        self._version = graph.version
+
+    def __repr__(self) -> str:
+        return f"Requirement({self.role_names}, {self.permission_names})"
+
+
+class AuthorizationEngine:
+    """
+    Authorizes principals against route requirements with bitwise checks.
+
+    The role → permission graph, with optional role inheritance ('inherits'
+    on ROLES_METADATA), is compiled into per-role bitmaps. The role and
+    permission masks of a principal are computed once per compiled graph
+    and kept on the principal, so each check is a couple of bitwise ANDs.
+    """
+
+    def __init__(
+        self,
+        registry: PermissionRegistry,
+        inheritance: Dict[str, Iterable[str]] | None = None,
+    ):
+        self.registry = registry
+        self.inheritance = {
+            role_name: tuple(parent_names)
+            for role_name, parent_names in (inheritance or {}).items()
+        }
+        self._versions = count(1)
+        self.graph = CompiledRoleGraph(0, {}, {})
+
+    def compile(self, role_permission_names: Dict[str, Iterable[str]]) -> CompiledRoleGraph:
+        """
+        Compiles the role graph and swaps it in at once.
+
+        Args:
+            role_permission_names (Dict[str, Iterable[str]]): The permission
+                names directly granted to each role.
+
+        Returns:
+            CompiledRoleGraph: The compiled graph.
+
+        Raises:
+            ValueError: If the role inheritance has a cycle.
+        """
+        direct_permissions = {
+            role_name: self.registry.bitmap(permission_names)
+            for role_name, permission_names in role_permission_names.items()
+        }
+        role_permissions = {}
+
+        def resolve(role_name: str, path: Tuple[str, ...]) -> int:
+            if role_name in path:
+                raise ValueError(f"Cyclic role inheritance: {' -> '.join(path + (role_name,))}")
+
+            if role_name not in role_permissions:
+                bitmap = direct_permissions.get(role_name, 0)
+
+                for parent_name in self.inheritance.get(role_name, ()):
+                    bitmap |= resolve(parent_name, path + (role_name,))
+
+                role_permissions[role_name] = bitmap
+
+            return role_permissions[role_name]
+
+        for role_name in direct_permissions:
+            resolve(role_name, ())
+
+        role_bits = {
+            role_name: 1 << index
+            for index, role_name in enumerate(sorted(role_permissions))
+        }
+
+        self.graph = CompiledRoleGraph(next(self._versions), role_bits, role_permissions)
+
+        return self.graph
+
+    def requirement(
+        self, role_names: Iterable[str] = (), permission_names: Iterable[str] = ()
+    ) -> Requirement:
+        return Requirement(role_names, permission_names)
+
+    def build_principal(
+        self, user_id, user_username: str, user_is_active: bool,
+        role_ids: Iterable, role_names: Iterable[str],
+    ) -> Principal:
+        """
+        Builds the immutable principal of a user, with the permission bitmap
+        of its roles on the current role graph.
+
+        Args:
+            user_id (UUID): The id of the user.
+            user_username (str): The username of the user.
+            user_is_active (bool): Whether the user is active.
+            role_ids (Iterable[UUID]): The ids of the user roles.
+            role_names (Iterable[str]): The names of the user roles.
+
+        Returns:
+            Principal: The principal of the user.
+        """
+        graph = self.graph
+        role_names = tuple(role_names)
+
+        permission_bitmap = 0
+        for role_name in role_names:
+            permission_bitmap |= graph.role_permissions.get(role_name, 0)
+
+        return Principal(
+            user_id=user_id,
+            user_username=user_username,
+            user_is_active=user_is_active,
+            role_ids=role_ids,
+            role_names=role_names,
+            permission_bitmap=permission_bitmap,
+            graph_version=graph.version,
+        )
+
+    def principal_masks(self, principal) -> Tuple[int, int, int]:
+        """
+        Computes the role and permission masks of a principal. The masks of
+        mutable principals are cached on them until the graph is recompiled.
+        Immutable principals keep their permission bitmap, unless it was
+        computed on an older graph; token principals always keep it.
+
+        Args:
+            principal (User | Principal): The principal.
+
+        Returns:
+            Tuple[int, int, int]: The graph version, role mask and permission mask.
+        """
+        graph = self.graph
+        masks = getattr(principal, "_authorization_masks", None)
+
+        if masks is not None and masks[0] == graph.version:
+            return masks
+
+        role_mask = 0
+        permission_mask = 0
+
+        for role_name in principal.role_names:
+            role_mask |= graph.role_bits.get(role_name, 0)
+            permission_mask |= graph.role_permissions.get(role_name, 0)
+
+        if isinstance(principal, Principal):
+            if principal.graph_version in (None, graph.version):
+                permission_mask = principal.permission_bitmap
+
+            return graph.version, role_mask, permission_mask
+
+        masks = (graph.version, role_mask, permission_mask)
+        principal._authorization_masks = masks
+
+        return masks
+
+    def permission_mask(self, principal) -> int:
+        return self.principal_masks(principal)[2]
+
+    def is_authorized(self, principal, requirement: Requirement) -> bool:
+        """
+        Checks whether a principal has any of the required roles and all of
+        the required permissions.
+
+        Args:
+            principal (User | Principal): The principal.
+            requirement (Requirement): The route requirement.
+
+        Returns:
+            bool: True if the principal is authorized, False otherwise.
+        """
+        _, role_mask, permission_mask = self.principal_masks(principal)
+        requirement.resolve(self.graph, self.registry)
+
+        if not requirement.is_satisfiable:
+            return False
+
+        if requirement.role_mask and not role_mask & requirement.role_mask:
+            return False
+
+        return permission_mask & requirement.permission_mask == requirement.permission_mask
+
+    def permission_matrix(self, principals: List, permission_names: List[str]) -> List[str]:
+        """
+        Evaluates every (principal, permission) pair. Each principal gets a
+        row with a '1' or '0' per permission; missing principals (None) get
+        no permission at all.
+
+        Args:
+            principals (List[User | Principal | None]): The principals.
+            permission_names (List[str]): The permission names.
+
+        Returns:
+            List[str]: A row per principal, of one character per permission.
+        """
+        permission_bits = [
+            1 << self.registry.bit(permission_name) if permission_name in self.registry else 0
+            for permission_name in permission_names
+        ]
+        denied_row = "0" * len(permission_names)
+
+        rows = []
+        for principal in principals:
+            if principal is None:
+                rows.append(denied_row)
+                continue
+
+            permission_mask = self.permission_mask(principal)
+            rows.append("".join(
+                "1" if permission_mask & bit else "0" for bit in permission_bits
+            ))
+
+        return rows
+
+
+def get_roles_inheritance(roles_metadata: Dict) -> Dict[str, Iterable[str]]:
+    return {
+        role_name: metadata["inherits"]
+        for role_name, metadata in roles_metadata.items()
+        if metadata.get("inherits")
+    }
+
+
+authorization_engine = AuthorizationEngine(
+    permission_registry, get_roles_inheritance(ROLES_METADATA)
+)
+
+# Compiled from the system roles until the database graph is loaded
+authorization_engine.compile({
+    role_name: metadata["permissions"]
+    for role_name, metadata in ROLES_METADATA.items()
+})
+
+
+def get_authorization_engine() -> AuthorizationEngine:
+    return authorization_engine
@@ -0,0 +1,155 @@
+from asyncio import get_running_loop
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, Tuple
+
+from backend.app.utils.security import (
+    hash_string, is_hash_from_string, verify_and_update_hash,
+)
+from backend.app.base.exceptions import HashingQueueFullException
+from backend.app.base.config import settings
+
+EXECUTOR_TYPES = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+class PasswordHashingService:
+    """
+    Runs password hashing and verification on a bounded executor, so that
+    bcrypt work does not block the event loop.
+
+    At most `max_queue_size` operations are either running or waiting for a
+    worker; further calls are rejected instead of piling up.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "thread",
+        max_workers: int = 4,
+        max_queue_size: int = 64,
+    ):
+        if executor_type not in EXECUTOR_TYPES:
+            raise ValueError(
+                f"Invalid executor type: {executor_type}. "
+                f"Valid executor types are: {list(EXECUTOR_TYPES)}"
+            )
+
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor: Executor | None = None
+
+        self.queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = EXECUTOR_TYPES[self.executor_type]
+            self._executor = executor_class(max_workers=self.max_workers)
+
+        return self._executor
+
+    async def _run(self, func: Callable, *args):
+        if self.queue_depth >= self.max_queue_size:
+            self.rejected += 1
+            raise HashingQueueFullException()
+
+        self.queue_depth += 1
+        start_time = perf_counter()
+
+        try:
+            loop = get_running_loop()
+            result = await loop.run_in_executor(self.executor, func, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+
+        latency = perf_counter() - start_time
+
+        self.completed += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+        return result
+
+    async def hash(self, string: str) -> str:
+        """
+        Hashes a string on the executor.
+
+        Args:
+            string (str): The string to be hashed.
+
+        Returns:
+            str: The hashed string.
+        """
+        return await self._run(hash_string, string)
+
+    async def verify(self, string: str, hashed_string: str) -> bool:
+        """
+        Checks on the executor if a given string matches a hash string.
+
+        Args:
+            string (str): The string to check.
+            hashed_string (str): The hash string to compare against.
+
+        Returns:
+            bool: True if the string matches the hash string, False otherwise.
+        """
+        return await self._run(is_hash_from_string, string, hashed_string)
+
+    async def verify_and_update(
+        self, string: str, hashed_string: str
+    ) -> Tuple[bool, str | None]:
+        """
+        Checks on the executor if a given string matches a hash string, and
+        rehashes it if the hash scheme or cost are outdated.
+
+        Args:
+            string (str): The string to check.
+            hashed_string (str): The hash string to compare against.
+
+        Returns:
+            Tuple[bool, str | None]: Whether the string matches, and the new
+                hash if the hash string is outdated.
+        """
+        return await self._run(verify_and_update_hash, string, hashed_string)
+
+    def metrics(self) -> Dict:
+        average_latency = self.total_latency / self.completed if self.completed else 0.0
+
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "average_latency_ms": average_latency * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHashingService(
+    executor_type=settings.PASSWORD_HASHING_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    max_queue_size=settings.PASSWORD_HASHING_MAX_QUEUE,
+)
+
+
+def get_password_hasher() -> PasswordHashingService:
+    return password_hasher
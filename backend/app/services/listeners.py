@@ -0,0 +1,91 @@
+from asyncio import CancelledError, Event, TimeoutError, create_task, sleep, wait_for
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from backend.app.base.logging import logger
+
+
+class NotificationListener:
+    """
+    Reloads state derived from the database, e.g. the rate policies, as soon
+    as any worker changes it, listening to the Postgres notifications of a
+    channel on a dedicated connection. Bursts of notifications are coalesced
+    into a single reload.
+
+    The state is also reloaded on every (re)connection, since notifications
+    sent while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        reload: Callable[[], Awaitable[None]],
+        channel: str,
+        subject: str | None = None,
+        reconnect_interval: float = 1.0,
+    ):
+        self.dsn = dsn
+        self.reload = reload
+        self.channel = channel
+        self.subject = subject or channel
+        self.reconnect_interval = reconnect_interval
+
+        self._changed = Event()
+        self._task = None
+
+        self.reloads = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except CancelledError:
+                pass
+
+            self._task = None
+
+    def _notify(self, connection, pid, channel, payload) -> None:
+        self._changed.set()
+
+    async def _reload(self) -> None:
+        self._changed.clear()
+
+        try:
+            await self.reload()
+            self.reloads += 1
+
+        except Exception as e:
+            logger.error(f"Failed to reload {self.subject}: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            connection = None
+
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.channel, self._notify)
+                await self._reload()
+
+                while not connection.is_closed():
+                    try:
+                        await wait_for(self._changed.wait(), self.reconnect_interval)
+                    except TimeoutError:
+                        continue
+
+                    await self._reload()
+
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning(f"Listener of {self.subject} disconnected: {e}")
+
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await sleep(self.reconnect_interval)
@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+# Pending bookkeeping of a user: user id, last login time and last access
+# token. None fields keep their stored value.
+LoginRow = Tuple[Any, datetime | None, str | None]
+
+
+class LoginWriteBehindBuffer:
+    """
+    Write-behind buffer of user login bookkeeping (last login time and last
+    issued access token), so that logins do not write to the users table
+    synchronously.
+
+    Entries are merged per user, the latest value winning, and drained by a
+    periodic flush that updates every pending user with a single batched
+    statement. Rows of a failed flush are restored, unless superseded.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, LoginRow] = {}
+
+        self.recorded = 0
+        self.flushed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _merge(self, user_id, logged_in_at, access_token, is_newer: bool = True) -> None:
+        user_key = str(user_id)
+        _, pending_logged_in_at, pending_access_token = \
+            self._entries.get(user_key, (user_id, None, None))
+
+        if is_newer:
+            logged_in_at = logged_in_at or pending_logged_in_at
+            access_token = access_token or pending_access_token
+        else:
+            logged_in_at = pending_logged_in_at or logged_in_at
+            access_token = pending_access_token or access_token
+
+        self._entries[user_key] = (user_id, logged_in_at, access_token)
+
+    def record_login(self, user_id, access_token: str, logged_in_at: datetime | None = None) -> datetime:
+        """
+        Buffers a login.
+
+        Args:
+            user_id (UUID): The id of the user.
+            access_token (str): The issued access token.
+            logged_in_at (datetime, optional): The login time. Now if None.
+
+        Returns:
+            datetime: The buffered login time.
+        """
+        logged_in_at = logged_in_at or datetime.now()
+
+        self._merge(user_id, logged_in_at, access_token)
+        self.recorded += 1
+
+        return logged_in_at
+
+    def record_access_token(self, user_id, access_token: str) -> None:
+        self._merge(user_id, None, access_token)
+        self.recorded += 1
+
+    def drain(self) -> List[LoginRow]:
+        entries, self._entries = self._entries, {}
+
+        return list(entries.values())
+
+    def restore(self, rows: List[LoginRow]) -> None:
+        # Entries recorded since the drain are newer, and take precedence
+        for user_id, logged_in_at, access_token in rows:
+            self._merge(user_id, logged_in_at, access_token, is_newer=False)
+
+    def metrics(self) -> Dict:
+        return {
+            "pending": len(self._entries),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+        }
+
+
+login_buffer = LoginWriteBehindBuffer()
+
+
+def get_login_buffer() -> LoginWriteBehindBuffer:
+    return login_buffer
@@ -0,0 +1,214 @@
+from asyncio import TimeoutError, wait_for
+from time import time
+from typing import Dict, List, Tuple
+
+from redis.exceptions import RedisError
+
+from backend.app.utils.cache import LRUCache
+from backend.app.base.exceptions import LoginLockedException
+from backend.app.base.logging import logger
+from backend.app.base.config import settings
+
+LOGIN_FAILURES_KEY_PREFIX = "login_failures:"
+LOGIN_LOCKOUT_KEY_PREFIX = "login_lockout:"
+LOGIN_UNKNOWN_KEY_PREFIX = "login_unknown:"
+
+
+class LoginGuard:
+    """
+    Rejects login attempts before any password hashing work.
+
+    Failed attempts are counted on Redis per username and per client IP.
+    Past `max_failures`, the username or IP is locked out for a duration
+    doubling with every further failure, up to `max_lockout` seconds.
+    Lockouts are mirrored in process, so a flood from a locked out client
+    does not even reach Redis. Usernames that do not exist are remembered
+    on Redis for `unknown_username_ttl` seconds, so that creating the user
+    on any worker forgets them everywhere.
+
+    Redis errors fail open: the password hashing queue still bounds the
+    hashing work.
+    """
+
+    def __init__(
+        self,
+        max_username_failures: int = 5,
+        max_ip_failures: int = 50,
+        failure_window: int = 900,
+        base_lockout: int = 1,
+        max_lockout: int = 900,
+        lockout_cache_size: int = 4096,
+        unknown_username_ttl: int = 60,
+        timeout: float = 0.05,
+    ):
+        self.max_failures = {"username": max_username_failures, "ip": max_ip_failures}
+        self.failure_window = failure_window
+        self.base_lockout = base_lockout
+        self.max_lockout = max_lockout
+        self.unknown_username_ttl = unknown_username_ttl
+        self.timeout = timeout
+
+        self.lockouts = LRUCache(max_size=lockout_cache_size)
+        self._redis = None
+
+        self.rejected = 0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = settings.redis_client
+
+        return self._redis
+
+    @staticmethod
+    def get_subjects(username: str | None, client_ip: str | None) -> List[Tuple[str, str]]:
+        subjects = [("username", username), ("ip", client_ip)]
+
+        return [(scope, value) for scope, value in subjects if value]
+
+    def get_lockout_duration(self, scope: str, failures: int) -> int:
+        exceeded_failures = failures - self.max_failures[scope]
+
+        if exceeded_failures < 0:
+            return 0
+
+        return min(self.base_lockout * 2 ** exceeded_failures, self.max_lockout)
+
+    def _reject(self, expires_at: float) -> None:
+        self.rejected += 1
+        raise LoginLockedException(retry_after=max(1, int(expires_at - time() + 1)))
+
+    async def check(self, username: str, client_ip: str | None) -> bool:
+        """
+        Checks that neither the username nor the client IP are locked out.
+        The negative cache of usernames is read in the same round trip.
+
+        Args:
+            username (str): The username of the login attempt.
+            client_ip (str | None): The IP of the client.
+
+        Returns:
+            bool: Whether the username is remembered as nonexistent.
+
+        Raises:
+            LoginLockedException: If the username or the client IP are locked out.
+        """
+        subjects = self.get_subjects(username, client_ip)
+        lockout_keys = [f"{LOGIN_LOCKOUT_KEY_PREFIX}{scope}:{value}" for scope, value in subjects]
+
+        # Local lockouts are checked first, with no round trip
+        for key in lockout_keys:
+            expires_at = self.lockouts.get(key)
+            if expires_at is not None:
+                self._reject(expires_at)
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                for key in lockout_keys:
+                    pipeline.pttl(key)
+                pipeline.exists(f"{LOGIN_UNKNOWN_KEY_PREFIX}{username}")
+
+                *time_to_lives, is_unknown = await wait_for(pipeline.execute(), self.timeout)
+
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Login lockout check failed: {e}")
+            return False
+
+        for key, time_to_live in zip(lockout_keys, time_to_lives):
+            if time_to_live > 0:
+                expires_at = time() + time_to_live / 1000
+                self.lockouts.set(key, expires_at, expires_at)
+                self._reject(expires_at)
+
+        return bool(is_unknown)
+
+    async def record_failure(self, username: str | None, client_ip: str | None) -> None:
+        """
+        Counts a failed login attempt, and locks out the username and the
+        client IP past their maximum number of failures.
+
+        Args:
+            username (str | None): The username, if it exists.
+            client_ip (str | None): The IP of the client.
+        """
+        subjects = self.get_subjects(username, client_ip)
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                for scope, value in subjects:
+                    failures_key = f"{LOGIN_FAILURES_KEY_PREFIX}{scope}:{value}"
+                    pipeline.incr(failures_key)
+                    pipeline.expire(failures_key, self.failure_window)
+
+                results = await wait_for(pipeline.execute(), self.timeout)
+
+            lockouts: Dict[str, int] = {}
+            for (scope, value), failures in zip(subjects, results[::2]):
+                lockout_duration = self.get_lockout_duration(scope, failures)
+
+                if lockout_duration:
+                    lockouts[f"{LOGIN_LOCKOUT_KEY_PREFIX}{scope}:{value}"] = lockout_duration
+
+            if lockouts:
+                async with self.redis.pipeline(transaction=False) as pipeline:
+                    for key, lockout_duration in lockouts.items():
+                        pipeline.set(key, 1, ex=lockout_duration)
+
+                    await wait_for(pipeline.execute(), self.timeout)
+
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Login failure record failed: {e}")
+            return
+
+        for key, lockout_duration in lockouts.items():
+            expires_at = time() + lockout_duration
+            self.lockouts.set(key, expires_at, expires_at)
+
+    async def record_success(self, username: str) -> None:
+        try:
+            failures_key = f"{LOGIN_FAILURES_KEY_PREFIX}username:{username}"
+            await wait_for(self.redis.delete(failures_key), self.timeout)
+
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Login success record failed: {e}")
+
+    async def remember_unknown_username(self, username: str) -> None:
+        try:
+            unknown_key = f"{LOGIN_UNKNOWN_KEY_PREFIX}{username}"
+            await wait_for(
+                self.redis.set(unknown_key, 1, ex=self.unknown_username_ttl), self.timeout
+            )
+
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Unknown username record failed: {e}")
+
+    async def forget_unknown_username(self, username: str) -> None:
+        try:
+            unknown_key = f"{LOGIN_UNKNOWN_KEY_PREFIX}{username}"
+            await wait_for(self.redis.delete(unknown_key), self.timeout)
+
+        except (RedisError, OSError, TimeoutError) as e:
+            # The username stays unknown until the key expires
+            logger.warning(f"Unknown username removal failed: {e}")
+
+    def metrics(self) -> Dict:
+        return {
+            "rejected": self.rejected,
+            "local_lockouts": len(self.lockouts),
+        }
+
+
+login_guard = LoginGuard(
+    max_username_failures=settings.LOGIN_MAX_FAILURES_PER_USERNAME,
+    max_ip_failures=settings.LOGIN_MAX_FAILURES_PER_IP,
+    failure_window=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+    base_lockout=settings.LOGIN_LOCKOUT_BASE_SECONDS,
+    max_lockout=settings.LOGIN_LOCKOUT_MAX_SECONDS,
+    lockout_cache_size=settings.LOGIN_LOCKOUT_CACHE_SIZE,
+    unknown_username_ttl=settings.LOGIN_UNKNOWN_USERNAME_TTL_SECONDS,
+    timeout=settings.LOGIN_REDIS_TIMEOUT_SECONDS,
+)
+
+
+def get_login_guard() -> LoginGuard:
+    return login_guard
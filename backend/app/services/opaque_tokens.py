@@ -0,0 +1,157 @@
+from json import dumps, loads
+from secrets import token_urlsafe
+from time import time
+from datetime import timedelta
+from typing import Dict, List
+
+from backend.app.models.auth import TokenClaims
+from backend.app.utils.permissions import encode_bitmap, decode_bitmap
+from backend.app.utils.security import hash_token
+from backend.app.base.config import settings
+
+OPAQUE_TOKEN_PREFIX = "ot_"
+OPAQUE_TOKEN_KEY_PREFIX = "opaque_token:"
+OPAQUE_USER_TOKENS_KEY_PREFIX = "opaque_user_tokens:"
+
+
+def is_opaque_token(token: str) -> bool:
+    return token.startswith(OPAQUE_TOKEN_PREFIX)
+
+
+class OpaqueTokenStore:
+    """
+    Reference tokens: random strings whose session record (user id, roles,
+    permission bitmap, expiry) lives on Redis, under the token hash, until
+    the token expires. Verifying a token is a single GET, and revoking it a
+    DEL. The keys of the tokens of each user are also kept in a set, so that
+    every token of a user is revoked at once, on any worker.
+    """
+
+    def __init__(self, redis=None):
+        self._redis = redis
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = settings.redis_client
+
+        return self._redis
+
+    @staticmethod
+    def get_key(token: str) -> str:
+        return f"{OPAQUE_TOKEN_KEY_PREFIX}{hash_token(token)}"
+
+    @staticmethod
+    def get_user_key(user_id) -> str:
+        return f"{OPAQUE_USER_TOKENS_KEY_PREFIX}{user_id}"
+
+    async def issue(
+        self, user_id, username: str, role_names: List[str],
+        permission_bitmap: int, epoch: int, expires_delta: timedelta,
+    ) -> str:
+        """
+        Issues an opaque token and stores its session record.
+
+        Args:
+            user_id (UUID): The id of the token owner.
+            username (str): The username of the token owner.
+            role_names (List[str]): The role names of the token owner.
+            permission_bitmap (int): The permission bitmap of the token owner.
+            epoch (int): The token epoch of the token owner.
+            expires_delta (timedelta): The token lifetime.
+
+        Returns:
+            str: The opaque token.
+        """
+        token = f"{OPAQUE_TOKEN_PREFIX}{token_urlsafe(32)}"
+        time_to_live = int(expires_delta.total_seconds())
+
+        record = {
+            "uid": str(user_id),
+            "sub": username,
+            "rol": sorted(role_names),
+            "pbm": encode_bitmap(permission_bitmap),
+            "epc": epoch,
+            "exp": int(time()) + time_to_live,
+        }
+
+        token_key, user_key = self.get_key(token), self.get_user_key(user_id)
+
+        # Tokens share the same lifetime, so the set outlives every token in it
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.set(token_key, dumps(record), ex=time_to_live)
+            pipeline.sadd(user_key, token_key)
+            pipeline.expire(user_key, time_to_live)
+
+            await pipeline.execute()
+
+        return token
+
+    @staticmethod
+    def to_claims(record) -> TokenClaims | None:
+        if record is None:
+            return None
+
+        payload: Dict = loads(record)
+
+        return TokenClaims(
+            user_id=payload["uid"],
+            user_username=payload["sub"],
+            role_names=payload["rol"],
+            epoch=payload.get("epc", 0),
+            permission_bitmap=decode_bitmap(payload["pbm"]),
+            expires_at=payload["exp"],
+        )
+
+    async def get_claims(self, token: str) -> TokenClaims | None:
+        """
+        Retrieves the principal of an opaque token.
+
+        Args:
+            token (str): The opaque token.
+
+        Returns:
+            TokenClaims | None: The principal, or None if the token is unknown,
+                expired or revoked.
+        """
+        return self.to_claims(await self.redis.get(self.get_key(token)))
+
+    async def get_many_claims(self, tokens: List[str]) -> List[TokenClaims | None]:
+        # A single pipelined round trip for every token
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for token in tokens:
+                pipeline.get(self.get_key(token))
+
+            records = await pipeline.execute()
+
+        return [self.to_claims(record) for record in records]
+
+    async def revoke(self, token: str) -> bool:
+        return bool(await self.redis.delete(self.get_key(token)))
+
+    async def revoke_user(self, user_id) -> int:
+        """
+        Revokes every opaque token of a user, e.g. on deactivation or on a
+        role change.
+
+        Args:
+            user_id (UUID): The id of the token owner.
+
+        Returns:
+            int: The number of revoked tokens.
+        """
+        user_key = self.get_user_key(user_id)
+        token_keys = await self.redis.smembers(user_key)
+
+        if not token_keys:
+            return 0
+
+        # The set itself is counted along with the session records
+        return await self.redis.delete(*token_keys, user_key) - 1
+
+
+opaque_token_store = OpaqueTokenStore()
+
+
+def get_opaque_token_store() -> OpaqueTokenStore:
+    return opaque_token_store
@@ -0,0 +1,601 @@
+import fcntl
+import mmap
+import os
+from asyncio import TimeoutError, wait_for
+from hashlib import blake2b
+from math import ceil, floor
+from struct import Struct
+from time import monotonic, time
+from typing import Dict, List, NamedTuple, Tuple
+
+from redis.exceptions import RedisError
+
+from backend.app.utils.cache import LRUCache
+from backend.app.base.logging import logger
+from backend.app.base.config import settings
+
+RATE_LIMIT_KEY_PREFIX = "rate_limit:"
+
+# Every script reads the time from Redis, so that all workers share one
+# clock, works in microseconds and returns
+# {allowed, remaining, reset after (ms), retry after (ms)}
+CLOCK = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000
+"""
+
+# Bucket of `limit` tokens refilled at `limit` tokens per period
+TOKEN_BUCKET_SCRIPT = CLOCK + """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local updated_at = tonumber(state[2]) or now
+
+tokens = math.min(limit, tokens + math.max(0, now - updated_at) * limit / period)
+
+local allowed, retry_after = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) * period / limit
+end
+
+redis.call('HSET', KEYS[1], 'tokens', string.format('%.6f', tokens), 'ts', string.format('%.0f', now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(period / 1000))
+
+local reset_after = (limit - tokens) * period / limit
+return {allowed, math.floor(tokens), math.ceil(reset_after / 1000), math.ceil(retry_after / 1000)}
+"""
+
+# Generic cell rate algorithm: a single theoretical arrival time per key,
+# allowing bursts of up to `limit` requests
+GCRA_SCRIPT = CLOCK + """
+local interval = period / limit
+local arrival = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local next_arrival = arrival + interval
+local allowed_at = next_arrival - period
+
+if allowed_at > now then
+    return {0, 0, math.ceil((arrival - now) / 1000), math.ceil((allowed_at - now) / 1000)}
+end
+
+redis.call('SET', KEYS[1], string.format('%.0f', next_arrival), 'PX', math.ceil((next_arrival - now) / 1000))
+
+local remaining = math.floor((now - allowed_at) / interval)
+return {1, remaining, math.ceil((next_arrival - now) / 1000), 0}
+"""
+
+# Exact sliding window, logging the time of every request in the window
+SLIDING_LOG_SCRIPT = CLOCK + """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - period)
+local count = redis.call('ZCARD', KEYS[1])
+
+if count < limit then
+    local member = string.format('%.0f', now) .. ':' .. count
+    redis.call('ZADD', KEYS[1], now, member)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(period / 1000))
+
+    local oldest = tonumber(redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')[2])
+    return {1, limit - count - 1, math.ceil((oldest + period - now) / 1000), 0}
+end
+
+local oldest = tonumber(redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')[2])
+local retry_after = math.ceil((oldest + period - now) / 1000)
+return {0, 0, retry_after, retry_after}
+"""
+
+RATE_LIMIT_SCRIPTS = {
+    "token_bucket": TOKEN_BUCKET_SCRIPT,
+    "gcra": GCRA_SCRIPT,
+    "sliding_log": SLIDING_LOG_SCRIPT,
+}
+
+# Batched GCRA accounting of hits already allowed by the local buckets,
+# with ARGV holding {limit, period (ms), hits} per key. Returns the retry
+# after (ms) of every key, 0 for keys still within their budget
+SYNC_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local retry_afters = {}
+
+for index, key in ipairs(KEYS) do
+    local offset = (index - 1) * 3
+    local limit = tonumber(ARGV[offset + 1])
+    local period = tonumber(ARGV[offset + 2]) * 1000
+    local hits = tonumber(ARGV[offset + 3])
+
+    local arrival = math.max(tonumber(redis.call('GET', key)) or now, now) + hits * period / limit
+    redis.call('SET', key, string.format('%.0f', arrival), 'PX', math.max(1, math.ceil((arrival - now) / 1000)))
+
+    retry_afters[index] = math.max(0, math.ceil((arrival - period - now) / 1000))
+end
+
+return retry_afters
+"""
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int
+    retry_after: int
+
+    def headers(self, window_seconds: float) -> Dict[str, str]:
+        """
+        Builds the RateLimit headers of the decision, along with Retry-After
+        for rejected requests. Durations are given in whole seconds.
+
+        Args:
+            window_seconds (float): The window of the policy.
+
+        Returns:
+            Dict[str, str]: The response headers.
+        """
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(ceil(self.reset_after / 1000)),
+            "RateLimit-Policy": f"{self.limit};w={ceil(window_seconds)}",
+        }
+
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, ceil(self.retry_after / 1000)))
+
+        return headers
+
+
+class RateLimiter:
+    """
+    Redis rate limiter deciding each request with a single atomic Lua script
+    call, i.e. one round trip. Scripts are registered once, and called by
+    their SHA thereafter.
+
+    The algorithm is chosen per policy: 'token_bucket', 'gcra' (generic cell
+    rate algorithm) or 'sliding_log'. Redis errors fail open.
+    """
+
+    def __init__(self, default_algorithm: str = "gcra", timeout: float = 0.05):
+        if default_algorithm not in RATE_LIMIT_SCRIPTS:
+            raise ValueError(f"Unknown rate limiting algorithm: {default_algorithm}")
+
+        self.default_algorithm = default_algorithm
+        self.timeout = timeout
+
+        self._redis = None
+        self._scripts = {}
+
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = settings.redis_client
+
+        return self._redis
+
+    @property
+    def scripts(self) -> Dict:
+        if not self._scripts:
+            self._scripts = {
+                algorithm: self.redis.register_script(script)
+                for algorithm, script in RATE_LIMIT_SCRIPTS.items()
+            }
+
+        return self._scripts
+
+    async def initialize(self) -> None:
+        # Preloads the scripts, so that the first calls need no retry
+        for script in RATE_LIMIT_SCRIPTS.values():
+            await self.redis.script_load(script)
+
+    async def hit(self, key: str, policy) -> RateLimitDecision | None:
+        """
+        Counts a request against the budget of a key.
+
+        Args:
+            key (str): The rate limited identity, e.g. a user id or client IP.
+            policy (RateLimiterPolicy): The policy of the key.
+
+        Returns:
+            RateLimitDecision | None: The decision, or None if Redis failed.
+        """
+        algorithm = policy.algorithm or self.default_algorithm
+        period_ms = max(1, int(policy.interval_seconds * 1000))
+
+        try:
+            result = await wait_for(
+                self.scripts[algorithm](
+                    keys=[f"{RATE_LIMIT_KEY_PREFIX}{algorithm}:{key}"],
+                    args=[policy.times, period_ms],
+                ),
+                self.timeout,
+            )
+
+        except (RedisError, OSError, TimeoutError) as e:
+            self.errors += 1
+            logger.warning(f"Rate limit check failed: {e}")
+            return None
+
+        allowed, remaining, reset_after, retry_after = result
+
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+
+        return RateLimitDecision(bool(allowed), policy.times, remaining, reset_after, retry_after)
+
+    def metrics(self) -> Dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+# Local bucket of a key: tokens, last refill time, blocked until time,
+# hits not yet synced, and the limit and period (ms) of its policy
+Bucket = List
+
+
+class LocalRateLimiter:
+    """
+    In-process token buckets, deciding requests with no network I/O. Every
+    key gets a bucket of `share` of its policy budget, refilled at the same
+    share of the policy rate, so that workers split the global budget.
+
+    Allowed hits are counted for a periodic, batched sync with Redis, which
+    blocks the keys that exceeded their global budget on any worker. The
+    limiter is meant to be used from a single event loop.
+    """
+
+    def __init__(self, share: float = 1.0, max_keys: int = 100_000, track_hits: bool = True):
+        self.share = share
+        self.track_hits = track_hits
+
+        self.buckets = LRUCache(max_size=max_keys)
+        self._pending: Dict[str, Bucket] = {}
+
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: str, policy) -> RateLimitDecision:
+        """
+        Counts a request against the local bucket of a key.
+
+        Args:
+            key (str): The rate limited identity, e.g. a user id or client IP.
+            policy (RateLimiterPolicy): The policy of the key.
+
+        Returns:
+            RateLimitDecision: The decision.
+        """
+        now = monotonic()
+        interval_seconds = policy.interval_seconds
+        capacity = max(1.0, policy.times * self.share)
+        rate = capacity / interval_seconds if interval_seconds > 0 else float("inf")
+
+        period_ms = max(1, int(interval_seconds * 1000))
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = [capacity, now, 0.0, 0, policy.times, period_ms]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            # The policy of a key changes with its roles, or on a reload
+            bucket[4], bucket[5] = policy.times, period_ms
+
+        # Idle buckets are full again after an interval, and can be evicted
+        self.buckets.set(key, bucket, time() + max(interval_seconds, 1.0))
+
+        if bucket[2] > now:
+            retry_after = bucket[2] - now
+        elif bucket[0] >= 1:
+            bucket[0] -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - bucket[0]) / rate
+
+        reset_after = int((capacity - bucket[0]) / rate * 1000)
+
+        if retry_after:
+            self.rejected += 1
+            return RateLimitDecision(False, policy.times, 0, reset_after, ceil(retry_after * 1000))
+
+        self.allowed += 1
+
+        if self.track_hits:
+            bucket[3] += 1
+            self._pending[key] = bucket
+
+        return RateLimitDecision(True, policy.times, int(bucket[0]), reset_after, 0)
+
+    def drain(self) -> List[Tuple[str, Bucket]]:
+        pending, self._pending = self._pending, {}
+
+        return list(pending.items())
+
+    def block(self, key: str, retry_after_ms: int) -> None:
+        bucket = self.buckets.get(key)
+
+        if bucket is not None:
+            bucket[0] = 0.0
+            bucket[2] = monotonic() + retry_after_ms / 1000
+
+    def metrics(self) -> Dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "keys": len(self.buckets),
+            "pending_keys": len(self._pending),
+        }
+
+
+class TwoTierRateLimiter:
+    """
+    Rate limiter deciding requests on local buckets, and syncing the
+    allowed hits with Redis in batches, a single script call per batch.
+
+    When a sync fails, the limiter keeps enforcing the local buckets alone,
+    i.e. degraded mode, until a sync succeeds again. Hits of failed syncs
+    are dropped rather than replayed.
+    """
+
+    def __init__(self, remote: RateLimiter, local: LocalRateLimiter):
+        self.remote = remote
+        self.local = local
+        self.degraded = False
+
+        self._sync_script = None
+
+        self.syncs = 0
+        self.failed_syncs = 0
+
+    @property
+    def sync_script(self):
+        if self._sync_script is None:
+            self._sync_script = self.remote.redis.register_script(SYNC_SCRIPT)
+
+        return self._sync_script
+
+    async def initialize(self) -> None:
+        await self.remote.redis.script_load(SYNC_SCRIPT)
+
+    async def hit(self, key: str, policy) -> RateLimitDecision:
+        return self.local.hit(key, policy)
+
+    async def sync(self, batch_size: int = 500) -> int:
+        """
+        Reports the hits allowed locally since the last sync to Redis, and
+        blocks the keys past their global budget.
+
+        Args:
+            batch_size (int): The maximum number of keys per script call.
+
+        Returns:
+            int: The number of blocked keys.
+        """
+        pending = self.local.drain()
+        blocked_count = 0
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            keys, args = [], []
+
+            for key, bucket in batch:
+                keys.append(f"{RATE_LIMIT_KEY_PREFIX}gcra:{key}")
+                args.extend((bucket[4], bucket[5], bucket[3]))
+                bucket[3] = 0
+
+            try:
+                retry_afters = await wait_for(
+                    self.sync_script(keys=keys, args=args), self.remote.timeout
+                )
+
+            except (RedisError, OSError, TimeoutError) as e:
+                if not self.degraded:
+                    logger.warning(f"Rate limit sync failed, enforcing local limits only: {e}")
+
+                self.degraded = True
+                self.failed_syncs += 1
+                return blocked_count
+
+            for (key, _), retry_after in zip(batch, retry_afters):
+                if retry_after > 0:
+                    self.local.block(key, retry_after)
+                    blocked_count += 1
+
+        if self.degraded:
+            logger.info("Rate limit sync recovered")
+
+        self.degraded = False
+        self.syncs += 1
+
+        return blocked_count
+
+    def metrics(self) -> Dict:
+        return {
+            **self.local.metrics(),
+            "degraded": self.degraded,
+            "syncs": self.syncs,
+            "failed_syncs": self.failed_syncs,
+        }
+
+
+# Slot of the shared memory table: key hash (0 if free) and GCRA
+# theoretical arrival time, as a UNIX timestamp
+SHARED_SLOT = Struct("<Qd")
+
+
+class SharedMemoryRateLimiter:
+    """
+    Rate limiter sharing one budget per key between the worker processes of
+    a host, with no Redis. Keys are hashed onto a table of fixed-size GCRA
+    slots in a memory-mapped file, split into stripes guarded by `fcntl`
+    byte-range locks, so that workers only contend on the same stripe.
+
+    Keys are probed within their stripe; expired slots are reused and, on a
+    full stripe, the slot closest to expiry is evicted. Every policy is
+    enforced with the GCRA algorithm.
+    """
+
+    def __init__(self, path: str, slots: int = 65536, stripes: int = 64, probes: int = 8):
+        self.path = path
+        self.stripes = stripes
+        self.stripe_slots = max(1, slots // stripes)
+        self.probes = min(probes, self.stripe_slots)
+        self.size = self.stripes * self.stripe_slots * SHARED_SLOT.size
+
+        self._fd = None
+        self._table = None
+
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    @property
+    def table(self) -> mmap.mmap:
+        if self._table is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+            # Every worker may size the file, to the same length
+            if os.fstat(self._fd).st_size < self.size:
+                os.ftruncate(self._fd, self.size)
+
+            self._table = mmap.mmap(self._fd, self.size)
+
+        return self._table
+
+    async def initialize(self) -> None:
+        self.table
+
+    def close(self) -> None:
+        if self._table is not None:
+            self._table.close()
+            os.close(self._fd)
+            self._table, self._fd = None, None
+
+    @staticmethod
+    def hash_key(key: str) -> int:
+        key_hash = int.from_bytes(blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+        return key_hash or 1
+
+    def _find_slot(self, table: mmap.mmap, key_hash: int, stripe_offset: int, now: float) -> Tuple[int, float]:
+        first_slot = key_hash // self.stripes % self.stripe_slots
+        free_offset, victim_offset, victim_arrival = None, None, float("inf")
+
+        for probe in range(self.probes):
+            offset = stripe_offset + (first_slot + probe) % self.stripe_slots * SHARED_SLOT.size
+            slot_hash, arrival = SHARED_SLOT.unpack_from(table, offset)
+
+            if slot_hash == key_hash:
+                return offset, arrival
+
+            if free_offset is None and (slot_hash == 0 or arrival <= now):
+                free_offset = offset
+            elif arrival < victim_arrival:
+                victim_offset, victim_arrival = offset, arrival
+
+        if free_offset is None:
+            free_offset = victim_offset
+            self.evictions += 1
+
+        return free_offset, now
+
+    def acquire(self, key: str, policy) -> RateLimitDecision:
+        """
+        Counts a request against the host-wide budget of a key.
+
+        Args:
+            key (str): The rate limited identity, e.g. a user id or client IP.
+            policy (RateLimiterPolicy): The policy of the key.
+
+        Returns:
+            RateLimitDecision: The decision.
+        """
+        table = self.table
+        key_hash = self.hash_key(key)
+        stripe = key_hash % self.stripes
+        stripe_size = self.stripe_slots * SHARED_SLOT.size
+        stripe_offset = stripe * stripe_size
+
+        period = max(policy.interval_seconds, 0.001)
+        interval = period / policy.times
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, stripe_size, stripe_offset)
+        try:
+            now = time()
+            offset, arrival = self._find_slot(table, key_hash, stripe_offset, now)
+            arrival = max(arrival, now)
+            next_arrival = arrival + interval
+            allowed_at = next_arrival - period
+
+            if allowed_at <= now:
+                SHARED_SLOT.pack_into(table, offset, key_hash, next_arrival)
+
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, stripe_size, stripe_offset)
+
+        if allowed_at > now:
+            self.rejected += 1
+            return RateLimitDecision(
+                False, policy.times, 0, ceil((arrival - now) * 1000), ceil((allowed_at - now) * 1000)
+            )
+
+        self.allowed += 1
+
+        remaining = floor((now - allowed_at) / interval)
+        return RateLimitDecision(True, policy.times, remaining, ceil((next_arrival - now) * 1000), 0)
+
+    async def hit(self, key: str, policy) -> RateLimitDecision:
+        return self.acquire(key, policy)
+
+    def metrics(self) -> Dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+        }
+
+
+rate_limiter = RateLimiter(
+    default_algorithm=settings.RATE_LIMIT_ALGORITHM,
+    timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+)
+
+two_tier_rate_limiter = TwoTierRateLimiter(
+    rate_limiter,
+    LocalRateLimiter(
+        share=settings.RATE_LIMIT_LOCAL_SHARE,
+        max_keys=settings.RATE_LIMIT_LOCAL_MAX_KEYS,
+    ),
+)
+
+# Local-only limits enforced while the Redis limiter is unavailable
+fallback_rate_limiter = LocalRateLimiter(
+    share=settings.RATE_LIMIT_LOCAL_SHARE,
+    max_keys=settings.RATE_LIMIT_LOCAL_MAX_KEYS,
+    track_hits=False,
+)
+
+shared_memory_rate_limiter = SharedMemoryRateLimiter(
+    settings.RATE_LIMIT_SHARED_MEMORY_PATH,
+    slots=settings.RATE_LIMIT_SHARED_MEMORY_SLOTS,
+    stripes=settings.RATE_LIMIT_SHARED_MEMORY_STRIPES,
+)
+
+RATE_LIMIT_BACKENDS = {
+    "redis": rate_limiter,
+    "two_tier": two_tier_rate_limiter,
+    "shared_memory": shared_memory_rate_limiter,
+}
+
+
+def get_rate_limiter():
+    return RATE_LIMIT_BACKENDS[settings.RATE_LIMIT_BACKEND]
@@ -0,0 +1,95 @@
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable
+
+from backend.app.models.throttling import RateLimiterPolicy
+from backend.app.data.auth import ROLES_METADATA
+
+# Postgres channel notified on rate policy changes, with the role name
+RATE_POLICIES_CHANNEL = "rate_policies"
+
+RoleSet = FrozenSet[str]
+
+
+class RatePolicyRegistry:
+    """
+    Effective rate policy of every role set, i.e. the most permissive
+    policy among its roles, or the default policy for role sets without any.
+
+    Policies are compiled ahead of time for the known role sets, and keyed
+    by the role set of the principal, so that resolving the policy of a
+    request is a single dict lookup. Unseen role sets are compiled once, on
+    their first lookup.
+    """
+
+    def __init__(
+        self,
+        role_policies: Dict[str, RateLimiterPolicy] | None = None,
+        default_policy: RateLimiterPolicy | None = None,
+    ):
+        self.default_policy = default_policy or RateLimiterPolicy()
+        self.role_policies: Dict[str, RateLimiterPolicy] = {}
+        self._policies: Dict[RoleSet, RateLimiterPolicy] = {}
+
+        self.load(role_policies or {})
+
+    def __len__(self) -> int:
+        return len(self._policies)
+
+    def compile(
+        self, role_set: Iterable[str], role_policies: Dict[str, RateLimiterPolicy] | None = None
+    ) -> RateLimiterPolicy:
+        role_policies = self.role_policies if role_policies is None else role_policies
+        rate_policies = [
+            role_policies[role_name] for role_name in role_set if role_name in role_policies
+        ]
+
+        return max(rate_policies, key=lambda p: p.throughput(), default=self.default_policy)
+
+    def load(
+        self, role_policies: Dict[str, RateLimiterPolicy], role_sets: Iterable[Iterable[str]] = ()
+    ) -> None:
+        """
+        Replaces the role policies, and recompiles the policies of the known
+        role sets, the given ones and every single role.
+
+        Args:
+            role_policies (Dict[str, RateLimiterPolicy]): The policy of each role.
+            role_sets (Iterable[Iterable[str]]): Role sets to compile, e.g. the ones of the users.
+        """
+        all_role_sets = chain(
+            self._policies, role_sets, ([role_name] for role_name in role_policies), [()]
+        )
+        policies = {}
+
+        for role_set in all_role_sets:
+            role_set = frozenset(role_set)
+            policies[role_set] = self.compile(role_set, role_policies)
+
+        # Both are swapped at once, with no await in between
+        self.role_policies, self._policies = dict(role_policies), policies
+
+    def resolve(self, role_set: RoleSet) -> RateLimiterPolicy:
+        """
+        Resolves the effective policy of a role set.
+
+        Args:
+            role_set (FrozenSet[str]): The role names, e.g. `Principal.role_set`.
+
+        Returns:
+            RateLimiterPolicy: The effective rate policy.
+        """
+        rate_policy = self._policies.get(role_set)
+
+        if rate_policy is None:
+            rate_policy = self._policies[role_set] = self.compile(role_set)
+
+        return rate_policy
+
+
+rate_policy_registry = RatePolicyRegistry({
+    role_name: metadata["rate_policy"] for role_name, metadata in ROLES_METADATA.items()
+})
+
+
+def get_rate_policy_registry() -> RatePolicyRegistry:
+    return rate_policy_registry
@@ -0,0 +1,260 @@
+from asyncio import CancelledError, TimeoutError, create_task, sleep, wait_for
+from time import time
+from typing import Dict
+
+from redis.exceptions import RedisError
+
+from backend.app.utils.bloom import BloomFilter
+from backend.app.base.logging import logger
+from backend.app.base.config import settings
+
+REVOKED_TOKEN_KEY_PREFIX = "revoked_token:"
+REVOCATION_LOG_KEY = "revoked_token_log"
+REVOCATION_LOG_START = "0-0"
+
+
+def decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class TokenRevocationService:
+    """
+    Revocation list of access tokens, keyed by their 'jti' claim.
+
+    Each revoked token id is stored on Redis until the token expires, and
+    appended to a Redis stream, whose entry ids are assigned by Redis in
+    increasing order. Every worker mirrors the stream on a local Bloom
+    filter, synced incrementally from the id of the last entry read: a token
+    id absent from the filter is not revoked, and only filter hits are
+    confirmed on Redis. The filter is rebuilt in the background.
+
+    Until a first rebuild succeeds, the filter proves nothing: when failing
+    closed, every token is checked on Redis, and considered revoked if Redis
+    is unreachable; otherwise, e.g. on deployments without Redis, every
+    token is accepted. The first rebuild is retried in the background until
+    it succeeds.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        sync_interval: float = 1.0,
+        max_token_lifetime: float = 3600.0,
+        timeout: float = 0.05,
+        rebuild_timeout: float = 5.0,
+        fail_closed: bool = True,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.max_token_lifetime = max_token_lifetime
+        self.timeout = timeout
+        self.rebuild_timeout = rebuild_timeout
+        self.fail_closed = fail_closed
+
+        self.bloom_filter = BloomFilter(capacity, error_rate)
+        self._redis = None
+        self._task = None
+        self._rebuild_task = None
+
+        self.synced_at = 0.0
+        self.rebuilt_at = 0.0
+        self.cursor = REVOCATION_LOG_START
+
+        self.checks = 0
+        self.filter_hits = 0
+        self.revoked_hits = 0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = settings.redis_client
+
+        return self._redis
+
+    @property
+    def is_synced(self) -> bool:
+        return self.rebuilt_at > 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = create_task(self._sync_until_synced())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._rebuild_task):
+            if task is not None:
+                task.cancel()
+
+                try:
+                    await task
+                except CancelledError:
+                    pass
+
+        self._task = None
+        self._rebuild_task = None
+
+    async def _sync_until_synced(self) -> None:
+        while not self.is_synced:
+            await self.sync()
+            await sleep(self.sync_interval)
+
+    async def revoke(self, token_id: str, expires_at: float) -> bool:
+        """
+        Revokes a token until its expiration.
+
+        Args:
+            token_id (str): The token id (claim 'jti').
+            expires_at (float): The token expiration (claim 'exp').
+
+        Returns:
+            bool: True if the token was revoked, False if it already expired.
+        """
+        now = time()
+
+        if expires_at <= now:
+            return False
+
+        time_to_live = int(expires_at - now) + 1
+
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.set(f"{REVOKED_TOKEN_KEY_PREFIX}{token_id}", 1, ex=time_to_live)
+            pipeline.xadd(REVOCATION_LOG_KEY, {"token_id": token_id})
+            _, entry_id = await pipeline.execute()
+
+        self.bloom_filter.add(token_id)
+
+        # Entry ids start with the milliseconds of the Redis clock, so that
+        # the log is trimmed on the same clock whichever host revokes
+        revoked_at_ms = int(decode(entry_id).split("-")[0])
+        await self.redis.xtrim(
+            REVOCATION_LOG_KEY,
+            minid=revoked_at_ms - int(self.max_token_lifetime * 1000),
+        )
+
+        return True
+
+    async def sync(self) -> None:
+        """
+        Adds the token ids revoked since the last sync to the Bloom filter.
+        The filter is rebuilt from scratch in the background once every
+        token lifetime, or when it is full, so that expired ids do not raise
+        the false positive rate; incremental syncs go on meanwhile.
+
+        Redis failures and timeouts are logged and the current filter is
+        kept, so that an unreachable Redis never stalls token checks.
+        """
+        now = time()
+
+        if now - self.synced_at < self.sync_interval:
+            return
+
+        self.synced_at = now
+
+        is_stale = now - self.rebuilt_at >= self.max_token_lifetime
+        is_full = len(self.bloom_filter) >= self.capacity
+
+        if (is_stale or is_full) and self._rebuild_task is None:
+            self._rebuild_task = create_task(self._rebuild(now))
+
+        if not self.is_synced:
+            return
+
+        cursor = self.cursor
+
+        try:
+            new_cursor = await wait_for(self._load(self.bloom_filter, cursor), self.timeout)
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Could not sync the token revocation list: {e}")
+            return
+
+        # A rebuild finished meanwhile moves the cursor back to its own last
+        # entry, so that entries loaded into the replaced filter are read again
+        if self.cursor == cursor:
+            self.cursor = new_cursor
+
+    async def _load(self, bloom_filter: BloomFilter, cursor: str) -> str:
+        streams = await self.redis.xread({REVOCATION_LOG_KEY: cursor})
+
+        for _, entries in streams or []:
+            for entry_id, fields in entries:
+                token_id = fields.get(b"token_id", fields.get("token_id"))
+                bloom_filter.add(decode(token_id))
+                cursor = decode(entry_id)
+
+        return cursor
+
+    async def _rebuild(self, now: float) -> None:
+        bloom_filter = BloomFilter(self.capacity, self.error_rate)
+
+        try:
+            cursor = await wait_for(
+                self._load(bloom_filter, REVOCATION_LOG_START), self.rebuild_timeout
+            )
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Could not rebuild the token revocation list: {e}")
+        else:
+            self.bloom_filter = bloom_filter
+            self.cursor = cursor
+            self.rebuilt_at = now
+        finally:
+            self._rebuild_task = None
+
+    async def is_revoked(self, token_id: str) -> bool:
+        """
+        Checks whether a token was revoked. The common case, a token absent
+        from the Bloom filter, needs no network round trip.
+
+        Args:
+            token_id (str): The token id (claim 'jti').
+
+        Returns:
+            bool: True if the token was revoked, False otherwise.
+        """
+        self.checks += 1
+        await self.sync()
+
+        if self.is_synced or not self.fail_closed:
+            if token_id not in self.bloom_filter:
+                return False
+
+            self.filter_hits += 1
+
+        try:
+            is_revoked = bool(await wait_for(
+                self.redis.exists(f"{REVOKED_TOKEN_KEY_PREFIX}{token_id}"), self.timeout
+            ))
+        except (RedisError, OSError, TimeoutError) as e:
+            logger.warning(f"Could not check the token revocation list: {e}")
+            # Filter hits, and tokens checked before any sync when failing
+            # closed, are considered revoked
+            is_revoked = True
+
+        self.revoked_hits += int(is_revoked)
+
+        return is_revoked
+
+    def metrics(self) -> Dict:
+        return {
+            "filter_size": len(self.bloom_filter),
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "revoked_hits": self.revoked_hits,
+            "synced_at": self.synced_at,
+            "is_synced": self.is_synced,
+        }
+
+
+revocation_service = TokenRevocationService(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    sync_interval=settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+    max_token_lifetime=settings.ACCESS_TOKEN_EXPIRE_MINUTES.total_seconds(),
+    timeout=settings.REVOCATION_REDIS_TIMEOUT_SECONDS,
+    rebuild_timeout=settings.REVOCATION_REBUILD_TIMEOUT_SECONDS,
+    fail_closed=settings.REVOCATION_FAIL_CLOSED,
+)
+
+
+def get_revocation_service() -> TokenRevocationService:
+    return revocation_service
@@ -0,0 +1,229 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+from uuid import uuid4
+
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+
+from backend.app.base.logging import logger
+from backend.app.base.config import settings, is_sandbox
+
+SYMMETRIC_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+
+def generate_private_key(algorithm: str = "ES256") -> str:
+    """
+    Generates a PEM encoded private key for an asymmetric algorithm.
+
+    Args:
+        algorithm (str): The signing algorithm. Only 'ES256' is supported.
+
+    Returns:
+        str: The PEM encoded private key.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    if algorithm != "ES256":
+        raise ValueError(f"Cannot generate keys for algorithm: {algorithm}")
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode("utf-8")
+
+
+class SigningKey:
+    """
+    A key of the key ring, identified by its 'kid'. Retired keys only
+    verify tokens, until their `expires_at`.
+    """
+
+    def __init__(self, kid: str, algorithm: str, key_data: str):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.is_symmetric = algorithm in SYMMETRIC_ALGORITHMS
+        self.expires_at: datetime | None = None
+
+        # Keys are constructed once, instead of on every signature
+        self.private_key: Key = jwk.construct(key_data, algorithm)
+        self.public_key: Key = (
+            self.private_key if self.is_symmetric else self.private_key.public_key()
+        )
+
+    def to_jwk(self) -> Dict:
+        public_jwk = self.public_key.to_dict()
+        public_jwk.update({"kid": self.kid, "use": "sig", "alg": self.algorithm})
+
+        return public_jwk
+
+    def __repr__(self) -> str:
+        return f"SigningKey({self.kid}, {self.algorithm})"
+
+
+class KeyRing:
+    """
+    Signs tokens with the active key, tagging them with its 'kid', and
+    verifies tokens with any key of the ring. Asymmetric public keys are
+    published as a JWK set, so that other services verify tokens locally.
+
+    Rotation keeps the previous key for an overlap window, long enough for
+    the tokens it signed to expire.
+    """
+
+    def __init__(self, algorithm: str = "HS256"):
+        self.algorithm = algorithm
+        self.active_key: SigningKey | None = None
+        self.keys: Dict[str, SigningKey] = {}
+
+    def add_key(self, key: SigningKey, activate: bool = False) -> None:
+        self.keys[key.kid] = key
+
+        if activate or self.active_key is None:
+            self.active_key = key
+
+    def rotate(self, key: SigningKey, overlap: timedelta) -> None:
+        """
+        Activates a new key, keeping the current one to verify tokens during
+        the overlap window.
+
+        Args:
+            key (SigningKey): The new signing key.
+            overlap (timedelta): How long the previous key remains valid.
+        """
+        previous_key = self.active_key
+
+        if previous_key is not None:
+            previous_key.expires_at = datetime.now(timezone.utc) + overlap
+
+        self.add_key(key, activate=True)
+        self.prune()
+
+    def prune(self) -> None:
+        now = datetime.now(timezone.utc)
+
+        self.keys = {
+            kid: key
+            for kid, key in self.keys.items()
+            if key.expires_at is None or key.expires_at > now
+        }
+
+    def encode(self, claims: Dict) -> str:
+        key = self.active_key
+
+        return jwt.encode(
+            claims, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid}
+        )
+
+    def decode(self, token: str, **kwargs) -> Dict:
+        """
+        Verifies a token with the key named by its 'kid' header. Tokens with
+        no 'kid' are verified with the active key.
+
+        Args:
+            token (str): The encoded token.
+            **kwargs: Extra arguments of `jose.jwt.decode`.
+
+        Returns:
+            Dict: The verified claims.
+
+        Raises:
+            JWTError: If the token is invalid or signed by an unknown key.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid) if kid else self.active_key
+
+        if key is None or (key.expires_at and key.expires_at <= datetime.now(timezone.utc)):
+            raise JWTError(f"Unknown signing key: {kid}")
+
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm], **kwargs)
+
+    def jwks(self) -> Dict[str, List[Dict]]:
+        # Symmetric secrets are never published
+        return {
+            "keys": [
+                key.to_jwk() for key in self.keys.values() if not key.is_symmetric
+            ]
+        }
+
+
+def load_key_ring(
+    algorithm: str,
+    secret_key: str,
+    keys_dir: str | None = None,
+    active_key_id: str | None = None,
+    allow_ephemeral_key: bool = False,
+) -> KeyRing:
+    """
+    Builds the application key ring.
+
+    Symmetric algorithms use the shared secret. Asymmetric algorithms load
+    every `<kid>.pem` private key from `keys_dir`: the one named by
+    `active_key_id` (or else the last kid in order) signs, and the others
+    only verify. Publishing the next key ahead of its activation, and
+    removing the previous one only after its tokens expired, gives
+    overlapping rotation windows.
+
+    Without any key, a key is generated for the current process. Workers
+    would not verify each other's tokens, hence this is only allowed on
+    sandbox environments.
+
+    Args:
+        algorithm (str): The signing algorithm.
+        secret_key (str): The shared secret of symmetric algorithms.
+        keys_dir (str | None): The directory of PEM private keys.
+        active_key_id (str | None): The kid of the signing key.
+        allow_ephemeral_key (bool): Whether to generate a key when none is found.
+
+    Returns:
+        KeyRing: The key ring.
+
+    Raises:
+        ValueError: If no asymmetric key is found and ephemeral keys are not allowed.
+    """
+    key_ring = KeyRing(algorithm)
+
+    if algorithm in SYMMETRIC_ALGORITHMS:
+        key_ring.add_key(SigningKey("default", algorithm, secret_key))
+        return key_ring
+
+    key_paths = sorted(Path(keys_dir).glob("*.pem")) if keys_dir else []
+
+    for key_path in key_paths:
+        key_ring.add_key(SigningKey(key_path.stem, algorithm, key_path.read_text()))
+
+    if not key_paths and not allow_ephemeral_key:
+        raise ValueError(
+            f"No signing keys were found in JWT_KEYS_DIR ({keys_dir}) for {algorithm}"
+        )
+
+    if not key_paths:
+        logger.warning(
+            "No signing keys were found: an ephemeral key is used, "
+            "which is not shared across workers."
+        )
+        key_ring.add_key(SigningKey(uuid4().hex, algorithm, generate_private_key(algorithm)))
+
+    active_key_id = active_key_id or (key_paths[-1].stem if key_paths else None)
+
+    if active_key_id in key_ring.keys:
+        key_ring.active_key = key_ring.keys[active_key_id]
+
+    return key_ring
+
+
+key_ring = load_key_ring(
+    algorithm=settings.JWT_ALGORITHM,
+    secret_key=settings.JWT_SECRET_KEY,
+    keys_dir=settings.JWT_KEYS_DIR,
+    active_key_id=settings.JWT_ACTIVE_KEY_ID,
+    allow_ephemeral_key=is_sandbox(settings.ENVIRONMENT),
+)
+
+
+def get_key_ring() -> KeyRing:
+    return key_ring
@@ -0,0 +1,54 @@
+from hashlib import blake2b
+from math import ceil, log
+
+
+class BloomFilter:
+    """
+    Probabilistic set membership: `item in bloom_filter` is never False for
+    an added item, and is True for an absent item with about `error_rate`
+    probability once `capacity` items were added.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("The capacity must be positive")
+
+        if not 0 < error_rate < 1:
+            raise ValueError("The error rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self.count = 0
+
+        self._bits = bytearray(ceil(self.size / 8))
+
+    def _positions(self, item: str):
+        # Double hashing: the k positions derive from two 64-bit hashes
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "little")
+        second_hash = int.from_bytes(digest[8:], "little") | 1
+
+        for index in range(self.hash_count):
+            yield (first_hash + index * second_hash) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
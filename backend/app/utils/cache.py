@@ -0,0 +1,199 @@
+from collections import OrderedDict
+from hashlib import sha256
+from time import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache whose entries expire at an absolute
+    UNIX timestamp.
+
+    The cache is meant to be used from a single event loop, hence it does
+    not hold any lock.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Retrieves a value from the cache, marking it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Any | None: The cached value, or None if absent or expired.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time():
+            self.pop(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """
+        Stores a value until the given expiration timestamp, evicting the
+        least recently used entries when the cache is full.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to store.
+            expires_at (float): UNIX timestamp after which the entry is stale.
+        """
+        if expires_at <= time():
+            return
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self.pop(oldest_key)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def token_digest(token: str) -> bytes:
+    return sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache(LRUCache):
+    """
+    Cache of verified tokens keyed by their SHA-256 digest. Entries are
+    indexed by user id, so that every token of a user can be dropped at once.
+    Invalidation only reaches the current process, hence `max_ttl` bounds how
+    long other processes keep serving a stale entry.
+    """
+
+    def __init__(self, max_size: int = 1024, max_ttl: float | None = None):
+        super().__init__(max_size)
+        self.max_ttl = max_ttl
+        self._user_keys: Dict[str, Set[bytes]] = {}
+        self._key_users: Dict[bytes, str] = {}
+
+    def get_token(self, token: str) -> Optional[Any]:
+        return self.get(token_digest(token))
+
+    def set_token(
+        self, token: str, user_id: Any, principal: Any, expires_at: float
+    ) -> None:
+        """
+        Stores the principal resolved from a verified token.
+
+        Args:
+            token (str): The verified token.
+            user_id (Any): The id of the user the token belongs to.
+            principal (Any): The resolved principal.
+            expires_at (float): The token expiration (claim 'exp').
+        """
+        key = token_digest(token)
+        user_key = str(user_id)
+
+        if self.max_ttl is not None:
+            expires_at = min(expires_at, time() + self.max_ttl)
+
+        self.set(key, principal, expires_at)
+
+        if key in self:
+            self._user_keys.setdefault(user_key, set()).add(key)
+            self._key_users[key] = user_key
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        user_key = self._key_users.pop(key, None)
+
+        if user_key is not None:
+            user_keys = self._user_keys.get(user_key, set())
+            user_keys.discard(key)
+
+            if not user_keys:
+                self._user_keys.pop(user_key, None)
+
+        return super().pop(key)
+
+    def invalidate_user(self, user_id: Any) -> int:
+        """
+        Drops every cached token of a user.
+
+        Args:
+            user_id (Any): The id of the user.
+
+        Returns:
+            int: The number of dropped entries.
+        """
+        keys = self._user_keys.pop(str(user_id), set())
+
+        for key in keys:
+            self._key_users.pop(key, None)
+            super().pop(key)
+
+        return len(keys)
+
+    def clear(self) -> None:
+        super().clear()
+        self._user_keys.clear()
+        self._key_users.clear()
+
+
+class EpochRegistry:
+    """
+    Latest token epoch known for each user. Tokens minted at an older epoch
+    than the registered one are considered revoked.
+    """
+
+    def __init__(self):
+        self._epochs: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+    def get(self, user_id: Any) -> int:
+        return self._epochs.get(str(user_id), 0)
+
+    def set(self, user_id: Any, epoch: int) -> None:
+        user_key = str(user_id)
+        self._epochs[user_key] = max(epoch, self._epochs.get(user_key, 0))
+
+    def update(self, epochs: Iterable[Tuple[Any, int]]) -> None:
+        for user_id, epoch in epochs:
+            self.set(user_id, epoch)
+
+    def is_stale(self, user_id: Any, epoch: int) -> bool:
+        return epoch < self.get(user_id)
@@ -0,0 +1,9 @@
+# The bitmap codec and the registry are shared with the standalone token
+# verifier, so that both sides read permission bitmaps the same way
+from backend.verifier.permissions import PermissionRegistry, decode_bitmap, encode_bitmap
+
+__all__ = [
+    "PermissionRegistry",
+    "decode_bitmap",
+    "encode_bitmap",
+]
@@ -1,7 +1,54 @@
 from fastapi import Request
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
+from typing import Iterable, Tuple
+
+from backend.app.base.config import settings
 
 def get_token(request: Request) -> str:
     return request.headers.get('Authorization', '').replace('Bearer ', '')
 
 def get_route(request: Request) -> str:
-    return request.scope['path']
\ No newline at end of file
+    return request.scope['path']
+
+@lru_cache(maxsize=8)
+def parse_networks(networks: Tuple[str, ...]) -> Tuple:
+    return tuple(ip_network(network, strict=False) for network in networks)
+
+def is_trusted_proxy(host: str, trusted_proxies: Iterable[str]) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+
+    return any(address in network for network in parse_networks(tuple(trusted_proxies)))
+
+def get_client_ip(request: Request, trusted_proxies: Iterable[str] | None = None) -> str | None:
+    """
+    Retrieves the IP of the client. The X-Forwarded-For header is only read
+    on requests from a trusted proxy, and its right-most untrusted hop is
+    the client, since the left-most hops can be set by anyone.
+
+    Args:
+        request (Request): The incoming request.
+        trusted_proxies (Iterable[str], optional): Trusted proxy IPs or
+            networks. Defaults to the TRUSTED_PROXIES setting.
+
+    Returns:
+        str | None: The client IP, or None if unknown.
+    """
+    trusted_proxies = settings.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+    client_host = request.client.host if request.client else None
+
+    if client_host is None or not is_trusted_proxy(client_host, trusted_proxies):
+        return client_host
+
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop, trusted_proxies):
+            return hop
+
+    # Every hop is a trusted proxy: the left-most one is the closest to the client
+    return hops[0] if hops else client_host
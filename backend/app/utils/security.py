@@ -1,10 +1,116 @@
 import re
+import hmac
+from hashlib import sha256
+from math import floor, log2
+from time import perf_counter
+from typing import Tuple
 from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
 
 import uuid
 
-# Create a new CryptContext object
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend.app.base.config import settings
+
+# Supported password hash schemes, by preference, and their cost parameter
+# range: bcrypt rounds are a log2 cost, argon2 rounds its time cost
+PASSWORD_HASH_SCHEMES = ("argon2", "bcrypt")
+PASSWORD_HASH_COST_RANGES = {"bcrypt": (4, 31), "argon2": (1, 64)}
+
+
+def is_hash_scheme_available(scheme: str) -> bool:
+    return get_crypt_handler(scheme).has_backend()
+
+
+def build_password_context(scheme: str = "bcrypt", cost: int | None = None) -> CryptContext:
+    """
+    Builds the password context hashing with the given scheme. Hashes of the
+    other available schemes, or of another cost, still verify, but are
+    flagged by `needs_update`.
+
+    Args:
+        scheme (str): The hash scheme, 'bcrypt' or 'argon2' (argon2id).
+        cost (int, optional): The scheme cost. The passlib default if None.
+
+    Returns:
+        CryptContext: The password context.
+
+    Raises:
+        ValueError: If the scheme is unknown or has no backend installed.
+    """
+    if scheme not in PASSWORD_HASH_SCHEMES:
+        raise ValueError(
+            f"Invalid password hash scheme: {scheme}. "
+            f"Valid schemes are: {list(PASSWORD_HASH_SCHEMES)}"
+        )
+
+    if not is_hash_scheme_available(scheme):
+        raise ValueError(
+            f"Password hash scheme {scheme} has no backend installed: "
+            f"install passlib[{scheme}]"
+        )
+
+    other_schemes = [
+        other_scheme for other_scheme in PASSWORD_HASH_SCHEMES
+        if other_scheme != scheme and is_hash_scheme_available(other_scheme)
+    ]
+
+    context_settings = {}
+    if scheme == "argon2":
+        context_settings["argon2__type"] = "ID"
+
+    if cost is not None:
+        context_settings[f"{scheme}__default_rounds"] = cost
+        context_settings[f"{scheme}__min_rounds"] = cost
+        context_settings[f"{scheme}__max_rounds"] = cost
+
+    return CryptContext(
+        schemes=[scheme, *other_schemes], deprecated="auto", **context_settings
+    )
+
+
+def measure_verify_latency(scheme: str, cost: int, samples: int = 3) -> float:
+    handler = get_crypt_handler(scheme).using(rounds=cost)
+    hashed_string = handler.hash("calibration_password")
+
+    latencies = []
+    for _ in range(samples):
+        start_time = perf_counter()
+        handler.verify("calibration_password", hashed_string)
+        latencies.append(perf_counter() - start_time)
+
+    return min(latencies)
+
+
+def calibrate_password_cost(scheme: str = "bcrypt", target_latency: float = 0.25) -> int:
+    """
+    Benchmarks the host and picks the highest cost whose verify latency
+    does not exceed the target, e.g. to set PASSWORD_HASH_COST.
+
+    Args:
+        scheme (str): The hash scheme, 'bcrypt' or 'argon2'.
+        target_latency (float): The target verify latency, in seconds.
+
+    Returns:
+        int: The calibrated cost.
+    """
+    min_cost, max_cost = PASSWORD_HASH_COST_RANGES[scheme]
+
+    if scheme == "bcrypt":
+        # Each bcrypt round doubles the work
+        base_cost = 8
+        latency = measure_verify_latency(scheme, base_cost)
+        cost = base_cost + floor(log2(target_latency / latency))
+    else:
+        # Argon2 work grows linearly with its time cost
+        latency = measure_verify_latency(scheme, min_cost)
+        cost = floor(target_latency / latency)
+
+    return max(min_cost, min(cost, max_cost))
+
+
+pwd_context = build_password_context(
+    settings.PASSWORD_HASH_SCHEME, settings.PASSWORD_HASH_COST
+)
 
 def hash_string(string: str) -> str:
     """
@@ -30,7 +136,49 @@ def is_hash_from_string(string, hash_string):
         bool: True if the string matches the hash string, False otherwise.
     """
     return pwd_context.verify(string, hash_string)
-    
+
+def verify_and_update_hash(string: str, hash_string: str) -> Tuple[bool, str | None]:
+    """
+    Checks if a given string matches a hash string and, on a match, rehashes
+    it if the hash scheme or cost are outdated.
+
+    Args:
+        string (str): The string to check.
+        hash_string (str): The hash string to compare against.
+
+    Returns:
+        Tuple[bool, str | None]: Whether the string matches, and the new hash
+            if the hash string is outdated.
+    """
+    return pwd_context.verify_and_update(string, hash_string)
+
+
+def hash_token(token: str) -> str:
+    """
+    Computes the fixed-length SHA-256 hex digest under which a token is stored.
+
+    Args:
+        token (str): The token to be hashed.
+
+    Returns:
+        str: The 64 characters long hex digest.
+    """
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
+def hmac_token(token: str, key: str) -> str:
+    """
+    Computes the HMAC-SHA256 hex digest of a token under a server-side key.
+
+    Args:
+        token (str): The token to be digested.
+        key (str): The secret key.
+
+    Returns:
+        str: The 64 characters long hex digest.
+    """
+    return hmac.new(key.encode("utf-8"), token.encode("utf-8"), sha256).hexdigest()
+
 
 def is_valid_uuid(uuid_str: str):
     """
@@ -1,6 +1,7 @@
 from fastapi import Request
 
 from backend.app.models.throttling import RateLimiterPolicy
+from backend.app.utils.request import get_client_ip
 
 def get_minute_rate_limiter(times: int):
     return RateLimiterPolicy(
@@ -8,8 +9,4 @@ def get_minute_rate_limiter(times: int):
     )
 
 async def ip_identifier(request: Request):
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0]
-    
-    return request.client.host + ":" + request.scope["path"]
+    return f"{get_client_ip(request)}:{request.scope['path']}"
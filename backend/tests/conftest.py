@@ -20,6 +20,8 @@ from backend.app.database.models.users import User
 from backend.app.database.models.auth import Role 
 from backend.app.repositories.users import UsersRepository
 from backend.app.repositories.auth import RoleRepository, PermissionRepository
+from backend.app.repositories.tokens import RefreshTokenRepository
+from backend.app.repositories.api_keys import APIKeyRepository
 from backend.app.data.auth import ROLES_METADATA
 from backend.app.database.initial_data import insert_initial_data
 from backend.app.base.config import settings
@@ -85,6 +87,21 @@ async def test_user_repository(test_session):
     finally:
         await test_session.aclose()
 
+@pytest.fixture
+async def test_refresh_token_repository(test_session):
+    try:
+        yield RefreshTokenRepository(session=test_session)
+    finally:
+        await test_session.aclose()
+
+
+@pytest.fixture
+async def test_api_key_repository(test_session):
+    try:
+        yield APIKeyRepository(session=test_session)
+    finally:
+        await test_session.aclose()
+
 @pytest.fixture
 async def test_role_repository(test_session):
     try:
@@ -3,21 +3,41 @@ from typing import List
 from fastapi import Depends
 
 from datetime import datetime, timedelta
+from time import time
 from fastapi import HTTPException
 from jose import jwt, JWTError
-from unittest.mock import patch
+from starlette.requests import Request
+from unittest.mock import patch, AsyncMock
 
 
 from backend.app.utils.database import model_to_dict
 
 from backend.app.base.auth import (
+    get_api_key_user,
+    resolve_principal,
     get_current_user,
+    get_request_user,
+    get_token_claims,
+    introspect_tokens,
     validate_refresh_token,
     create_token,
     role_checker,
     JWT_ALGORITHM,
     JWT_SECRET_KEY,
 )
+from backend.app.base.cache import token_cache, claims_cache, api_key_cache, user_epochs
+from backend.app.models.auth import Principal
+from backend.app.repositories.api_keys import digest_api_key_secret
+from backend.app.services.revocation import revocation_service
+from backend.app.services.hashing import password_hasher
+from backend.app.base.config import settings
+
+
+@pytest.fixture(autouse=True)
+def synced_revocation_list(monkeypatch):
+    # An empty revocation list, synced as if Redis was reachable
+    monkeypatch.setattr(revocation_service, "rebuilt_at", time())
+    monkeypatch.setattr(revocation_service, "synced_at", time())
 
 @pytest.mark.asyncio
 async def test_get_user_existing(test_user_repository, test_viewer):
@@ -41,8 +61,9 @@ async def test_authenticate_user_correct_credentials(
 ):
     username = test_admin.user_username
 
-    is_authentic = await test_user_repository.is_user_credentials_authentic(
-        username, test_admin_data['password']
+    user = await test_user_repository.get_user_by_username(username)
+    is_authentic = await password_hasher.verify(
+        test_admin_data['password'], user.user_hashed_password
     )
 
     assert is_authentic
@@ -53,9 +74,8 @@ async def test_authenticate_user_incorrect_password(test_user_repository, test_v
     username = test_viewer.user_username
     incorrect_password = "any_password"
 
-    is_authentic = await test_user_repository.is_user_credentials_authentic(
-        username, incorrect_password
-    )
+    user = await test_user_repository.get_user_by_username(username)
+    is_authentic = await password_hasher.verify(incorrect_password, user.user_hashed_password)
 
     assert not is_authentic
 
@@ -347,6 +367,7 @@ async def test_role_checker_allows_authorized_role():
     class MockUser:
         def __init__(self, roles: List[str]):
             self.user_roles = roles
+            self.role_names = roles
             
         def has_roles(self, given_roles):
             user_roles_set = { role_name for role_name in self.user_roles }
@@ -368,4 +389,265 @@ async def test_role_checker_allows_authorized_role():
         assert await protected_view(current_user=mock_user) == "Success"
 
 
+@pytest.mark.asyncio
+async def test_get_request_user_resolves_user_once():
+    request = Request({"type": "http", "headers": [], "state": {}})
+    mock_user = object()
+
+    with patch(
+        "backend.app.base.auth.get_current_user", new_callable=AsyncMock
+    ) as mock_get_current_user:
+        mock_get_current_user.return_value = mock_user
+
+        first_user = await get_request_user(request, "token")
+        second_user = await get_request_user(request, "token")
+
+    assert first_user is mock_user
+    assert second_user is mock_user
+    mock_get_current_user.assert_awaited_once_with("token")
+
+
+@pytest.mark.asyncio
+async def test_get_request_user_missing_token():
+    request = Request({"type": "http", "headers": [], "state": {}})
+
+    with pytest.raises(HTTPException) as excinfo:
+        await get_request_user(request, "")
+
+    assert "Missing token" in str(excinfo.value)
+
+
+class MockClaimsUser:
+    def __init__(self, roles: List[str], permissions: List[str], epoch: int = 0):
+        self.user_id = "f2a3e0a8-0d0c-4b8e-9a4e-7d3c1f0b9d21"
+        self.user_username = "claims_user"
+        self.role_names = roles
+        self.permission_names = permissions
+        self.user_token_epoch = epoch
+
+
+@pytest.mark.asyncio
+async def test_get_token_claims_on_claims_mode():
+    mock_user = MockClaimsUser(["Viewer"], ["view_content"])
+
+    with patch.object(settings, "AUTH_CLAIMS_MODE", True):
+        token = create_token({"sub": mock_user.user_username}, user=mock_user)
+        claims = get_token_claims(token)
+
+    assert claims.user_username == mock_user.user_username
+    assert claims.has_roles(("Admin", "Viewer"))
+    assert not claims.has_roles(("Admin",))
+    assert claims.has_permissions(("view_content",))
+    assert not claims.has_permissions(("view_content", "manage_users"))
 
+
+def test_create_token_on_claims_mode_caps_expiration():
+    mock_user = MockClaimsUser(["Viewer"], ["view_content"])
+
+    with patch.object(settings, "AUTH_CLAIMS_MODE", True):
+        token = create_token(
+            {"sub": mock_user.user_username}, timedelta(days=1), user=mock_user
+        )
+
+    decoded_token = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    expire_time = datetime.fromtimestamp(decoded_token["exp"])
+
+    assert expire_time <= datetime.now() + settings.CLAIMS_TOKEN_EXPIRE_MINUTES
+
+
+def test_get_token_claims_without_claims():
+    token = create_token({"sub": "claims_user"})
+
+    assert get_token_claims(token) is None
+
+
+def test_get_token_claims_stale_epoch():
+    mock_user = MockClaimsUser(["Viewer"], ["view_content"], epoch=0)
+
+    with patch.object(settings, "AUTH_CLAIMS_MODE", True):
+        token = create_token({"sub": "stale_claims_user"}, user=mock_user)
+
+    with patch.dict(user_epochs._epochs, {mock_user.user_id: 1}):
+        with pytest.raises(HTTPException) as excinfo:
+            get_token_claims(token)
+
+    assert "This token has expired" in str(excinfo.value)
+
+
+def test_get_token_claims_cached_with_stale_epoch():
+    mock_user = MockClaimsUser(["Viewer"], ["view_content"], epoch=0)
+
+    with patch.object(settings, "AUTH_CLAIMS_MODE", True):
+        token = create_token({"sub": "cached_claims_user"}, user=mock_user)
+
+    assert get_token_claims(token) is not None
+
+    # Bumped by another worker, after the claims were cached
+    with patch.dict(user_epochs._epochs, {mock_user.user_id: 1}):
+        with pytest.raises(HTTPException) as excinfo:
+            get_token_claims(token)
+
+    assert "This token has expired" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_revoked_cached_token():
+    token = create_token({"sub": "cached_user"})
+    token_cache.set_token(
+        token, "cached_user_id", ("cached_user", "token_id"), datetime.now().timestamp() + 60
+    )
+
+    is_revoked_mock = AsyncMock(return_value=True)
+
+    try:
+        with patch.object(revocation_service, "is_revoked", is_revoked_mock):
+            with pytest.raises(HTTPException) as excinfo:
+                await get_current_user(token)
+    finally:
+        token_cache.invalidate_user("cached_user_id")
+
+    is_revoked_mock.assert_awaited_once_with("token_id")
+    assert "This token has been revoked" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_resolve_principal_claims_less_token_on_claims_mode():
+    # Tokens without claims are cached by get_current_user, which must not
+    # be read back as claims
+    token = create_token({"sub": "claims_less_user"})
+    principal = Principal("claims_less_user_id", "claims_less_user")
+
+    user_repository = AsyncMock()
+    user_repository.get_principal.return_value = principal
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__.return_value = user_repository
+
+    try:
+        with patch.object(settings, "AUTH_CLAIMS_MODE", True), patch(
+            "backend.app.base.auth.user_repository_async_context_manager",
+            return_value=context_manager,
+        ):
+            assert await resolve_principal(token) is principal
+            assert await resolve_principal(token) is principal
+    finally:
+        token_cache.invalidate_user(principal.user_id)
+        claims_cache.invalidate_user(principal.user_id)
+
+    user_repository.get_principal.assert_awaited_once_with("claims_less_user")
+
+
+class MockIntrospectionUser:
+    def __init__(self, username: str, is_active: bool = True):
+        self.user_id = f"{username}_id"
+        self.user_username = username
+        self.user_is_active = is_active
+        self.user_token_epoch = 0
+        self.role_names = ["Viewer"]
+
+
+@pytest.mark.asyncio
+async def test_introspect_tokens_loads_subjects_at_once():
+    users = [MockIntrospectionUser("user_1"), MockIntrospectionUser("user_2", False)]
+    user_repository = AsyncMock()
+    user_repository.get_users_by_usernames.return_value = users
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__.return_value = user_repository
+
+    tokens = [
+        create_token({"sub": "user_1"}),
+        create_token({"sub": "user_2"}),
+        create_token({"sub": "unknown_user"}),
+        create_token({"sub": "user_1"}, timedelta(seconds=-1)),
+        "invalid_token",
+    ]
+
+    with patch(
+        "backend.app.base.auth.user_repository_async_context_manager",
+        return_value=context_manager,
+    ):
+        introspections = await introspect_tokens(tokens + tokens[:1])
+
+    user_repository.get_users_by_usernames.assert_awaited_once()
+    usernames = user_repository.get_users_by_usernames.await_args.args[0]
+
+    assert sorted(usernames) == ["unknown_user", "user_1", "user_2"]
+    assert [introspection.active for introspection in introspections] == [
+        True, False, False, False, False, True
+    ]
+    assert introspections[0].sub == "user_1"
+    assert introspections[0].roles == ["Viewer"]
+
+
+class MockAPIKey:
+    def __init__(self, secret: str, user, is_revoked: bool = False):
+        self.apke_secret_digest = digest_api_key_secret(secret)
+        self.apke_expires_at = None
+        self.apke_user = user
+        self.is_revoked = is_revoked
+        self.is_expired = False
+
+
+class MockAPIKeyUser(MockIntrospectionUser):
+    def __init__(self, username: str):
+        super().__init__(username)
+        self.user_roles = [MockRole("viewer_role_id", "Viewer")]
+
+
+class MockRole:
+    def __init__(self, role_id: str, role_name: str):
+        self.role_id = role_id
+        self.role_name = role_name
+
+
+@pytest.mark.asyncio
+async def test_get_api_key_user_caches_resolved_keys():
+    user = MockAPIKeyUser("service_account")
+    api_key_repository = AsyncMock()
+    api_key_repository.get_api_key_by_prefix.return_value = MockAPIKey("secret", user)
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__.return_value = api_key_repository
+
+    api_key_cache.clear()
+
+    with patch(
+        "backend.app.base.auth.api_key_repository_async_context_manager",
+        return_value=context_manager,
+    ):
+        principal = await get_api_key_user("ak_prefix.secret")
+        assert await get_api_key_user("ak_prefix.secret") is principal
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_api_key_user("ak_prefix.wrong_secret")
+
+    assert exc_info.value.status_code == 401
+    assert principal.user_username == "service_account"
+    assert principal.role_ids == ("viewer_role_id",)
+    assert principal.role_names == ("Viewer",)
+
+    # The second call is served from the cache
+    assert api_key_repository.get_api_key_by_prefix.await_count == 2
+    api_key_repository.get_api_key_by_prefix.assert_awaited_with("prefix")
+
+    api_key_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_api_key_user_revoked_key():
+    user = MockAPIKeyUser("service_account")
+    api_key_repository = AsyncMock()
+    api_key_repository.get_api_key_by_prefix.return_value = MockAPIKey("secret", user, True)
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__.return_value = api_key_repository
+
+    with patch(
+        "backend.app.base.auth.api_key_repository_async_context_manager",
+        return_value=context_manager,
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_api_key_user("ak_prefix.secret")
+
+    assert exc_info.value.status_code == 401
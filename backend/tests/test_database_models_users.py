@@ -2,6 +2,7 @@
 
 from backend.app.utils.security import hash_string
 from backend.app.database.models.users import User
+from backend.app.database.models.auth import Role, Permission, RolePermission
 
 
 def test_user_strings():
@@ -45,4 +46,23 @@ def test_user_equality():
     )
     assert new_user_1 != new_user_2
     assert new_user_1 == new_user_3
-    assert new_user_2 == new_user_4 
\ No newline at end of file
+    assert new_user_2 == new_user_4 
+
+def test_user_roles_and_permissions():
+    permission = Permission(perm_name='view_content')
+    role = Role(role_name='Viewer', role_permissions=[
+        RolePermission(permission=permission)
+    ])
+    new_user = User(
+        user_username='test_user',
+        user_hashed_password=hash_string('Secret_password_123'),
+        user_email='test@example.com',
+        user_roles=[role],
+    )
+
+    assert new_user.role_names == ['Viewer']
+    assert new_user.permission_names == ['view_content']
+    assert new_user.has_roles(('Admin', 'Viewer'))
+    assert not new_user.has_roles(('Admin',))
+    assert new_user.has_permissions(('view_content',))
+    assert not new_user.has_permissions(('manage_users',))
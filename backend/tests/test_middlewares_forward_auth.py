@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from backend.app.base.exceptions import ExpiredTokenException
+from backend.app.models.auth import TokenClaims
+from backend.app.middlewares.forward_auth import (
+    ForwardAuthMiddleware, FORWARD_AUTH_PATH, get_bearer_token,
+)
+
+
+def scope_factory(path: str = FORWARD_AUTH_PATH, token: str | None = "token"):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "method": "GET", "path": path, "headers": headers}
+
+
+async def call_middleware(scope):
+    app = AsyncMock()
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await ForwardAuthMiddleware(app)(scope, AsyncMock(), send)
+
+    return app, messages
+
+
+def test_get_bearer_token():
+    assert get_bearer_token(scope_factory(token="token")) == "token"
+    assert get_bearer_token(scope_factory(token=None)) is None
+    assert get_bearer_token({"headers": [(b"authorization", b"Basic abc")]}) is None
+
+
+@pytest.mark.asyncio
+async def test_forward_auth_valid_token():
+    principal = TokenClaims("user_id", "user", ["Admin", "Viewer"], [])
+
+    with patch(
+        "backend.app.middlewares.forward_auth.resolve_principal",
+        AsyncMock(return_value=principal),
+    ):
+        app, messages = await call_middleware(scope_factory())
+
+    start_message, body_message = messages
+    headers = dict(start_message["headers"])
+
+    app.assert_not_awaited()
+    assert start_message["status"] == 200
+    assert headers[b"x-auth-user-id"] == b"user_id"
+    assert headers[b"x-auth-roles"] == b"Admin,Viewer"
+    assert body_message["body"] == b""
+
+
+@pytest.mark.asyncio
+async def test_forward_auth_invalid_token():
+    with patch(
+        "backend.app.middlewares.forward_auth.resolve_principal",
+        AsyncMock(side_effect=ExpiredTokenException()),
+    ):
+        _, messages = await call_middleware(scope_factory())
+
+    assert messages[0]["status"] == 401
+    assert messages[1]["body"] == b""
+
+
+@pytest.mark.asyncio
+async def test_forward_auth_missing_token():
+    _, messages = await call_middleware(scope_factory(token=None))
+
+    assert messages[0]["status"] == 401
+
+
+@pytest.mark.asyncio
+async def test_forward_auth_other_paths_reach_the_app():
+    app, messages = await call_middleware(scope_factory(path="/api/users"))
+
+    app.assert_awaited_once()
+    assert messages == []
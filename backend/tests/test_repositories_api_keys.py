@@ -0,0 +1,33 @@
+import pytest
+
+from backend.app.repositories.api_keys import (
+    digest_api_key_secret, is_api_key, split_api_key,
+)
+
+
+def test_split_api_key():
+    assert split_api_key("ak_0123abcd.secret.part") == ("0123abcd", "secret.part")
+    assert split_api_key("ak_0123abcd") is None
+    assert split_api_key("ak_.secret") is None
+    assert split_api_key("0123abcd.secret") is None
+
+
+@pytest.mark.asyncio
+async def test_create_and_revoke_api_key(test_api_key_repository, dummy_user):
+    api_key, key = await test_api_key_repository.create_api_key(
+        dummy_user.user_id, "service"
+    )
+    prefix, secret = split_api_key(key)
+
+    assert is_api_key(key)
+    assert prefix == api_key.apke_prefix
+    # Only the digest of the secret is stored
+    assert api_key.apke_secret_digest == digest_api_key_secret(secret)
+
+    stored_key = await test_api_key_repository.get_api_key_by_prefix(prefix)
+
+    assert stored_key.apke_user.user_username == dummy_user.user_username
+    assert not stored_key.is_revoked
+
+    assert await test_api_key_repository.revoke_api_key(dummy_user.user_id, prefix)
+    assert not await test_api_key_repository.revoke_api_key(dummy_user.user_id, prefix)
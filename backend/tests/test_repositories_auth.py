@@ -1,6 +1,11 @@
 import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
 from backend.app.models.users import UnhashedUpdateUser
 from backend.app.utils.throttling import get_minute_rate_limiter
+from backend.app.repositories.auth import PermissionRepository, RoleRepository
+from backend.app.services.authorization import AUTHORIZATION_CHANNEL
+from backend.app.services.rate_policies import RATE_POLICIES_CHANNEL
 
 @pytest.mark.asyncio
 async def test_get_all_roles(test_role_repository, new_role):
@@ -54,6 +59,63 @@ async def test_create_role(test_role_repository, test_permission_repository, sup
 
     await test_role_repository.delete_role(new_role)
 
+@pytest.mark.asyncio
+async def test_get_user_role_sets(test_role_repository, dummy_user):
+    role_sets=await test_role_repository.get_user_role_sets()
+
+    assert frozenset(dummy_user.role_names) in role_sets
+
+@pytest.mark.asyncio
+async def test_get_role_rate_policies(test_role_repository, admin_role):
+    role_policies=await test_role_repository.get_role_rate_policies()
+
+    assert role_policies[admin_role.role_name].to_dict() == admin_role.role_rate_limit
+
+@pytest.mark.asyncio
+async def test_update_role_notifies_every_worker():
+    session = AsyncMock()
+    role = MagicMock(role_name="Viewer")
+
+    with patch.object(RoleRepository, "compile_authorization", AsyncMock()) as compile_authorization:
+        await RoleRepository(session).update_role(role)
+
+    notified_channels = [
+        parameters["channel"] for (_, parameters), _ in session.execute.call_args_list
+    ]
+
+    assert notified_channels == [RATE_POLICIES_CHANNEL, AUTHORIZATION_CHANNEL]
+    compile_authorization.assert_awaited_once()
+    session.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_create_permission_allocates_its_bit_on_the_database():
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=42))
+
+    with patch.object(PermissionRepository, "load_permission_registry", AsyncMock()) as load_permission_registry:
+        permission = await PermissionRepository(session).create_permission("dummy_permission")
+
+    statements = [str(args[0]) for args, _ in session.execute.call_args_list]
+
+    assert permission.perm_bit == 42
+    assert "pg_advisory_xact_lock" in statements[0]
+    assert session.execute.call_args_list[-1].args[1]["channel"] == AUTHORIZATION_CHANNEL
+    session.commit.assert_awaited_once()
+    load_permission_registry.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_get_role_rate_policies_skips_invalid_rate_limits():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock(all=MagicMock(return_value=[
+        ("Viewer", get_minute_rate_limiter(10).to_dict()),
+        ("Broken", {"times": 0, "minutes": 1}),
+    ]))
+
+    role_policies = await RoleRepository(session).get_role_rate_policies()
+
+    assert list(role_policies) == ["Viewer"]
+
 def test_check_at_least_one_not_null():
     with pytest.raises(ValueError) as excinfo:
         UnhashedUpdateUser()
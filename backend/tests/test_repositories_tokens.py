@@ -0,0 +1,79 @@
+import pytest
+from datetime import timedelta
+from uuid import uuid4
+
+from backend.app.base.auth import create_token
+from backend.app.repositories.tokens import build_refresh_token
+from backend.app.utils.security import hash_token
+
+
+def test_build_refresh_token():
+    user_id = uuid4()
+    token = create_token({"sub": "user"}, timedelta(minutes=5))
+
+    refresh_token = build_refresh_token(user_id, token)
+
+    assert refresh_token.reto_token_hash == hash_token(token)
+    assert refresh_token.reto_user_id == user_id
+    assert refresh_token.reto_family_id is not None
+    assert refresh_token.reto_expires_at is not None
+    assert not refresh_token.is_revoked
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token(test_refresh_token_repository, dummy_user):
+    token = create_token({"sub": dummy_user.user_username})
+    new_token = create_token({"sub": dummy_user.user_username})
+
+    stored_token = await test_refresh_token_repository.create_refresh_token(
+        dummy_user.user_id, token
+    )
+    rotated_token = await test_refresh_token_repository.rotate_refresh_token(
+        token, new_token
+    )
+    old_token = await test_refresh_token_repository.get_refresh_token(token)
+
+    assert rotated_token.reto_family_id == stored_token.reto_family_id
+    assert old_token.is_revoked
+
+    # A token is rotated at most once
+    assert await test_refresh_token_repository.rotate_refresh_token(token, new_token) is None
+
+
+@pytest.mark.asyncio
+async def test_revoke_token_family(test_refresh_token_repository, dummy_user):
+    token = create_token({"sub": dummy_user.user_username})
+    other_session_token = create_token({"sub": dummy_user.user_username})
+
+    stored_token = await test_refresh_token_repository.create_refresh_token(
+        dummy_user.user_id, token
+    )
+    await test_refresh_token_repository.create_refresh_token(
+        dummy_user.user_id, other_session_token
+    )
+
+    revoked_count = await test_refresh_token_repository.revoke_token_family(
+        stored_token.reto_family_id
+    )
+    other_token = await test_refresh_token_repository.get_refresh_token(other_session_token)
+
+    assert revoked_count == 1
+    assert not other_token.is_revoked
+
+
+@pytest.mark.asyncio
+async def test_delete_expired_refresh_tokens(test_refresh_token_repository, dummy_user):
+    expired_tokens = [
+        create_token({"sub": dummy_user.user_username}, timedelta(seconds=-1))
+        for _ in range(3)
+    ]
+
+    for token in expired_tokens:
+        await test_refresh_token_repository.create_refresh_token(dummy_user.user_id, token)
+
+    deleted_count = await test_refresh_token_repository.delete_expired_refresh_tokens(
+        batch_size=2
+    )
+
+    assert deleted_count >= 3
+    assert await test_refresh_token_repository.get_refresh_token(expired_tokens[0]) is None
@@ -4,6 +4,9 @@ from uuid import uuid4
 from backend.app.base.config import settings
 from backend.app.models.users import UpdateUser
 from backend.app.base.auth import create_token
+from backend.app.services.login_buffer import login_buffer
+from backend.app.services.hashing import password_hasher
+from backend.app.repositories.tokens import RefreshTokenRepository
 
 from .conftest import user_factory 
 
@@ -58,7 +61,7 @@ async def test_update_password(test_user_repository, test_viewer):
     new_password='New_password_123'
     user=await test_user_repository.update_user_password(test_viewer.user_id, new_password)
     
-    assert await test_user_repository.is_user_credentials_authentic(user.user_username, new_password)
+    assert await password_hasher.verify(new_password, user.user_hashed_password)
 
 @pytest.mark.asyncio
 async def test_update_user_with_none_user(test_user_repository, test_viewer):
@@ -195,24 +198,69 @@ async def test_is_user_active_by_username(test_user_repository, test_viewer):
     assert is_active
 
 @pytest.mark.asyncio
-async def test_is_user_credentials_authentic(test_user_repository):
-    is_authentic=await test_user_repository.is_user_credentials_authentic('unknown_user', 'password_shh123')
-    
-    assert not is_authentic
+async def test_record_user_login(test_user_repository, dummy_user):
+    access_token=create_token({"sub": dummy_user.user_username})
+    refresh_token=create_token({"sub": dummy_user.user_username})
+
+    last_login_at=await test_user_repository.record_user_login(
+        dummy_user.user_id, access_token, refresh_token
+    )
+
+    # The login bookkeeping is written behind
+    updated_count=await test_user_repository.update_user_logins(login_buffer.drain())
+    user=await test_user_repository.get_user_by_id(dummy_user.user_id)
+
+    assert updated_count == 1
+    assert user.user_last_login_at == last_login_at
+    assert user.user_access_token == access_token
+
+    stored_token=await RefreshTokenRepository(test_user_repository.session).get_refresh_token(refresh_token)
+    assert stored_token.reto_revoked_at is None
+    assert stored_token.reto_user_id == dummy_user.user_id
+
 
 @pytest.mark.asyncio
-async def test_user_access_token(test_user_repository, test_viewer):
-    new_access_token=create_token({})
-    updated_user=await test_user_repository.update_user_access_token(test_viewer.user_username, new_access_token)
-    
-    assert updated_user.user_access_token == new_access_token
+async def test_update_password_revokes_refresh_tokens(test_user_repository, dummy_user):
+    refresh_token=create_token({"sub": dummy_user.user_username})
+    await test_user_repository.record_user_login(dummy_user.user_id, create_token({}), refresh_token)
+
+    await test_user_repository.update_user_password(dummy_user.user_id, 'New_password_123')
+
+    stored_token=await RefreshTokenRepository(test_user_repository.session).get_refresh_token(refresh_token)
+    assert stored_token.reto_revoked_at is not None
+
 
 @pytest.mark.asyncio
-async def test_update_user_last_login(test_user_repository, dummy_user):
-    last_login_at=dummy_user.user_last_login_at
+async def test_deactivation_revokes_refresh_tokens(test_user_repository, dummy_user):
+    refresh_token=create_token({"sub": dummy_user.user_username})
+    await test_user_repository.record_user_login(dummy_user.user_id, create_token({}), refresh_token)
+
+    await test_user_repository.update_user_active_status(dummy_user.user_id, False)
 
-    updated_user=await test_user_repository.update_user_last_login(dummy_user.user_username)
+    stored_token=await RefreshTokenRepository(test_user_repository.session).get_refresh_token(refresh_token)
+    assert stored_token.reto_revoked_at is not None
 
-    assert last_login_at is not updated_user.user_last_login_at
 
+@pytest.mark.asyncio
+async def test_update_user_logins_with_access_tokens_only(test_user_repository, dummy_user):
+    access_token=create_token({"sub": dummy_user.user_username})
+
+    # Rows of refreshed tokens carry no login time
+    updated_count=await test_user_repository.update_user_logins(
+        [(dummy_user.user_id, None, access_token)]
+    )
+    user=await test_user_repository.get_user_by_id(dummy_user.user_id)
+
+    assert updated_count == 1
+    assert user.user_access_token == access_token
+    assert user.user_last_login_at is None
+
+
+@pytest.mark.asyncio
+async def test_get_principal(test_user_repository, dummy_user):
+    principal=await test_user_repository.get_principal(dummy_user.user_username)
 
+    assert principal.user_id == dummy_user.user_id
+    assert principal.role_names == ("Admin",)
+    assert len(principal.role_ids) == 1
+    assert await test_user_repository.get_principal("unknown_user") is None
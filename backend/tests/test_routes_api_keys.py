@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+from pydantic import ValidationError
+from starlette.requests import Request
+
+from backend.app.base.config import settings
+from backend.app.models.auth import APIKeyCreateRequest, Principal
+from backend.app.routes.api_keys import create_api_key
+
+
+def make_request(token: str) -> Request:
+    return Request({
+        "type": "http",
+        "path": "/api-keys/",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+def api_key_repository_factory():
+    def create(user_id, name, expires_at):
+        api_key = MagicMock(apke_name=name, apke_prefix="prefix", apke_expires_at=expires_at)
+        return api_key, "ak_prefix.secret"
+
+    api_key_repository = MagicMock()
+    api_key_repository.create_api_key = AsyncMock(side_effect=create)
+
+    return api_key_repository
+
+
+@pytest.mark.asyncio
+async def test_create_api_key_with_an_api_key_is_forbidden():
+    api_key_repository = api_key_repository_factory()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await create_api_key(
+            make_request("ak_prefix.secret"),
+            APIKeyCreateRequest(name="child"),
+            api_key_repository,
+            current_user=Principal("user_id", "user"),
+        )
+
+    assert exc_info.value.status_code == 403
+    api_key_repository.create_api_key.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_api_key_expires_by_default():
+    api_key_created = await create_api_key(
+        make_request("access_token"),
+        APIKeyCreateRequest(name="service"),
+        api_key_repository_factory(),
+        current_user=Principal("user_id", "user"),
+    )
+
+    max_expires_at = datetime.now(timezone.utc) + timedelta(days=settings.API_KEY_MAX_EXPIRES_IN_DAYS)
+    assert api_key_created.expires_at is not None
+    assert api_key_created.expires_at <= max_expires_at
+
+
+@pytest.mark.parametrize("expires_in_days", [None, 0, settings.API_KEY_MAX_EXPIRES_IN_DAYS + 1])
+def test_create_api_key_request_bounds_the_lifetime(expires_in_days):
+    with pytest.raises(ValidationError):
+        APIKeyCreateRequest(name="service", expires_in_days=expires_in_days)
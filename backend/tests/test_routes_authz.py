@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+
+from backend.app.models.auth import AuthorizationCheckRequest, Principal
+from backend.app.routes.authz import check_authorizations
+from backend.app.services.authorization import authorization_engine
+
+
+def principal_factory(username: str, role_names) -> Principal:
+    return authorization_engine.build_principal(
+        f"{username}_id", username, True, [], role_names
+    )
+
+
+def user_repository_factory(users):
+    user_repository = MagicMock()
+    user_repository.get_users_by_usernames = AsyncMock(return_value=users)
+
+    return user_repository
+
+
+@pytest.mark.asyncio
+async def test_check_authorizations_of_other_users_is_forbidden():
+    check_request = AuthorizationCheckRequest(subjects=["viewer", "admin"], permissions=["view_content"])
+    user_repository = user_repository_factory([])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await check_authorizations(
+            check_request, user_repository, current_user=principal_factory("viewer", ["Viewer"])
+        )
+
+    assert exc_info.value.status_code == 403
+    user_repository.get_users_by_usernames.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_check_authorizations_of_oneself():
+    viewer = principal_factory("viewer", ["Viewer"])
+    check_request = AuthorizationCheckRequest(subjects=["viewer"], permissions=["view_content"])
+    user_repository = user_repository_factory([viewer])
+
+    authorization_matrix = await check_authorizations(
+        check_request, user_repository, current_user=viewer
+    )
+
+    assert authorization_matrix.subjects == ["viewer"]
+
+
+@pytest.mark.asyncio
+async def test_check_authorizations_of_any_user_as_admin():
+    viewer = principal_factory("viewer", ["Viewer"])
+    check_request = AuthorizationCheckRequest(subjects=["viewer", "ghost"], permissions=["view_content"])
+    user_repository = user_repository_factory([viewer])
+
+    authorization_matrix = await check_authorizations(
+        check_request, user_repository, current_user=principal_factory("admin", ["Admin"])
+    )
+
+    assert authorization_matrix.subjects == ["viewer", "ghost"]
@@ -0,0 +1,115 @@
+import pytest
+
+from backend.app.models.auth import TokenClaims
+from backend.app.utils.permissions import PermissionRegistry
+from backend.app.services.authorization import AuthorizationEngine
+
+
+class MockPrincipal:
+    def __init__(self, role_names):
+        self.role_names = role_names
+
+
+def engine_factory(inheritance=None):
+    registry = PermissionRegistry(["view_content", "edit_content", "manage_users"])
+    engine = AuthorizationEngine(registry, inheritance)
+    engine.compile({
+        "Viewer": ["view_content"],
+        "Editor": ["edit_content"],
+        "Admin": ["manage_users"],
+    })
+
+    return engine
+
+
+def test_role_requirement_needs_any_role():
+    engine = engine_factory()
+    requirement = engine.requirement(role_names=("Admin", "Editor"))
+
+    assert engine.is_authorized(MockPrincipal(["Editor"]), requirement)
+    assert not engine.is_authorized(MockPrincipal(["Viewer"]), requirement)
+
+
+def test_permission_requirement_needs_all_permissions():
+    engine = engine_factory()
+    requirement = engine.requirement(permission_names=("view_content", "edit_content"))
+
+    assert engine.is_authorized(MockPrincipal(["Viewer", "Editor"]), requirement)
+    assert not engine.is_authorized(MockPrincipal(["Editor"]), requirement)
+
+
+def test_unknown_requirements_are_never_granted():
+    engine = engine_factory()
+
+    assert not engine.is_authorized(
+        MockPrincipal(["Admin"]), engine.requirement(role_names=("Unknown",))
+    )
+    assert not engine.is_authorized(
+        MockPrincipal(["Admin"]), engine.requirement(permission_names=("unknown",))
+    )
+
+
+def test_role_inheritance():
+    engine = engine_factory({"Editor": ["Viewer"], "Admin": ["Editor"]})
+    requirement = engine.requirement(permission_names=("view_content",))
+
+    assert engine.is_authorized(MockPrincipal(["Admin"]), requirement)
+
+
+def test_cyclic_role_inheritance():
+    with pytest.raises(ValueError):
+        engine_factory({"Editor": ["Admin"], "Admin": ["Editor"]})
+
+
+def test_recompile_refreshes_cached_masks():
+    engine = engine_factory()
+    principal = MockPrincipal(["Viewer"])
+    requirement = engine.requirement(permission_names=("edit_content",))
+
+    assert not engine.is_authorized(principal, requirement)
+
+    engine.compile({"Viewer": ["view_content", "edit_content"]})
+
+    assert engine.is_authorized(principal, requirement)
+
+
+def test_claims_principals_use_token_bitmap():
+    engine = engine_factory()
+    claims = TokenClaims("user_id", "user", ["Viewer"], permission_bitmap=0b110)
+
+    assert engine.is_authorized(claims, engine.requirement(permission_names=("manage_users",)))
+    assert not engine.is_authorized(claims, engine.requirement(permission_names=("view_content",)))
+
+
+def test_permission_matrix():
+    engine = engine_factory({"Admin": ["Editor"]})
+    principals = [MockPrincipal(["Viewer"]), MockPrincipal(["Admin"]), None]
+
+    matrix = engine.permission_matrix(
+        principals, ["view_content", "edit_content", "manage_users", "unknown"]
+    )
+
+    assert matrix == ["1000", "0110", "0000"]
+
+
+def test_built_principals_are_immutable():
+    engine = engine_factory({"Admin": ["Editor"]})
+    principal = engine.build_principal("user_id", "user", True, ["admin_role_id"], ["Admin"])
+
+    with pytest.raises(AttributeError):
+        principal.user_is_active = False
+
+    assert engine.is_authorized(principal, engine.requirement(permission_names=("edit_content",)))
+    assert principal.has_roles(["Admin"])
+
+
+def test_built_principals_follow_recompiled_graphs():
+    engine = engine_factory()
+    principal = engine.build_principal("user_id", "user", True, ["viewer_role_id"], ["Viewer"])
+    requirement = engine.requirement(permission_names=("edit_content",))
+
+    assert not engine.is_authorized(principal, requirement)
+
+    engine.compile({"Viewer": ["view_content", "edit_content"]})
+
+    assert engine.is_authorized(principal, requirement)
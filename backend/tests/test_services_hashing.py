@@ -0,0 +1,69 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.app.services.hashing import PasswordHashingService
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify():
+    hasher = PasswordHashingService(max_workers=1, max_queue_size=2)
+
+    try:
+        hashed_password = await hasher.hash("Secret_password_123")
+
+        assert await hasher.verify("Secret_password_123", hashed_password)
+        assert not await hasher.verify("Wrong_password_123", hashed_password)
+    finally:
+        hasher.shutdown()
+
+    metrics = hasher.metrics()
+    assert metrics["completed"] == 3
+    assert metrics["queue_depth"] == 0
+    assert metrics["average_latency_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_keeps_current_hashes():
+    hasher = PasswordHashingService(max_workers=1, max_queue_size=2)
+
+    try:
+        hashed_password = await hasher.hash("Secret_password_123")
+
+        assert await hasher.verify_and_update("Secret_password_123", hashed_password) \
+            == (True, None)
+        assert await hasher.verify_and_update("Wrong_password_123", hashed_password) \
+            == (False, None)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_operations_are_not_completed():
+    hasher = PasswordHashingService(max_workers=1, max_queue_size=2)
+
+    try:
+        with pytest.raises(ValueError):
+            await hasher.verify("Secret_password_123", "not_a_hash")
+    finally:
+        hasher.shutdown()
+
+    metrics = hasher.metrics()
+    assert metrics["failed"] == 1
+    assert metrics["completed"] == 0
+    assert metrics["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hash_rejects_when_queue_is_full():
+    hasher = PasswordHashingService(max_workers=1, max_queue_size=0)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await hasher.hash("Secret_password_123")
+
+    assert excinfo.value.status_code == 503
+    assert hasher.metrics()["rejected"] == 1
+
+
+def test_invalid_executor_type():
+    with pytest.raises(ValueError):
+        PasswordHashingService(executor_type="fiber")
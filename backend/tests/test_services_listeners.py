@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+
+from backend.app.services import listeners
+from backend.app.services.listeners import NotificationListener
+from backend.app.services.rate_policies import RATE_POLICIES_CHANNEL
+
+
+class FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    def notify(self, payload):
+        for channel, callback in self.listeners.items():
+            callback(self, 1, channel, payload)
+
+
+@pytest.mark.asyncio
+async def test_listener_reloads_on_connection_and_notifications(monkeypatch):
+    connection = FakeConnection()
+    reloaded = asyncio.Event()
+
+    async def connect(dsn):
+        return connection
+
+    async def reload():
+        reloaded.set()
+
+    monkeypatch.setattr(listeners.asyncpg, "connect", connect)
+    listener = NotificationListener(
+        "postgresql://", reload, channel=RATE_POLICIES_CHANNEL, reconnect_interval=1.0
+    )
+    listener.start()
+
+    await asyncio.wait_for(reloaded.wait(), 1)
+    reloaded.clear()
+
+    # Bursts of notifications are coalesced
+    connection.notify("Viewer")
+    connection.notify("Admin")
+    await asyncio.wait_for(reloaded.wait(), 1)
+    await asyncio.sleep(0)
+
+    assert listener.reloads == 2
+    assert connection.listeners.keys() == {RATE_POLICIES_CHANNEL}
+
+    await listener.stop()
+    assert connection.closed
@@ -0,0 +1,60 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from backend.app.services.login_buffer import LoginWriteBehindBuffer
+from backend.app.scheduler.user_logins import flush_user_logins
+
+
+def test_entries_are_merged_per_user():
+    buffer = LoginWriteBehindBuffer()
+    user_id, other_user_id = uuid4(), uuid4()
+
+    logged_in_at = buffer.record_login(user_id, "access_token_1")
+    buffer.record_access_token(user_id, "access_token_2")
+    buffer.record_access_token(other_user_id, "access_token_3")
+
+    assert len(buffer) == 2
+    assert sorted(buffer.drain(), key=lambda row: row[2]) == [
+        (user_id, logged_in_at, "access_token_2"),
+        (other_user_id, None, "access_token_3"),
+    ]
+    assert len(buffer) == 0
+
+
+def test_restore_keeps_newer_entries():
+    buffer = LoginWriteBehindBuffer()
+    user_id = uuid4()
+    logged_in_at = datetime.now() - timedelta(seconds=5)
+
+    buffer.record_login(user_id, "old_access_token", logged_in_at)
+    rows = buffer.drain()
+
+    buffer.record_access_token(user_id, "new_access_token")
+    buffer.restore(rows)
+
+    assert buffer.drain() == [(user_id, logged_in_at, "new_access_token")]
+
+
+@pytest.mark.asyncio
+async def test_flush_user_logins_restores_failed_batches():
+    buffer = LoginWriteBehindBuffer()
+    for _ in range(3):
+        buffer.record_login(uuid4(), "access_token")
+
+    user_repository = AsyncMock()
+    user_repository.update_user_logins.side_effect = [2, Exception("Database is down")]
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__.return_value = user_repository
+
+    with patch(
+        "backend.app.scheduler.user_logins.user_repository_async_context_manager",
+        return_value=context_manager,
+    ), patch("backend.app.scheduler.user_logins.login_buffer", buffer):
+        assert await flush_user_logins(batch_size=2) == 2
+
+    assert user_repository.update_user_logins.await_count == 2
+    assert buffer.flushed == 2
+    assert len(buffer) == 1
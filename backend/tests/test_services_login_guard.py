@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError
+
+from backend.app.services.login_guard import LoginGuard
+
+
+def pipeline_factory(results):
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=results)
+    pipeline.__aenter__ = AsyncMock(return_value=pipeline)
+    pipeline.__aexit__ = AsyncMock(return_value=False)
+
+    return pipeline
+
+
+def login_guard_factory(*pipeline_results):
+    guard = LoginGuard(max_username_failures=3, max_ip_failures=10, max_lockout=60)
+    guard._redis = MagicMock()
+    guard._redis.pipeline = MagicMock(
+        side_effect=[pipeline_factory(results) for results in pipeline_results]
+    )
+
+    return guard
+
+
+def test_lockout_duration_doubles_up_to_the_maximum():
+    guard = LoginGuard(max_username_failures=3, base_lockout=1, max_lockout=60)
+
+    assert guard.get_lockout_duration("username", 2) == 0
+    assert guard.get_lockout_duration("username", 3) == 1
+    assert guard.get_lockout_duration("username", 5) == 4
+    assert guard.get_lockout_duration("username", 20) == 60
+
+
+@pytest.mark.asyncio
+async def test_check_rejects_locked_out_subjects():
+    guard = login_guard_factory([-2, 5000, 0])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await guard.check("user", "10.0.0.1")
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 5
+
+    # The lockout is mirrored locally: no further round trip
+    with pytest.raises(HTTPException):
+        await guard.check("other_user", "10.0.0.1")
+
+    assert guard._redis.pipeline.call_count == 1
+    assert guard.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_record_failure_locks_out_past_the_maximum():
+    guard = login_guard_factory([3, True, 1, True], [True])
+
+    await guard.record_failure("user", "10.0.0.1")
+
+    with pytest.raises(HTTPException):
+        await guard.check("user", None)
+
+    # Only the username went past its maximum
+    assert "login_lockout:username:user" in guard.lockouts
+    assert "login_lockout:ip:10.0.0.1" not in guard.lockouts
+
+
+@pytest.mark.asyncio
+async def test_check_fails_open_on_redis_errors():
+    guard = LoginGuard()
+    guard._redis = MagicMock()
+    guard._redis.pipeline = MagicMock(side_effect=ConnectionError())
+
+    await guard.check("user", "10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_check_reads_unknown_usernames_in_the_same_round_trip():
+    guard = login_guard_factory([-2, -2, 1], [-2, -2, 0])
+
+    assert await guard.check("ghost", "10.0.0.1")
+    assert not await guard.check("user", "10.0.0.1")
+    assert guard._redis.pipeline.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_usernames_negative_cache_is_kept_on_redis():
+    guard = LoginGuard(unknown_username_ttl=30)
+    guard._redis = MagicMock()
+    guard._redis.set = AsyncMock()
+    guard._redis.delete = AsyncMock()
+
+    await guard.remember_unknown_username("ghost")
+    guard._redis.set.assert_awaited_once_with("login_unknown:ghost", 1, ex=30)
+
+    await guard.forget_unknown_username("ghost")
+    guard._redis.delete.assert_awaited_once_with("login_unknown:ghost")
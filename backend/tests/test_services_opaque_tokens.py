@@ -0,0 +1,130 @@
+import pytest
+from datetime import timedelta
+from uuid import uuid4
+
+from backend.app.services.opaque_tokens import (
+    OpaqueTokenStore, OPAQUE_TOKEN_PREFIX, is_opaque_token,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        results = []
+        for name, args, kwargs in self.commands:
+            results.append(await getattr(self.redis, name)(*args, **kwargs))
+
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.round_trips = 0
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def expire(self, key, seconds):
+        return key in self.sets
+
+    async def delete(self, *keys):
+        return sum(
+            int(self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None)
+            for key in keys
+        )
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+async def issue_token(store: OpaqueTokenStore, username: str = "user") -> str:
+    return await store.issue(
+        uuid4(), username, ["Viewer"], 0b101, 2, timedelta(minutes=5)
+    )
+
+
+@pytest.mark.asyncio
+async def test_issue_and_get_claims():
+    store = OpaqueTokenStore(FakeRedis())
+    token = await issue_token(store)
+
+    assert is_opaque_token(token)
+    assert token.startswith(OPAQUE_TOKEN_PREFIX)
+    # Only the token hash is stored
+    assert token not in "".join(store.redis.values)
+
+    claims = await store.get_claims(token)
+
+    assert claims.user_username == "user"
+    assert claims.role_names == ("Viewer",)
+    assert claims.permission_bitmap == 0b101
+    assert claims.epoch == 2
+
+
+@pytest.mark.asyncio
+async def test_get_many_claims_uses_a_single_round_trip():
+    store = OpaqueTokenStore(FakeRedis())
+    tokens = [await issue_token(store, f"user_{index}") for index in range(3)]
+    store.redis.round_trips = 0
+
+    claims = await store.get_many_claims(tokens + ["ot_unknown"])
+
+    assert [claim.user_username for claim in claims[:3]] == ["user_0", "user_1", "user_2"]
+    assert claims[3] is None
+    assert store.redis.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_revoke_deletes_the_session_record():
+    store = OpaqueTokenStore(FakeRedis())
+    token = await issue_token(store)
+
+    assert await store.revoke(token)
+    assert await store.get_claims(token) is None
+    assert not await store.revoke(token)
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_deletes_every_token_of_the_user():
+    store = OpaqueTokenStore(FakeRedis())
+    user_id, other_user_id = uuid4(), uuid4()
+    expires_delta = timedelta(minutes=5)
+
+    tokens = [
+        await store.issue(user_id, "user", ["Viewer"], 0b1, 0, expires_delta)
+        for _ in range(2)
+    ]
+    other_token = await store.issue(other_user_id, "other", ["Viewer"], 0b1, 0, expires_delta)
+
+    assert await store.revoke_user(user_id) == 2
+    assert await store.get_many_claims(tokens) == [None, None]
+    assert (await store.get_claims(other_token)).user_username == "other"
+
+    assert await store.revoke_user(user_id) == 0
@@ -0,0 +1,198 @@
+import pytest
+from redis.exceptions import ConnectionError
+
+from backend.app.services.rate_limiter import (
+    RATE_LIMIT_SCRIPTS, SYNC_SCRIPT,
+    LocalRateLimiter, RateLimitDecision, RateLimiter, SharedMemoryRateLimiter,
+    TwoTierRateLimiter,
+)
+from backend.app.models.throttling import RateLimiterPolicy
+
+
+class FakeScript:
+    def __init__(self, redis, script):
+        self.redis = redis
+        self.script = script
+
+    async def __call__(self, keys, args):
+        self.redis.calls.append((self.script, keys, args))
+
+        if self.redis.error:
+            raise ConnectionError("Redis is down")
+
+        return self.redis.results.pop(0)
+
+
+class FakeRedis:
+    def __init__(self, results=(), error: bool = False):
+        self.results = list(results)
+        self.error = error
+        self.calls = []
+        self.registered = 0
+
+    def register_script(self, script):
+        self.registered += 1
+        return FakeScript(self, script)
+
+
+def get_rate_limiter(redis: FakeRedis, algorithm: str = "gcra") -> RateLimiter:
+    rate_limiter = RateLimiter(algorithm)
+    rate_limiter._redis = redis
+
+    return rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_hit_runs_a_single_script_call_per_decision():
+    redis = FakeRedis([[1, 2, 20000, 0], [1, 1, 40000, 0]])
+    rate_limiter = get_rate_limiter(redis)
+    policy = RateLimiterPolicy(times=3, minutes=1)
+
+    first_decision = await rate_limiter.hit("user:1", policy)
+    await rate_limiter.hit("user:1", policy)
+
+    assert first_decision == RateLimitDecision(True, 3, 2, 20000, 0)
+    assert redis.registered == len(RATE_LIMIT_SCRIPTS)
+    assert len(redis.calls) == 2
+
+    script, keys, args = redis.calls[0]
+    assert script == RATE_LIMIT_SCRIPTS["gcra"]
+    assert keys == ["rate_limit:gcra:user:1"]
+    assert args == [3, 60000]
+
+
+@pytest.mark.asyncio
+async def test_policy_algorithm_overrides_the_default():
+    redis = FakeRedis([[1, 0, 1000, 0]])
+    rate_limiter = get_rate_limiter(redis)
+
+    await rate_limiter.hit("ip:1", RateLimiterPolicy(times=1, algorithm="sliding_log"))
+
+    assert redis.calls[0][0] == RATE_LIMIT_SCRIPTS["sliding_log"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_decision_headers():
+    redis = FakeRedis([[0, 0, 59500, 19500]])
+    rate_limiter = get_rate_limiter(redis)
+
+    decision = await rate_limiter.hit("user:1", RateLimiterPolicy(times=3, minutes=1))
+
+    assert not decision.allowed
+    assert decision.headers(60) == {
+        "RateLimit-Limit": "3",
+        "RateLimit-Remaining": "0",
+        "RateLimit-Reset": "60",
+        "RateLimit-Policy": "3;w=60",
+        "Retry-After": "20",
+    }
+    assert rate_limiter.metrics()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fail_open():
+    rate_limiter = get_rate_limiter(FakeRedis(error=True))
+
+    assert await rate_limiter.hit("user:1", RateLimiterPolicy()) is None
+    assert rate_limiter.metrics()["errors"] == 1
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter("leaky_bucket")
+
+
+def test_local_buckets_hold_a_share_of_the_budget():
+    local_rate_limiter = LocalRateLimiter(share=0.5)
+    policy = RateLimiterPolicy(times=10, minutes=1)
+
+    decisions = [local_rate_limiter.hit("user:1", policy) for _ in range(6)]
+
+    assert [decision.allowed for decision in decisions] == [True] * 5 + [False]
+    assert decisions[-1].retry_after > 0
+    # Other keys have their own bucket
+    assert local_rate_limiter.hit("user:2", policy).allowed
+
+
+def test_local_buckets_follow_policy_changes():
+    local_rate_limiter = LocalRateLimiter()
+
+    local_rate_limiter.hit("user:1", RateLimiterPolicy(times=2, minutes=1))
+    local_rate_limiter.hit("user:1", RateLimiterPolicy(times=100, minutes=0, seconds=10))
+
+    # The next sync reports the hits against the current policy
+    [(_, bucket)] = local_rate_limiter.drain()
+    assert bucket[3:] == [2, 100, 10000]
+
+
+@pytest.mark.asyncio
+async def test_sync_reports_hits_in_one_call_and_blocks_exhausted_keys():
+    redis = FakeRedis([[0, 30000]])
+    two_tier_rate_limiter = TwoTierRateLimiter(get_rate_limiter(redis), LocalRateLimiter())
+    policy = RateLimiterPolicy(times=10, minutes=1)
+
+    for key in ("user:1", "user:2"):
+        await two_tier_rate_limiter.hit(key, policy)
+    await two_tier_rate_limiter.hit("user:2", policy)
+
+    assert await two_tier_rate_limiter.sync() == 1
+
+    script, keys, args = redis.calls[0]
+    assert script == SYNC_SCRIPT
+    assert keys == ["rate_limit:gcra:user:1", "rate_limit:gcra:user:2"]
+    assert args == [10, 60000, 1, 10, 60000, 2]
+
+    assert (await two_tier_rate_limiter.hit("user:1", policy)).allowed
+    decision = await two_tier_rate_limiter.hit("user:2", policy)
+    assert not decision.allowed
+    assert decision.retry_after > 29000
+
+
+@pytest.mark.asyncio
+async def test_failed_sync_degrades_to_local_limits():
+    redis = FakeRedis(error=True)
+    two_tier_rate_limiter = TwoTierRateLimiter(get_rate_limiter(redis), LocalRateLimiter())
+    policy = RateLimiterPolicy(times=2, minutes=1)
+
+    await two_tier_rate_limiter.hit("user:1", policy)
+    await two_tier_rate_limiter.sync()
+
+    assert two_tier_rate_limiter.degraded
+    assert (await two_tier_rate_limiter.hit("user:1", policy)).allowed
+    assert not (await two_tier_rate_limiter.hit("user:1", policy)).allowed
+
+    redis.error = False
+    redis.results = [[0]]
+    await two_tier_rate_limiter.sync()
+
+    assert not two_tier_rate_limiter.degraded
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_budget_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "rate_limits")
+    workers = [SharedMemoryRateLimiter(path, slots=64, stripes=4) for _ in range(2)]
+    policy = RateLimiterPolicy(times=4, minutes=1)
+
+    decisions = [await workers[index % 2].hit("user:1", policy) for index in range(5)]
+
+    assert [decision.allowed for decision in decisions] == [True] * 4 + [False]
+    assert [decision.remaining for decision in decisions[:4]] == [3, 2, 1, 0]
+    assert decisions[-1].retry_after > 0
+    assert (await workers[1].hit("user:2", policy)).allowed
+
+    for worker in workers:
+        worker.close()
+
+
+def test_shared_memory_full_stripe_evicts_a_slot(tmp_path):
+    shared_rate_limiter = SharedMemoryRateLimiter(
+        str(tmp_path / "rate_limits"), slots=2, stripes=1,
+    )
+    policy = RateLimiterPolicy(times=1, minutes=1)
+
+    for index in range(3):
+        assert shared_rate_limiter.acquire(f"user:{index}", policy).allowed
+
+    assert shared_rate_limiter.metrics()["evictions"] == 1
+    shared_rate_limiter.close()
@@ -0,0 +1,64 @@
+
+import pytest
+
+from backend.app.models.auth import Principal
+from backend.app.models.throttling import RateLimiterPolicy
+from backend.app.services.rate_policies import RatePolicyRegistry
+
+strict_rate = RateLimiterPolicy(times=10, minutes=1)
+loose_rate = RateLimiterPolicy(times=40, minutes=1)
+
+
+def get_registry() -> RatePolicyRegistry:
+    return RatePolicyRegistry({"Viewer": strict_rate, "Admin": loose_rate})
+
+
+def test_resolve_picks_the_most_permissive_policy():
+    registry = get_registry()
+
+    assert registry.resolve(frozenset(["Viewer"])) is strict_rate
+    assert registry.resolve(frozenset(["Viewer", "Admin"])) is loose_rate
+    assert registry.resolve(frozenset(["Unknown"])) is registry.default_policy
+    assert registry.resolve(frozenset()) is registry.default_policy
+
+
+def test_role_sets_are_compiled_ahead_of_time():
+    registry = get_registry()
+    registry.load(registry.role_policies, [["Viewer", "Admin"]])
+
+    # Single roles, the empty role set and the given role sets
+    assert len(registry) == 4
+
+    principal = Principal("user_id", "user", role_names=["Admin", "Viewer"])
+    assert registry.resolve(principal.role_set) is loose_rate
+
+
+def test_load_recompiles_known_role_sets():
+    registry = get_registry()
+    registry.resolve(frozenset(["Viewer", "Admin"]))
+
+    sloppy_rate = RateLimiterPolicy(times=50, minutes=1)
+    registry.load({"Viewer": sloppy_rate, "Admin": loose_rate})
+
+    assert registry.resolve(frozenset(["Viewer", "Admin"])) is sloppy_rate
+
+
+def test_policy_from_stored_rate_limit():
+    rate_policy = RateLimiterPolicy.from_dict(
+        {"times": 20, "hours": 0, "minutes": 1, "seconds": 0, "milliseconds": 0}
+    )
+
+    assert rate_policy.times == 20
+    assert rate_policy.interval_seconds == 60
+    assert rate_policy.algorithm is None
+    assert RateLimiterPolicy.from_dict(rate_policy.to_dict()).to_dict() == rate_policy.to_dict()
+
+
+@pytest.mark.parametrize("rate_limit", [
+    {"times": 0, "minutes": 1},
+    {"times": -1, "minutes": 1},
+    {"times": 10, "minutes": 0},
+])
+def test_policy_rejects_non_positive_limits(rate_limit):
+    with pytest.raises(ValueError):
+        RateLimiterPolicy.from_dict(rate_limit)
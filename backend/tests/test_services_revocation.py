@@ -0,0 +1,177 @@
+import asyncio
+import pytest
+from time import time
+from unittest.mock import AsyncMock, MagicMock
+from redis.exceptions import ConnectionError
+
+from backend.app.services.revocation import TokenRevocationService
+
+
+def log_entries(*entries):
+    # XREAD response of the revocation log, from (entry id, token id) pairs
+    return [[b"revoked_token_log", [
+        (entry_id.encode(), {b"token_id": token_id.encode()})
+        for entry_id, token_id in entries
+    ]]]
+
+
+def revocation_service_factory(revoked_tokens=None, exists=1, **kwargs):
+    service = TokenRevocationService(capacity=100, sync_interval=60, **kwargs)
+    service._redis = MagicMock()
+    service._redis.xread = AsyncMock(return_value=revoked_tokens or [])
+    service._redis.exists = AsyncMock(return_value=exists)
+
+    return service
+
+
+async def rebuild(service):
+    await service.sync()
+    await service._rebuild_task
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_skips_redis_for_unknown_tokens():
+    service = revocation_service_factory()
+    await rebuild(service)
+
+    assert not await service.is_revoked("token_id")
+    service._redis.exists.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_confirms_filter_hits_on_redis():
+    service = revocation_service_factory(log_entries(("1-0", "token_id")))
+    await rebuild(service)
+
+    assert await service.is_revoked("token_id")
+    service._redis.exists.assert_awaited_once_with("revoked_token:token_id")
+
+
+@pytest.mark.asyncio
+async def test_sync_is_incremental_and_throttled():
+    service = revocation_service_factory(log_entries(("1-0", "token_id")))
+    await rebuild(service)
+
+    assert service.cursor == "1-0"
+
+    service._redis.xread.return_value = log_entries(("2-0", "other_token_id"))
+    service.synced_at = 0
+    await service.is_revoked("token_id")
+    await service.is_revoked("other_token_id")
+
+    # The second check happens within the sync interval
+    assert service._redis.xread.await_count == 2
+    service._redis.xread.assert_awaited_with({"revoked_token_log": "1-0"})
+    assert "other_token_id" in service.bloom_filter
+    assert service.cursor == "2-0"
+
+
+@pytest.mark.asyncio
+async def test_sync_rereads_entries_loaded_during_a_rebuild():
+    service = revocation_service_factory(log_entries(("1-0", "token_id")))
+    await rebuild(service)
+
+    service.rebuilt_at = 0
+    service.synced_at = 0
+    service._redis.xread.return_value = log_entries(("2-0", "other_token_id"))
+    await service.sync()
+
+    # The incremental sync ran on the replaced filter, the rebuild has not
+    # read the entry yet
+    service._redis.xread.return_value = log_entries(("1-0", "token_id"))
+    await service._rebuild_task
+
+    assert service.cursor == "1-0"
+    assert service.rebuilt_at > 0
+
+
+@pytest.mark.asyncio
+async def test_sync_goes_on_while_a_rebuild_fails():
+    service = revocation_service_factory(log_entries(("1-0", "token_id")))
+    await rebuild(service)
+
+    service.rebuilt_at = 1
+    service.synced_at = 0
+    service._redis.xread.side_effect = [
+        ConnectionError(), log_entries(("2-0", "other_token_id"))
+    ]
+    await service.sync()
+    await service._rebuild_task
+
+    assert "other_token_id" in service.bloom_filter
+    assert service.cursor == "2-0"
+    assert service.is_synced
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_filter_when_redis_is_unavailable():
+    service = revocation_service_factory()
+    service.bloom_filter.add("token_id")
+    service.rebuilt_at = time()
+    service._redis.xread.side_effect = ConnectionError()
+
+    await service.sync()
+
+    assert "token_id" in service.bloom_filter
+
+
+@pytest.mark.asyncio
+async def test_revoke_adds_token_to_filter():
+    service = revocation_service_factory()
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[True, b"1700000000000-0"])
+    service._redis.xtrim = AsyncMock()
+    service._redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipeline)
+    service._redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    assert await service.revoke("token_id", time() + 60)
+    assert "token_id" in service.bloom_filter
+    assert pipeline.set.call_args.kwargs["ex"] > 0
+    # The log is trimmed on the clock of Redis
+    assert service._redis.xtrim.await_args.kwargs["minid"] == 1700000000000 - 3600_000
+
+    assert not await service.revoke("expired_token_id", time() - 60)
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_checks_redis_until_a_first_sync():
+    service = revocation_service_factory(exists=0)
+    service._redis.xread.side_effect = ConnectionError()
+
+    # The empty filter proves nothing, the token is checked on Redis
+    assert not await service.is_revoked("token_id")
+    service._redis.exists.assert_awaited_once_with("revoked_token:token_id")
+    assert not service.is_synced
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_fails_closed_until_a_first_sync():
+    service = revocation_service_factory()
+    service._redis.xread.side_effect = ConnectionError()
+    service._redis.exists.side_effect = ConnectionError()
+
+    assert await service.is_revoked("token_id")
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_fails_open_until_a_first_sync_without_redis():
+    service = revocation_service_factory(fail_closed=False)
+    service._redis.xread.side_effect = ConnectionError()
+
+    assert not await service.is_revoked("token_id")
+    service._redis.exists.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_start_retries_the_first_sync():
+    service = revocation_service_factory()
+    service.sync_interval = 0.01
+    service._redis.xread.side_effect = [ConnectionError(), log_entries(("1-0", "token_id"))]
+
+    service.start()
+    await asyncio.wait_for(service._task, 1)
+
+    assert service.is_synced
+    assert "token_id" in service.bloom_filter
+
+    await service.stop()
@@ -0,0 +1,93 @@
+import pytest
+from datetime import timedelta
+from jose import JWTError, jwt
+
+from backend.app.services.signing import (
+    KeyRing, SigningKey, generate_private_key, load_key_ring,
+)
+
+
+def es256_key(kid: str) -> SigningKey:
+    return SigningKey(kid, "ES256", generate_private_key("ES256"))
+
+
+def test_key_ring_signs_with_active_kid():
+    key_ring = KeyRing("ES256")
+    key_ring.add_key(es256_key("key_1"))
+
+    token = key_ring.encode({"sub": "user"})
+
+    assert jwt.get_unverified_header(token)["kid"] == "key_1"
+    assert key_ring.decode(token)["sub"] == "user"
+
+
+def test_key_ring_rotation_keeps_previous_key_during_overlap():
+    key_ring = KeyRing("ES256")
+    key_ring.add_key(es256_key("key_1"))
+    old_token = key_ring.encode({"sub": "user"})
+
+    key_ring.rotate(es256_key("key_2"), overlap=timedelta(minutes=30))
+    new_token = key_ring.encode({"sub": "user"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "key_2"
+    assert key_ring.decode(old_token)["sub"] == "user"
+    assert {key["kid"] for key in key_ring.jwks()["keys"]} == {"key_1", "key_2"}
+
+    # Without overlap, the previous key is dropped at once
+    key_ring.rotate(es256_key("key_3"), overlap=timedelta(0))
+
+    assert "key_2" not in key_ring.keys
+    with pytest.raises(JWTError):
+        key_ring.decode(new_token)
+
+
+def test_key_ring_rejects_unknown_kid():
+    key_ring = KeyRing("ES256")
+    key_ring.add_key(es256_key("key_1"))
+
+    other_key_ring = KeyRing("ES256")
+    other_key_ring.add_key(es256_key("key_2"))
+
+    with pytest.raises(JWTError):
+        key_ring.decode(other_key_ring.encode({"sub": "user"}))
+
+
+def test_jwks_verifies_tokens_without_private_keys():
+    key_ring = KeyRing("ES256")
+    key_ring.add_key(es256_key("key_1"))
+    token = key_ring.encode({"sub": "user"})
+
+    public_jwk = key_ring.jwks()["keys"][0]
+
+    assert "d" not in public_jwk
+    assert jwt.decode(token, public_jwk, algorithms=["ES256"])["sub"] == "user"
+
+
+def test_load_key_ring_symmetric_keys_are_not_published():
+    key_ring = load_key_ring("HS256", "secret_key")
+    token = key_ring.encode({"sub": "user"})
+
+    assert jwt.decode(token, "secret_key", algorithms=["HS256"])["sub"] == "user"
+    assert key_ring.jwks() == {"keys": []}
+
+
+def test_load_key_ring_from_directory(tmp_path):
+    for kid in ("2024_01", "2024_02", "2024_03"):
+        (tmp_path / f"{kid}.pem").write_text(generate_private_key("ES256"))
+
+    key_ring = load_key_ring("ES256", "secret_key", str(tmp_path))
+    assert key_ring.active_key.kid == "2024_03"
+
+    # The next key is published ahead of its activation
+    key_ring = load_key_ring("ES256", "secret_key", str(tmp_path), "2024_02")
+    assert key_ring.active_key.kid == "2024_02"
+    assert len(key_ring.jwks()["keys"]) == 3
+
+
+def test_load_key_ring_without_keys(tmp_path):
+    with pytest.raises(ValueError):
+        load_key_ring("ES256", "secret_key", str(tmp_path))
+
+    # Sandbox environments sign with an ephemeral key
+    key_ring = load_key_ring("ES256", "secret_key", str(tmp_path), allow_ephemeral_key=True)
+    assert len(key_ring.jwks()["keys"]) == 1
@@ -0,0 +1,44 @@
+import pytest
+
+from backend.app.utils.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"token_{index}" for index in range(1000)]
+
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+    assert len(bloom_filter) == 1000
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+
+    for index in range(1000):
+        bloom_filter.add(f"token_{index}")
+
+    false_positives = sum(
+        f"other_token_{index}" in bloom_filter for index in range(10000)
+    )
+
+    assert false_positives < 300
+
+
+def test_bloom_filter_clear():
+    bloom_filter = BloomFilter(capacity=10)
+    bloom_filter.add("token")
+    bloom_filter.clear()
+
+    assert "token" not in bloom_filter
+    assert len(bloom_filter) == 0
+
+
+def test_bloom_filter_invalid_parameters():
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
+
+    with pytest.raises(ValueError):
+        BloomFilter(error_rate=1)
@@ -0,0 +1,102 @@
+from time import time
+from uuid import uuid4
+
+from backend.app.utils.cache import LRUCache, TokenCache, EpochRegistry, token_digest
+
+
+def test_lru_cache_hit_and_miss():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1, time() + 60)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    expires_at = time() + 60
+
+    cache.set("a", 1, expires_at)
+    cache.set("b", 2, expires_at)
+
+    # Touch 'a' so that 'b' becomes the least recently used entry
+    cache.get("a")
+    cache.set("c", 3, expires_at)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expired_entry_is_a_miss():
+    cache = LRUCache(max_size=2)
+    cache._entries["a"] = (1, time() - 1)
+
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_lru_cache_ignores_already_expired_entries():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1, time() - 1)
+
+    assert len(cache) == 0
+
+
+def test_token_cache_invalidate_user():
+    cache = TokenCache(max_size=4)
+    user_id, other_user_id = uuid4(), uuid4()
+    expires_at = time() + 60
+
+    cache.set_token("token_1", user_id, "user", expires_at)
+    cache.set_token("token_2", user_id, "user", expires_at)
+    cache.set_token("token_3", other_user_id, "other_user", expires_at)
+
+    assert cache.invalidate_user(str(user_id)) == 2
+    assert cache.get_token("token_1") is None
+    assert cache.get_token("token_2") is None
+    assert cache.get_token("token_3") == "other_user"
+
+
+def test_token_cache_eviction_updates_user_index():
+    cache = TokenCache(max_size=1)
+    user_id = uuid4()
+    expires_at = time() + 60
+
+    cache.set_token("token_1", user_id, "user", expires_at)
+    cache.set_token("token_2", user_id, "user", expires_at)
+
+    assert cache.get_token("token_1") is None
+    assert cache.invalidate_user(user_id) == 1
+    assert len(cache) == 0
+
+
+def test_token_cache_caps_entry_lifetime():
+    cache = TokenCache(max_size=4, max_ttl=5)
+    user_id = uuid4()
+
+    cache.set_token("token_1", user_id, "user", time() + 3600)
+    cache.set_token("token_2", user_id, "user", time() + 2)
+
+    _, expires_at = cache._entries[token_digest("token_1")]
+    assert expires_at <= time() + 5
+
+    # Tokens expiring sooner keep their own expiration
+    _, expires_at = cache._entries[token_digest("token_2")]
+    assert expires_at <= time() + 2
+
+
+def test_epoch_registry_keeps_latest_epoch():
+    registry = EpochRegistry()
+    user_id = uuid4()
+
+    registry.set(user_id, 2)
+    registry.update([(str(user_id), 1)])
+
+    assert registry.get(user_id) == 2
+    assert registry.is_stale(user_id, 1)
+    assert not registry.is_stale(user_id, 2)
+    assert not registry.is_stale(uuid4(), 0)
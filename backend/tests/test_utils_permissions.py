@@ -0,0 +1,46 @@
+import pytest
+
+from backend.app.data.auth import ROLES_METADATA
+from backend.app.utils.permissions import (
+    PermissionRegistry, encode_bitmap, decode_bitmap,
+)
+
+
+def test_registry_positions_follow_first_appearance():
+    registry = PermissionRegistry.from_roles_metadata(ROLES_METADATA)
+    super_admin_permissions = ROLES_METADATA["SuperAdmin"]["permissions"]
+
+    assert [registry.bit(name) for name in super_admin_permissions] == \
+        list(range(len(super_admin_permissions)))
+    assert registry.version == len(registry)
+
+
+def test_registry_keeps_stored_positions():
+    registry = PermissionRegistry()
+
+    assert registry.register("view_content", 5) == 5
+    assert registry.register("edit_content") == 6
+    assert registry.register("view_content") == 5
+
+    with pytest.raises(ValueError):
+        registry.register("delete_content", 5)
+
+
+def test_registry_covers():
+    registry = PermissionRegistry(["view_content", "edit_content", "delete_content"])
+    bitmap = registry.bitmap(["view_content", "delete_content"])
+
+    assert bitmap == 0b101
+    assert registry.covers(bitmap, ["view_content"])
+    assert registry.covers(bitmap, ["view_content", "delete_content"])
+    assert not registry.covers(bitmap, ["edit_content"])
+    assert not registry.covers(bitmap, ["unknown_permission"])
+    assert registry.names(bitmap) == ["delete_content", "view_content"]
+
+
+def test_bitmap_encoding_roundtrip():
+    for bitmap in (0, 1, 0b1011, 1 << 70):
+        assert decode_bitmap(encode_bitmap(bitmap)) == bitmap
+
+    assert encode_bitmap(0) == ""
+    assert "=" not in encode_bitmap(1 << 9)
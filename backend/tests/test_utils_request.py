@@ -0,0 +1,42 @@
+from starlette.requests import Request
+
+from backend.app.utils.request import get_client_ip
+
+TRUSTED_PROXIES = ["10.0.0.0/8", "192.168.1.1"]
+
+def make_request(client_host: str, forwarded: str | None = None) -> Request:
+    headers = []
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+
+    return Request({
+        "type": "http",
+        "path": "/",
+        "headers": headers,
+        "client": (client_host, 12345),
+    })
+
+def test_get_client_ip_ignores_header_from_untrusted_peer():
+    """Tests if a spoofed X-Forwarded-For from a direct client is ignored."""
+    request = make_request("203.0.113.7", "1.2.3.4")
+    assert get_client_ip(request, TRUSTED_PROXIES) == "203.0.113.7"
+
+def test_get_client_ip_takes_right_most_untrusted_hop():
+    """Tests if the right-most untrusted hop is used behind trusted proxies."""
+    request = make_request("10.0.0.2", "1.2.3.4, 203.0.113.7, 192.168.1.1")
+    assert get_client_ip(request, TRUSTED_PROXIES) == "203.0.113.7"
+
+def test_get_client_ip_all_hops_trusted():
+    """Tests if the left-most hop is used when every hop is a trusted proxy."""
+    request = make_request("10.0.0.2", "10.0.0.5, 192.168.1.1")
+    assert get_client_ip(request, TRUSTED_PROXIES) == "10.0.0.5"
+
+def test_get_client_ip_trusted_peer_without_header():
+    """Tests if the peer is used when a trusted proxy sends no header."""
+    request = make_request("10.0.0.2")
+    assert get_client_ip(request, TRUSTED_PROXIES) == "10.0.0.2"
+
+def test_get_client_ip_defaults_to_no_trusted_proxies():
+    """Tests if the header is ignored when no proxies are configured."""
+    request = make_request("10.0.0.2", "1.2.3.4")
+    assert get_client_ip(request) == "10.0.0.2"
@@ -1,3 +1,5 @@
+import pytest
+
 from backend.app.utils.security import (
     is_email_valid,
     password_validity_obj,
@@ -14,6 +16,10 @@ from backend.app.utils.security import (
     get_invalid_password_conditions,
     is_password_valid,
     is_valid_uuid,
+    hash_token,
+    hmac_token,
+    build_password_context,
+    calibrate_password_cost,
     CONDITION_LIST,
 )
 
@@ -147,3 +153,38 @@ def test_uuid_with_hyphens():
     """Tests if a UUID with extra hyphens is correctly identified as invalid."""
     uuid_with_hyphens = "123e4567-invalid-format"
     assert not is_valid_uuid(uuid_with_hyphens)
+
+def test_hash_token_is_fixed_length():
+    """Tests that token hashes are deterministic 64 characters long digests."""
+    assert hash_token("token") == hash_token("token")
+    assert hash_token("token") != hash_token("other_token")
+    assert len(hash_token("token" * 100)) == 64
+
+
+def test_hmac_token():
+    digest = hmac_token("token", "key")
+
+    assert len(digest) == 64
+    assert digest == hmac_token("token", "key")
+    assert digest != hmac_token("token", "other_key")
+
+
+def test_build_password_context_flags_outdated_cost():
+    old_context = build_password_context("bcrypt", 4)
+    context = build_password_context("bcrypt", 5)
+
+    old_hash = old_context.hash("Secret_password_123")
+    is_valid, new_hash = context.verify_and_update("Secret_password_123", old_hash)
+
+    assert is_valid
+    assert new_hash.startswith("$2b$05$")
+    assert not context.needs_update(new_hash)
+
+
+def test_build_password_context_unknown_scheme():
+    with pytest.raises(ValueError):
+        build_password_context("md5_crypt")
+
+
+def test_calibrate_password_cost_is_within_range():
+    assert 4 <= calibrate_password_cost("bcrypt", 0.01) <= 31
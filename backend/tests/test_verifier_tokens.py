@@ -0,0 +1,132 @@
+import subprocess
+import sys
+from time import time
+
+import pytest
+from jose import jwt
+
+from backend.app.services.signing import KeyRing, SigningKey, generate_private_key
+from backend.verifier import (
+    PermissionRegistry, TokenVerificationError, TokenVerifier, encode_bitmap,
+)
+
+
+def es256_key_ring(kid: str = "key_1") -> KeyRing:
+    key_ring = KeyRing("ES256")
+    key_ring.add_key(SigningKey(kid, "ES256", generate_private_key("ES256")))
+
+    return key_ring
+
+
+def get_claims(registry: PermissionRegistry, permission_names, **claims) -> dict:
+    return {
+        "sub": "user",
+        "uid": "user_id",
+        "rol": ["Viewer"],
+        "pbm": encode_bitmap(registry.bitmap(permission_names)),
+        "pbv": registry.version,
+        "epc": 0,
+        "exp": int(time()) + 60,
+        **claims,
+    }
+
+
+class FakeFetch:
+    def __init__(self, documents: dict):
+        self.documents = documents
+        self.urls = []
+
+    def __call__(self, url: str) -> dict:
+        self.urls.append(url)
+        return self.documents[url]
+
+
+def test_verify_es256_token_from_jwks():
+    registry = PermissionRegistry(["view_content", "edit_content"])
+    key_ring = es256_key_ring()
+    verifier = TokenVerifier(jwks=key_ring.jwks(), registry=registry)
+
+    token = key_ring.encode(get_claims(registry, ["view_content"]))
+    verified_token = verifier.verify(token)
+
+    assert verified_token.subject == "user"
+    assert verified_token.role_names == ("Viewer",)
+    assert verified_token.has_roles(["Viewer", "Admin"])
+    assert verifier.has_permissions(verified_token, ["view_content"])
+    assert not verifier.has_permissions(verified_token, ["edit_content"])
+
+    # Verified tokens are cached and immutable
+    assert verifier.verify(token) is verified_token
+    with pytest.raises(AttributeError):
+        verified_token.subject = "admin"
+
+
+def test_verify_hs256_token_with_secret_key():
+    registry = PermissionRegistry(["view_content"])
+    verifier = TokenVerifier(secret_key="secret", registry=registry)
+
+    token = jwt.encode(get_claims(registry, ["view_content"]), "secret", algorithm="HS256")
+    assert verifier.verify(token).subject == "user"
+
+    forged_token = jwt.encode(get_claims(registry, []), "forged", algorithm="HS256")
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(forged_token)
+
+
+def test_verify_rejects_expired_and_opaque_tokens():
+    registry = PermissionRegistry()
+    key_ring = es256_key_ring()
+    verifier = TokenVerifier(jwks=key_ring.jwks(), registry=registry)
+
+    expired_token = key_ring.encode(get_claims(registry, [], exp=int(time()) - 1))
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(expired_token)
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify("ot_opaque")
+
+
+def test_unknown_kid_refetches_jwks_once_per_interval():
+    registry = PermissionRegistry()
+    old_key_ring, new_key_ring = es256_key_ring("key_1"), es256_key_ring("key_2")
+    fetch = FakeFetch({"jwks": new_key_ring.jwks()})
+    verifier = TokenVerifier(
+        jwks_url="jwks", jwks=old_key_ring.jwks(), registry=registry, fetch=fetch,
+    )
+
+    token = new_key_ring.encode(get_claims(registry, []))
+    assert verifier.verify(token).subject == "user"
+
+    unknown_token = es256_key_ring("key_3").encode(get_claims(registry, []))
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(unknown_token)
+
+    assert fetch.urls == ["jwks"]
+
+
+def test_newer_registry_version_refetches_permissions():
+    issuer_registry = PermissionRegistry(["view_content", "edit_content"])
+    key_ring = es256_key_ring()
+    fetch = FakeFetch({"permissions": issuer_registry.to_dict()})
+    verifier = TokenVerifier(
+        permissions_url="permissions",
+        jwks=key_ring.jwks(),
+        registry=PermissionRegistry(["view_content"]),
+        fetch=fetch,
+    )
+
+    verified_token = verifier.verify(key_ring.encode(get_claims(issuer_registry, ["edit_content"])))
+
+    assert verifier.has_permissions(verified_token, ["edit_content"])
+    assert verifier.registry.version == issuer_registry.version
+    assert fetch.urls == ["permissions"]
+
+
+def test_verifier_does_not_import_the_application():
+    code = (
+        "import sys, backend.verifier; "
+        "assert not {'fastapi', 'sqlalchemy', 'backend.app'} & set(sys.modules)"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,24 @@
+"""
+Standalone verifier of the access tokens of the auth service, for sibling
+services verifying them in-process. It depends on python-jose and the
+standard library only: nothing from the application (settings, database,
+FastAPI) is imported.
+
+    verifier = TokenVerifier(
+        jwks_url="https://auth.example.com/.well-known/jwks.json",
+        permissions_url="https://auth.example.com/.well-known/permissions.json",
+    )
+    token = verifier.verify(access_token)
+    verifier.has_permissions(token, ["view_content"])
+"""
+from backend.verifier.permissions import PermissionRegistry, decode_bitmap, encode_bitmap
+from backend.verifier.tokens import TokenVerificationError, TokenVerifier, VerifiedToken
+
+__all__ = [
+    "PermissionRegistry",
+    "TokenVerificationError",
+    "TokenVerifier",
+    "VerifiedToken",
+    "decode_bitmap",
+    "encode_bitmap",
+]
@@ -0,0 +1,158 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Dict, Iterable, List, Tuple
+
+
+def encode_bitmap(bitmap: int) -> str:
+    """
+    Encodes a permission bitmap as unpadded URL-safe base64.
+
+    Args:
+        bitmap (int): The permission bitmap.
+
+    Returns:
+        str: The encoded bitmap.
+    """
+    bitmap_bytes = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    return urlsafe_b64encode(bitmap_bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_bitmap(encoded_bitmap: str) -> int:
+    padding = "=" * (-len(encoded_bitmap) % 4)
+    return int.from_bytes(urlsafe_b64decode(encoded_bitmap + padding), "little")
+
+
+class PermissionRegistry:
+    """
+    Assigns every permission name a stable bit position, so that a set of
+    permissions is carried as an integer bitmap and checked with a bitwise
+    AND. Positions are never reassigned: the registry only grows, and its
+    version is the number of registered permissions.
+    """
+
+    def __init__(self, permission_names: Iterable[str] = ()):
+        self._bits: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+
+        for permission_name in permission_names:
+            self.register(permission_name)
+
+    @classmethod
+    def from_roles_metadata(cls, roles_metadata: Dict):
+        # Permissions are registered in order of first appearance
+        return cls(
+            permission_name
+            for metadata in roles_metadata.values()
+            for permission_name in metadata["permissions"]
+        )
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def __contains__(self, permission_name: str) -> bool:
+        return permission_name in self._bits
+
+    @property
+    def version(self) -> int:
+        return len(self._bits)
+
+    def register(self, permission_name: str, bit: int | None = None) -> int:
+        """
+        Registers a permission, at the given bit or else at the next free one.
+
+        Args:
+            permission_name (str): The permission name.
+            bit (int | None): The bit position, e.g. as stored on the database.
+
+        Returns:
+            int: The bit position of the permission.
+
+        Raises:
+            ValueError: If the bit belongs to another permission.
+        """
+        if permission_name in self._bits:
+            return self._bits[permission_name]
+
+        if bit is None:
+            bit = max(self._names, default=-1) + 1
+
+        if bit in self._names:
+            raise ValueError(
+                f"Bit {bit} of permission {permission_name} "
+                f"belongs to permission {self._names[bit]}"
+            )
+
+        self._bits[permission_name] = bit
+        self._names[bit] = permission_name
+
+        return bit
+
+    def replace(self, other: "PermissionRegistry") -> None:
+        self._bits = dict(other._bits)
+        self._names = dict(other._names)
+
+    def items(self) -> List[Tuple[str, int]]:
+        return list(self._bits.items())
+
+    def to_dict(self) -> Dict:
+        return {"version": self.version, "permissions": dict(self._bits)}
+
+    @classmethod
+    def from_dict(cls, document: Dict):
+        registry = cls()
+
+        for permission_name, bit in document["permissions"].items():
+            registry.register(permission_name, bit)
+
+        return registry
+
+    def bit(self, permission_name: str) -> int:
+        return self._bits[permission_name]
+
+    def bitmap(self, permission_names: Iterable[str]) -> int:
+        """
+        Builds the bitmap of a set of permissions. Unregistered permissions
+        are ignored.
+
+        Args:
+            permission_names (Iterable[str]): The permission names.
+
+        Returns:
+            int: The permission bitmap.
+        """
+        bitmap = 0
+
+        for permission_name in permission_names:
+            bit = self._bits.get(permission_name)
+
+            if bit is not None:
+                bitmap |= 1 << bit
+
+        return bitmap
+
+    def names(self, bitmap: int) -> List[str]:
+        return sorted(
+            permission_name
+            for bit, permission_name in self._names.items()
+            if bitmap >> bit & 1
+        )
+
+    def covers(self, bitmap: int, permission_names: Iterable[str]) -> bool:
+        """
+        Checks whether a bitmap grants every given permission. Unregistered
+        permissions are never granted.
+
+        Args:
+            bitmap (int): The granted permission bitmap.
+            permission_names (Iterable[str]): The required permission names.
+
+        Returns:
+            bool: True if every permission is granted, False otherwise.
+        """
+        permission_names = list(permission_names)
+
+        if not all(permission_name in self._bits for permission_name in permission_names):
+            return False
+
+        required_bitmap = self.bitmap(permission_names)
+
+        return bitmap & required_bitmap == required_bitmap
@@ -0,0 +1,260 @@
+from collections import OrderedDict
+from hashlib import sha256
+from json import loads
+from threading import Lock
+from time import time
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+from urllib.request import Request, urlopen
+
+from jose import JWTError, jwk, jwt
+
+from backend.verifier.permissions import PermissionRegistry, decode_bitmap
+
+OPAQUE_TOKEN_PREFIXES = ("ot_", "ak_")
+
+Fetcher = Callable[[str], Dict]
+
+
+class TokenVerificationError(Exception):
+    """Raised when a token is malformed, expired or badly signed."""
+
+
+def fetch_json(url: str, timeout: float = 2.0) -> Dict:
+    request = Request(url, headers={"Accept": "application/json"})
+
+    with urlopen(request, timeout=timeout) as response:
+        return loads(response.read())
+
+
+class VerifiedToken:
+    """
+    Immutable principal of a verified access token, with the same claims
+    semantics as the issuing service: roles by name and permissions as a
+    bitmap of the permission registry.
+    """
+
+    __slots__ = (
+        "subject",
+        "user_id",
+        "role_names",
+        "permission_bitmap",
+        "registry_version",
+        "epoch",
+        "token_id",
+        "expires_at",
+    )
+
+    def __init__(self, claims: Dict):
+        set_attribute = object.__setattr__
+
+        set_attribute(self, "subject", claims["sub"])
+        set_attribute(self, "user_id", claims.get("uid"))
+        set_attribute(self, "role_names", tuple(claims.get("rol", ())))
+        set_attribute(self, "permission_bitmap", decode_bitmap(claims.get("pbm", "")))
+        set_attribute(self, "registry_version", claims.get("pbv", 0))
+        set_attribute(self, "epoch", claims.get("epc", 0))
+        set_attribute(self, "token_id", claims.get("jti"))
+        set_attribute(self, "expires_at", claims["exp"])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("VerifiedToken is immutable")
+
+    def has_roles(self, role_names: Iterable[str]) -> bool:
+        return not set(role_names).isdisjoint(self.role_names)
+
+    def __repr__(self) -> str:
+        return f"VerifiedToken({self.subject})"
+
+
+class TokenVerifier:
+    """
+    In-process verifier of the access tokens of the auth service, for
+    sibling services. It depends on python-jose and the standard library
+    only.
+
+    Signing keys are read from the JWKS document (or a shared secret, for
+    HS256 deployments) and the permission registry from the permissions
+    document, both cached: keys are refetched on an unknown 'kid', and the
+    registry when a token carries a newer registry version, at most once
+    per `min_refresh_interval` seconds. Verified tokens are cached until
+    they expire, so repeated checks of a token take microseconds.
+
+    Revocations are not visible here: consumers needing them should use
+    short-lived tokens or the introspection endpoint.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str | None = None,
+        permissions_url: str | None = None,
+        jwks: Dict | None = None,
+        registry: PermissionRegistry | None = None,
+        secret_key: str | None = None,
+        secret_algorithm: str = "HS256",
+        algorithms: Sequence[str] = ("ES256", "ES384", "RS256"),
+        min_refresh_interval: float = 30.0,
+        cache_max_size: int = 1024,
+        fetch: Fetcher = fetch_json,
+    ):
+        self.jwks_url = jwks_url
+        self.permissions_url = permissions_url
+        self.secret_key = secret_key
+        self.secret_algorithm = secret_algorithm
+        self.algorithms = list(algorithms)
+        self.min_refresh_interval = min_refresh_interval
+        self.cache_max_size = cache_max_size
+        self.fetch = fetch
+
+        self.keys: Dict[str, Tuple[object, str]] = {}
+        self.registry = registry or PermissionRegistry()
+
+        self._cache: OrderedDict = OrderedDict()
+        self._refreshed_at: Dict[str, float] = {}
+        self._lock = Lock()
+
+        if jwks is not None:
+            self.load_jwks(jwks)
+
+    def load_jwks(self, jwks: Dict) -> None:
+        keys = {}
+
+        for key_data in jwks.get("keys", []):
+            algorithm = key_data.get("alg")
+
+            if algorithm in self.algorithms:
+                keys[key_data["kid"]] = (jwk.construct(key_data, algorithm), algorithm)
+
+        self.keys = keys
+
+    def _may_refresh(self, document: str) -> bool:
+        now = time()
+
+        with self._lock:
+            if now - self._refreshed_at.get(document, 0.0) < self.min_refresh_interval:
+                return False
+
+            self._refreshed_at[document] = now
+
+        return True
+
+    def refresh_keys(self) -> bool:
+        if self.jwks_url is None or not self._may_refresh("jwks"):
+            return False
+
+        self.load_jwks(self.fetch(self.jwks_url))
+
+        return True
+
+    def refresh_registry(self) -> bool:
+        if self.permissions_url is None or not self._may_refresh("permissions"):
+            return False
+
+        self.registry = PermissionRegistry.from_dict(self.fetch(self.permissions_url))
+
+        return True
+
+    def get_key(self, token: str) -> Tuple[object, str]:
+        """
+        Picks the verification key of a token by its 'kid' header, refetching
+        the JWKS document on unknown kids. Tokens of keys absent from the
+        JWKS document, e.g. symmetric ones, are verified with the secret key.
+
+        Args:
+            token (str): The access token.
+
+        Returns:
+            Tuple[object, str]: The key and its algorithm.
+
+        Raises:
+            TokenVerificationError: If the token is malformed or its key unknown.
+        """
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError as e:
+            raise TokenVerificationError(f"Malformed token: {e}") from e
+
+        if kid is not None and kid not in self.keys:
+            self.refresh_keys()
+
+        if kid in self.keys:
+            return self.keys[kid]
+
+        if self.secret_key is not None:
+            return self.secret_key, self.secret_algorithm
+
+        raise TokenVerificationError(f"Unknown signing key: {kid}")
+
+    def _get_cached(self, digest: bytes) -> Optional[VerifiedToken]:
+        verified_token = self._cache.get(digest)
+
+        if verified_token is None:
+            return None
+
+        if verified_token.expires_at <= time():
+            self._cache.pop(digest, None)
+            return None
+
+        self._cache.move_to_end(digest)
+
+        return verified_token
+
+    def _set_cached(self, digest: bytes, verified_token: VerifiedToken) -> None:
+        self._cache[digest] = verified_token
+
+        while len(self._cache) > self.cache_max_size:
+            self._cache.popitem(last=False)
+
+    def verify(self, token: str) -> VerifiedToken:
+        """
+        Verifies the signature and expiration of an access token.
+
+        Args:
+            token (str): The access token.
+
+        Returns:
+            VerifiedToken: The principal of the token.
+
+        Raises:
+            TokenVerificationError: If the token is opaque, malformed, expired
+                or badly signed.
+        """
+        if token.startswith(OPAQUE_TOKEN_PREFIXES):
+            raise TokenVerificationError("Opaque tokens are verified by introspection")
+
+        digest = sha256(token.encode("utf-8")).digest()
+        verified_token = self._get_cached(digest)
+
+        if verified_token is not None:
+            return verified_token
+
+        try:
+            key, algorithm = self.get_key(token)
+            # Only the algorithm of the key is accepted
+            claims = jwt.decode(
+                token, key, algorithms=[algorithm], options={"verify_aud": False},
+            )
+            verified_token = VerifiedToken(claims)
+
+        except (JWTError, KeyError) as e:
+            raise TokenVerificationError(f"Invalid token: {e}") from e
+
+        self._set_cached(digest, verified_token)
+
+        return verified_token
+
+    def has_permissions(self, verified_token: VerifiedToken, permission_names: Iterable[str]) -> bool:
+        """
+        Checks whether a verified token grants every given permission. The
+        registry is refreshed first if the token was issued on a newer one.
+
+        Args:
+            verified_token (VerifiedToken): The verified token.
+            permission_names (Iterable[str]): The required permission names.
+
+        Returns:
+            bool: True if every permission is granted, False otherwise.
+        """
+        if verified_token.registry_version > self.registry.version:
+            self.refresh_registry()
+
+        return self.registry.covers(verified_token.permission_bitmap, permission_names)
@@ -0,0 +1,229 @@
+"""
+Micro-benchmarks of the authentication hot paths, run in-process with no
+database nor network. Usage, from the repository root:
+
+    python scripts/benchmark.py [case ...] [--iterations N]
+"""
+import sys
+import asyncio
+from argparse import ArgumentParser
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+from uuid import uuid4
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter, time
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.base.auth import create_token, introspect_tokens, resolve_principal
+from backend.app.base.cache import token_cache
+from backend.app.models.auth import Principal, TokenClaims
+from backend.app.services.revocation import revocation_service
+from backend.app.services.opaque_tokens import opaque_token_store
+
+BenchmarkCase = Callable[[], Awaitable[Callable[[], Awaitable]]]
+
+cases: Dict[str, BenchmarkCase] = {}
+
+
+def benchmark_case(name: str):
+    def wrapper(func: BenchmarkCase):
+        cases[name] = func
+        return func
+
+    return wrapper
+
+
+def cached_token(username: str = "benchmark_user") -> str:
+    """Issues a token whose principal is already cached, as on warm workers."""
+    token = create_token({"sub": username})
+    principal = TokenClaims("benchmark_user_id", username, ["Viewer"], ["view_content"])
+
+    token_cache.set_token(token, principal.user_id, (principal, None), time() + 3600)
+
+    return token
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+@benchmark_case("forward_auth")
+async def forward_auth_case():
+    from backend.app.middlewares.forward_auth import ForwardAuthMiddleware, FORWARD_AUTH_PATH
+
+    async def app(scope, receive, send):
+        raise RuntimeError("Forward-auth requests must not reach the application")
+
+    middleware = ForwardAuthMiddleware(app)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": FORWARD_AUTH_PATH,
+        "headers": [(b"authorization", f"Bearer {cached_token()}".encode())],
+    }
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+
+    async def run():
+        await middleware(scope, receive, send)
+
+    return run
+
+
+# Round trips of a database query and of a Redis command, simulated by the
+# offline cases
+SIMULATED_QUERY_LATENCY_S = 0.0005
+SIMULATED_REDIS_LATENCY_S = 0.0002
+INTROSPECTION_BATCH_SIZE = 100
+
+
+class SimulatedUser:
+    def __init__(self, username: str):
+        self.user_id = uuid4()
+        self.user_username = username
+        self.user_is_active = True
+        self.user_token_epoch = 0
+        self.role_names = ["Viewer"]
+
+
+class SimulatedUsersRepository:
+    async def get_principal(self, username: str):
+        await asyncio.sleep(SIMULATED_QUERY_LATENCY_S)
+        return Principal(uuid4(), username, role_names=["Viewer"])
+
+    async def get_users_by_usernames(self, usernames: List[str]):
+        await asyncio.sleep(SIMULATED_QUERY_LATENCY_S)
+        return [SimulatedUser(username) for username in usernames]
+
+
+@asynccontextmanager
+async def simulated_user_repository():
+    yield SimulatedUsersRepository()
+
+
+class SimulatedRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key: str, value: str, ex: int | None = None):
+        await asyncio.sleep(SIMULATED_REDIS_LATENCY_S)
+        self.values[key] = value
+
+    async def get(self, key: str):
+        await asyncio.sleep(SIMULATED_REDIS_LATENCY_S)
+        return self.values.get(key)
+
+
+def patch_user_repository():
+    patch(
+        "backend.app.base.auth.user_repository_async_context_manager",
+        simulated_user_repository,
+    ).start()
+
+
+def introspection_tokens() -> List[str]:
+    patch_user_repository()
+
+    return [
+        create_token({"sub": f"user_{index}"}) for index in range(INTROSPECTION_BATCH_SIZE)
+    ]
+
+
+@benchmark_case("introspect_loop")
+async def introspect_loop_case():
+    tokens = introspection_tokens()
+
+    async def run():
+        for token in tokens:
+            await introspect_tokens([token])
+
+    return run
+
+
+@benchmark_case("introspect_batch")
+async def introspect_batch_case():
+    tokens = introspection_tokens()
+
+    async def run():
+        await introspect_tokens(tokens)
+
+    return run
+
+
+@benchmark_case("jwt_verify")
+async def jwt_verify_case():
+    patch_user_repository()
+    token = create_token({"sub": "benchmark_user"})
+
+    async def run():
+        # A cold token cache: signature check and user query on every call
+        token_cache.clear()
+        await resolve_principal(token)
+
+    return run
+
+
+@benchmark_case("opaque_verify")
+async def opaque_verify_case():
+    opaque_token_store._redis = SimulatedRedis()
+    token = await opaque_token_store.issue(
+        uuid4(), "benchmark_user", ["Viewer"], 0b1, 0, timedelta(minutes=30)
+    )
+
+    async def run():
+        await resolve_principal(token)
+
+    return run
+
+
+async def run_case(name: str, iterations: int) -> Dict[str, float]:
+    run = await cases[name]()
+
+    # Warm-up
+    for _ in range(min(iterations, 100)):
+        await run()
+
+    latencies = []
+    for _ in range(iterations):
+        start_time = perf_counter()
+        await run()
+        latencies.append((perf_counter() - start_time) * 1e6)
+
+    percentiles = quantiles(latencies, n=100)
+
+    return {
+        "mean_us": mean(latencies),
+        "p50_us": percentiles[49],
+        "p99_us": percentiles[98],
+    }
+
+
+async def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("cases", nargs="*", help=f"Cases to run: {', '.join(cases)}")
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+
+    unknown_cases = set(args.cases) - set(cases)
+    if unknown_cases:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown_cases))}")
+
+    # Benchmarks run offline: the revocation filter is never synced
+    revocation_service.sync_interval = float("inf")
+    revocation_service.synced_at = time()
+
+    for name in args.cases or cases:
+        result = await run_case(name, args.iterations)
+        metrics = "  ".join(f"{key}={value:9.2f}" for key, value in result.items())
+
+        print(f"{name:<24} {metrics}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
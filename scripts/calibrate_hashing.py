@@ -0,0 +1,40 @@
+"""
+Benchmarks this host and prints the password hash cost meeting a target
+verify latency, to be set as PASSWORD_HASH_COST. Usage, from the
+repository root:
+
+    python scripts/calibrate_hashing.py [--scheme bcrypt|argon2] [--target-ms 250]
+"""
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.utils.security import (
+    PASSWORD_HASH_SCHEMES,
+    calibrate_password_cost,
+    is_hash_scheme_available,
+    measure_verify_latency,
+)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--scheme", default="bcrypt", choices=PASSWORD_HASH_SCHEMES)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    if not is_hash_scheme_available(args.scheme):
+        parser.error(f"Scheme {args.scheme} has no backend installed: install passlib[{args.scheme}]")
+
+    cost = calibrate_password_cost(args.scheme, args.target_ms / 1000)
+    latency_ms = measure_verify_latency(args.scheme, cost) * 1000
+
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    print(f"PASSWORD_HASH_COST={cost}")
+    print(f"# verify latency: {latency_ms:.1f} ms (target: {args.target_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()